@@ -0,0 +1,231 @@
+import argparse
+import atexit
+import gzip
+import os
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+import zlib
+from datetime import datetime, timezone
+from http.client import responses as REASONS
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+import HttpSession
+
+# 常量配置
+ARCHIVE_PATH = 'responses.warc.gz'
+INDEX_SUFFIX = '.idx.sqlite'  # 索引文件 = 归档路径 + 后缀，可由 reindex 从归档重建
+COMMIT_EVERY = 200
+SCAN_CHUNK = 1024 * 1024
+# requests 已解压正文、按块拼好，归档中去掉这些头并改写 Content-Length
+_DROPPED_HEADERS = {'content-encoding', 'transfer-encoding', 'content-length'}
+
+
+class ArchiveMissError(LookupError):
+    """回放模式下归档中没有该URL"""
+
+
+def _warc_record(url, response):
+    """把响应组装成一条 WARC/1.1 response 记录（状态行 + 响应头 + 正文）"""
+    body = response.content or b''
+    reason = response.reason or REASONS.get(response.status_code, '')
+    lines = [f'HTTP/1.1 {response.status_code} {reason}']
+    lines += [f'{name}: {value}' for name, value in response.headers.items()
+              if name.lower() not in _DROPPED_HEADERS]
+    lines.append(f'Content-Length: {len(body)}')
+    http = ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1', 'replace') + body
+    date = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+    header = (f'WARC/1.1\r\nWARC-Type: response\r\nWARC-Record-ID: <urn:uuid:{uuid.uuid4()}>\r\n'
+              f'WARC-Date: {date}\r\nWARC-Target-URI: {url}\r\n'
+              f'Content-Type: application/http; msgtype=response\r\nContent-Length: {len(http)}\r\n\r\n')
+    return header.encode('utf-8') + http + b'\r\n\r\n'
+
+
+def _parse_record(record):
+    """解析一条 WARC response 记录，返回 (url, 状态码, 原因, 响应头, 正文)"""
+    warc_head, _, rest = record.partition(b'\r\n\r\n')
+    warc = dict(line.split(': ', 1) for line in warc_head.decode('utf-8').split('\r\n')[1:])
+    http = rest[:int(warc['Content-Length'])]
+    http_head, _, body = http.partition(b'\r\n\r\n')
+    status_line, *header_lines = http_head.decode('latin-1').split('\r\n')
+    _, status, *reason = status_line.split(' ', 2)
+    headers = CaseInsensitiveDict(line.split(': ', 1) for line in header_lines if ': ' in line)
+    return warc['WARC-Target-URI'], int(status), reason[0] if reason else '', headers, body
+
+
+def scan(path, chunk_size=SCAN_CHUNK):
+    """顺序读取归档中的每个 gzip 成员，产出 (偏移, 压缩长度, 记录)"""
+    with open(path, 'rb') as f:
+        offset = 0
+        data = b''
+        while True:
+            if not data:
+                data = f.read(chunk_size)
+                if not data:
+                    return
+            decompressor = zlib.decompressobj(zlib.MAX_WBITS | 16)
+            parts = []
+            length = 0
+            while True:
+                parts.append(decompressor.decompress(data))
+                if decompressor.eof:
+                    length += len(data) - len(decompressor.unused_data)
+                    data = decompressor.unused_data
+                    break
+                length += len(data)
+                data = f.read(chunk_size)
+                if not data:
+                    raise ValueError(f"归档在偏移{offset}处被截断")
+            yield offset, length, b''.join(parts)
+            offset += length
+
+
+class Archive:
+    """响应归档：WARC 格式，每条记录单独 gzip 压缩后追加写入，SQLite 索引按URL定位偏移，可随机读取
+
+    record=True 时把经过 HttpSession.fetch 的响应逐条写入；replay=True 时 fetch 只从归档读取，不访问网络。
+    """
+
+    def __init__(self, path=ARCHIVE_PATH, replay=False):
+        self.path = path
+        self.replay = replay
+        self.recorded = 0
+        self._lock = threading.Lock()
+        self._uncommitted = 0
+        if replay and not os.path.exists(path):
+            raise FileNotFoundError(f"归档不存在: {path}")
+        self._file = open(path, 'rb' if replay else 'ab')
+        index_path = path + INDEX_SUFFIX
+        rebuild = not os.path.exists(index_path)
+        self._db = sqlite3.connect(index_path, check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('''CREATE TABLE IF NOT EXISTS records (
+            offset INTEGER PRIMARY KEY,
+            length INTEGER NOT NULL,
+            url TEXT NOT NULL,
+            status INTEGER,
+            recorded REAL)''')
+        self._db.execute('CREATE INDEX IF NOT EXISTS idx_url ON records(url)')
+        if rebuild and os.path.getsize(path):
+            self.reindex()
+
+    def record(self, url, response):
+        """追加一条响应记录（压缩在锁外完成）"""
+        member = gzip.compress(_warc_record(url, response), compresslevel=6)
+        with self._lock:
+            offset = self._file.seek(0, os.SEEK_END)
+            self._file.write(member)
+            self._db.execute('INSERT INTO records VALUES (?, ?, ?, ?, ?)',
+                             (offset, len(member), url, response.status_code, time.time()))
+            self.recorded += 1
+            self._uncommitted += 1
+            if self._uncommitted >= COMMIT_EVERY:
+                self._flush()
+
+    def _flush(self):
+        self._file.flush()
+        self._db.commit()
+        self._uncommitted = 0
+
+    def _read(self, offset, length):
+        with self._lock:
+            self._file.seek(offset)
+            member = self._file.read(length)
+        return gzip.decompress(member)
+
+    def get(self, url):
+        """按URL取最近一次记录（优先200）构造 requests.Response；没有时抛 ArchiveMissError"""
+        with self._lock:
+            row = self._db.execute('SELECT offset, length FROM records WHERE url = ? '
+                                   'ORDER BY status = 200 DESC, offset DESC LIMIT 1', (url,)).fetchone()
+        if row is None:
+            raise ArchiveMissError(f"归档中没有: {url}")
+        target, status, reason, headers, body = _parse_record(self._read(*row))
+
+        response = requests.Response()
+        response.status_code = status
+        response.reason = reason
+        response.headers = headers
+        response.url = target
+        response._content = body
+        response.from_archive = True
+        return response
+
+    def urls(self):
+        """归档中的URL（去重，按首次记录顺序）"""
+        with self._lock:
+            rows = self._db.execute('SELECT url FROM records GROUP BY url ORDER BY MIN(offset)').fetchall()
+        return [url for (url,) in rows]
+
+    def counts(self):
+        """(记录数, URL数, 归档字节数)"""
+        with self._lock:
+            records, urls = self._db.execute('SELECT COUNT(*), COUNT(DISTINCT url) FROM records').fetchone()
+        return records, urls, os.path.getsize(self.path)
+
+    def reindex(self):
+        """扫描归档重建索引（索引丢失或归档由其他工具生成时）"""
+        rows = []
+        for offset, length, record in scan(self.path):
+            if b'WARC-Type: response' not in record[:512]:
+                continue
+            url, status, _, _, _ = _parse_record(record)
+            rows.append((offset, length, url, status, None))
+        with self._lock:
+            self._db.execute('DELETE FROM records')
+            self._db.executemany('INSERT INTO records VALUES (?, ?, ?, ?, ?)', rows)
+            self._db.commit()
+        return len(rows)
+
+    def close(self):
+        with self._lock:
+            if self._file.closed:
+                return
+            self._flush()
+            self._file.close()
+            self._db.close()
+
+
+def add_archive_arguments(parser):
+    """为脚本添加录制/回放相关的命令行参数"""
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument('--record', nargs='?', const=ARCHIVE_PATH, help="把原始响应追加录制到WARC归档")
+    group.add_argument('--replay', nargs='?', const=ARCHIVE_PATH, help="只从WARC归档回放响应，不访问网络")
+
+
+def enable_from_args(args):
+    """根据命令行参数启用录制或回放"""
+    path = args.record or args.replay
+    if not path:
+        return None
+    archive = Archive(path, replay=bool(args.replay))
+    HttpSession.enable_archive(archive)
+    atexit.register(archive.close)  # 退出时落盘未提交的索引
+    return archive
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="查看WARC响应归档")
+    parser.add_argument('command', choices=['stats', 'list', 'get', 'reindex'])
+    parser.add_argument('url', nargs='?', help="get 时要取出的URL")
+    parser.add_argument('--archive', default=ARCHIVE_PATH)
+    args = parser.parse_args()
+
+    archive = Archive(args.archive, replay=True)
+    if args.command == 'stats':
+        records, urls, size = archive.counts()
+        print(f"{records}条记录，{urls}个URL，归档{size / 1024 / 1024:.1f}MB")
+    elif args.command == 'list':
+        for url in archive.urls():
+            print(url)
+    elif args.command == 'get':
+        response = archive.get(args.url)
+        print(f"HTTP {response.status_code} {response.reason}", file=sys.stderr)
+        sys.stdout.buffer.write(response.content)
+    else:
+        print(f"已重建索引，共{archive.reindex()}条记录")
+    archive.close()
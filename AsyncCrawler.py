@@ -0,0 +1,158 @@
+import argparse
+import asyncio
+import time
+from urllib.parse import urlsplit
+
+import aiohttp
+
+import Concurrency
+import LazyImport
+import MultiThreaded
+import MultiThreadedRAL
+import Retry
+import Sinks
+
+tqdm = LazyImport.module('tqdm')
+
+# 常量配置
+CONCURRENCY = 100  # 同时在途的请求数
+LIMIT_PER_HOST = 20  # 单个主机的最大连接数
+TIMEOUT = aiohttp.ClientTimeout(sock_connect=5, sock_read=15)  # 与线程版 (5, 15) 保持一致
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+}
+
+
+async def fetch_color_details(session, semaphore, url, parse=MultiThreaded.parse_color_details):
+    """异步抓取颜色页面，返回 (url, 详情字典, 异常)"""
+    async with semaphore:
+        try:
+            async with session.get(url) as response:
+                response.raise_for_status()
+                content = await response.read()
+            return url, parse(content), None
+        except Exception as e:
+            return url, None, e
+
+
+async def fetch_adaptive(session, controller, url, parse=MultiThreaded.parse_color_details):
+    """由自适应控制器决定在途请求数的抓取，返回 (url, 详情字典, 异常)"""
+    await controller.acquire()
+    start = time.monotonic()
+    try:
+        async with session.get(url) as response:
+            response.raise_for_status()
+            content = await response.read()
+        result = url, parse(content), None
+    except Exception as e:
+        result = url, None, e
+    controller.release(time.monotonic() - start, result[2])
+    return result
+
+
+async def crawl(color_links, parse=MultiThreaded.parse_color_details,
+                concurrency=CONCURRENCY, limit_per_host=LIMIT_PER_HOST, controller=None, trace_configs=None,
+                retry=None, breaker=None):
+    """共享一个 ClientSession 并发抓取全部链接，返回 (all_details, failed_urls)
+
+    color_links 可以是任意可迭代对象（如 MultiThreaded.iter_links 的生成器），按需读取：
+    同时存在的任务（含等待重试的）最多为并发数的 MultiThreaded.WINDOW_FACTOR 倍，不会一次为全部链接创建协程。
+    传入 controller（Concurrency.AsyncAimdController）时，concurrency 作为并发上限；
+    传入 retry（Retry.RetryPolicy）/ breaker（Retry.CircuitBreaker）时与线程版相同地退避重试、按主机熔断；
+    trace_configs 原样交给 ClientSession，用于统计请求耗时等。
+    """
+    all_details = {}
+    failed_urls = []
+    links = iter(color_links)
+    window = concurrency * MultiThreaded.WINDOW_FACTOR
+
+    semaphore = asyncio.Semaphore(concurrency)
+    connector = aiohttp.TCPConnector(limit=concurrency, limit_per_host=limit_per_host)
+    async with aiohttp.ClientSession(connector=connector, timeout=TIMEOUT, headers=HEADERS,
+                                     trace_configs=trace_configs) as session:
+        async def run(url, attempt, delay=0):
+            """等待退避时间后抓取，返回 (url, 第几次尝试, 详情字典, 异常)"""
+            await asyncio.sleep(delay)
+            host = urlsplit(url).netloc
+            if breaker is not None:
+                try:
+                    breaker.before(host)
+                except Retry.CircuitOpenError as e:
+                    return url, attempt, None, e  # 请求未发出，交给 retry 决定是否排队等待
+            if controller is None:
+                _, result, error = await fetch_color_details(session, semaphore, url, parse)
+            else:
+                _, result, error = await fetch_adaptive(session, controller, url, parse)
+            if error is None and not isinstance(result, dict):
+                error = ValueError("返回非字典类型结果")
+            if breaker is not None:
+                # 解析类错误不计入主机错误率
+                breaker.record(host, error is None or Retry.classify(error)[0] == Retry.PERMANENT)
+            return url, attempt, result, error
+
+        total = len(color_links) if hasattr(color_links, '__len__') else None
+        pending = set()
+        with tqdm.tqdm(total=total, desc="抓取进度", unit="个") as pbar:
+            while True:
+                # 补足在途窗口
+                while len(pending) < window and (url := next(links, None)) is not None:
+                    pending.add(asyncio.ensure_future(run(url, 0)))
+                    if retry:
+                        retry.record_request()
+                if not pending:
+                    break
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    url, attempt, result, error = task.result()
+                    if error is None:
+                        all_details[url] = result
+                    else:
+                        scheduled = retry.schedule(error, attempt, url) if retry else None
+                        if scheduled:
+                            # 可重试的失败退避后重新抓取，等待期间仍占用窗口
+                            delay, next_attempt = scheduled
+                            pending.add(asyncio.ensure_future(run(url, next_attempt, delay)))
+                            continue
+                        failed_urls.append((url, type(error).__name__, MultiThreaded.error_message(error)))
+                    pbar.update(1)
+
+    return all_details, failed_urls
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="基于 asyncio/aiohttp 的颜色详情抓取")
+    parser.add_argument('--links', default='color_links.xlsx', help="颜色链接文件（xlsx，或每行一个链接的文本文件）")
+    parser.add_argument('--ral', action='store_true', help="使用 RAL 字段版本的解析与保存逻辑")
+    parser.add_argument('--concurrency', type=int, default=CONCURRENCY, help="最大在途请求数")
+    parser.add_argument('--limit-per-host', type=int, default=LIMIT_PER_HOST, help="单主机连接数上限")
+    parser.add_argument('--output', default='color_details.xlsx', help="输出文件（xlsx/csv/jsonl/parquet）")
+    Concurrency.add_adaptive_arguments(parser)
+    parser.add_argument('--max-attempts', type=int, default=Retry.MAX_ATTEMPTS,
+                        help="每个链接最多尝试次数，1表示不重试")
+    args = parser.parse_args()
+
+    module = MultiThreadedRAL if args.ral else MultiThreaded
+    has_links, color_links = MultiThreaded._peek(MultiThreaded.iter_links(args.links))  # 两个版本的链接文件格式相同
+    if not has_links:
+        print("未找到有效链接")
+        exit()
+
+    controller = None
+    if args.adaptive:
+        # 从 --concurrency 起步，上限为 --max-concurrency
+        controller = Concurrency.AsyncAimdController(args.concurrency, maximum=args.max_concurrency,
+                                                     log_path=args.concurrency_log)
+    # 与线程版相同：可重试的失败退避后重新抓取，主机错误率过高时熔断暂停
+    retry = Retry.RetryPolicy(max_attempts=args.max_attempts)
+    all_details, failed_urls = asyncio.run(
+        crawl(color_links, module.parse_color_details,
+              args.max_concurrency if controller else args.concurrency, args.limit_per_host, controller,
+              retry=retry, breaker=Retry.CircuitBreaker()))
+    print(f"自动重试{retry.retries}次")
+    if controller:
+        controller.close()
+        print(controller.summary())
+
+    Sinks.save_results(args.output, module.FIELDS, all_details, failed_urls)
+
+    MultiThreaded.print_summary(all_details, failed_urls)
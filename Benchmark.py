@@ -0,0 +1,264 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+try:
+    import resource  # 仅类Unix系统可用，用于统计峰值内存与子进程CPU
+except ImportError:
+    resource = None
+
+import FakeSite
+
+# 常量配置
+ENGINES = ['single', 'threads', 'threads-parse', 'async', 'pipeline']
+CONCURRENCY_LEVELS = [10, 50]
+PAGES = 2000
+TOLERANCE = 0.2  # 吞吐量低于基线的比例超过该值视为退化
+STARTUP_MODULES = ['ColorURL', 'ColorurlRAL', 'MultiThreaded', 'MultiThreadedRAL', 'Pipeline', 'WorkQueue']
+STARTUP_RUNS = 10
+HEAVY_MODULES = ('openpyxl', 'numpy', 'tqdm', 'fake_useragent', 'pyarrow')  # 应按需加载的重型依赖
+STDERR_LINES = 20  # 子进程出错时报告的 stderr 末尾行数
+
+
+def percentile(values, q):
+    """取第 q 百分位（最近秩法）"""
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q / 100 * len(values)))]
+
+
+def timed(fetch, latencies):
+    """包装抓取函数，记录每个请求的耗时"""
+    def wrapper(url):
+        start = time.perf_counter()
+        try:
+            return fetch(url)
+        finally:
+            latencies.append(time.perf_counter() - start)
+    return wrapper
+
+
+def run_engine(engine, base_url, pages, concurrency):
+    """在当前进程内跑一个引擎，返回 (成功数, 失败数, 请求耗时列表)"""
+    links = FakeSite.detail_links(base_url, pages)
+    latencies = []
+
+    if engine == 'single':
+        import SingleThreaded
+        fetch = timed(SingleThreaded.fetch_color_details, latencies)
+        results = [fetch(url) for url in links]
+        succeeded = sum(1 for r in results if r)
+        return succeeded, len(links) - succeeded, latencies
+
+    if engine in ('threads', 'threads-parse'):
+        import functools
+        import MultiThreaded
+        import ParsePool
+        fetch = MultiThreaded.fetch_color_details
+        if engine == 'threads-parse':
+            with ParsePool.ParsePool(MultiThreaded.parse_color_details) as pool:
+                details, failures = MultiThreaded.crawl(
+                    links, timed(functools.partial(fetch, parser=pool), latencies), concurrency)
+        else:
+            details, failures = MultiThreaded.crawl(links, timed(fetch, latencies), concurrency)
+        return len(details), len(failures), latencies
+
+    if engine == 'async':
+        import asyncio
+        import aiohttp
+        import AsyncCrawler
+
+        async def on_start(session, context, params):
+            context.start = time.perf_counter()
+
+        async def on_end(session, context, params):
+            latencies.append(time.perf_counter() - context.start)
+
+        trace = aiohttp.TraceConfig()
+        trace.on_request_start.append(on_start)
+        trace.on_request_end.append(on_end)
+        details, failures = asyncio.run(
+            AsyncCrawler.crawl(links, concurrency=concurrency, limit_per_host=concurrency, trace_configs=[trace]))
+        return len(details), len(failures), latencies
+
+    if engine == 'pipeline':
+        import ColorURL
+        import MultiThreaded
+        import Pipeline
+        ColorURL.BASE_URL = base_url + '/colors/{color}'
+        details, failures, _ = Pipeline.run_pipeline(
+            ColorURL.COLORS, ColorURL.get_color_links, timed(MultiThreaded.fetch_color_details, latencies),
+            detail_workers=concurrency)
+        return len(details), len(failures), latencies
+
+    raise ValueError(f"未知引擎: {engine}")
+
+
+def run_one(engine, base_url, pages, concurrency):
+    """子进程入口：测量墙钟时间、CPU与峰值内存，输出一行JSON"""
+    start = time.perf_counter()
+    cpu_start = time.process_time()
+    succeeded, failed, latencies = run_engine(engine, base_url, pages, concurrency)
+    wall = time.perf_counter() - start
+    cpu = time.process_time() - cpu_start
+
+    peak_rss = None
+    if resource:
+        cpu += resource.getrusage(resource.RUSAGE_CHILDREN).ru_utime  # 解析进程的CPU
+        cpu += resource.getrusage(resource.RUSAGE_CHILDREN).ru_stime
+        peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # Linux下单位为KB
+
+    p50, p99 = percentile(latencies, 50), percentile(latencies, 99)
+    return {
+        'engine': engine,
+        'concurrency': concurrency,
+        'pages': succeeded,
+        'failed': failed,
+        'seconds': round(wall, 3),
+        'pages_per_sec': round(succeeded / wall, 1) if wall else 0.0,
+        'p50_ms': round(p50 * 1000, 1) if p50 is not None else None,
+        'p99_ms': round(p99 * 1000, 1) if p99 is not None else None,
+        'cpu_seconds': round(cpu, 2),
+        'cpu_percent': round(cpu / wall * 100, 1) if wall else 0.0,
+        'peak_rss_mb': round(peak_rss, 1) if peak_rss else None,
+    }
+
+
+def _failure(name, output):
+    """子进程失败的说明：退出码加 stderr 末尾几行（通常是异常堆栈），同时打印出来"""
+    stderr = '\n'.join(output.stderr.strip().splitlines()[-STDERR_LINES:])
+    print(f"{name} 失败，退出码 {output.returncode}" + (f"：\n{stderr}" if stderr else ""), file=sys.stderr)
+    return f"退出码 {output.returncode}" + (f": {stderr.splitlines()[-1]}" if stderr else "")
+
+
+def run_subprocess(engine, base_url, pages, concurrency):
+    """每个引擎在独立子进程中运行，保证峰值内存互不影响"""
+    command = [sys.executable, os.path.abspath(__file__), '--run-one', engine, '--base-url', base_url,
+               '--pages', str(pages), '--concurrency', str(concurrency)]
+    output = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True,
+                            cwd=os.path.dirname(os.path.abspath(__file__)))
+    lines = output.stdout.strip().splitlines()
+    if output.returncode != 0 or not lines:
+        return {'engine': engine, 'concurrency': concurrency, 'error': _failure(engine, output)}
+    return json.loads(lines[-1])
+
+
+def measure_startup(module, runs=STARTUP_RUNS):
+    """在新解释器中导入 module 共 runs 次，返回导入耗时中位数/最小值（毫秒，已扣除空解释器启动）与加载的重型依赖"""
+    cwd = os.path.dirname(os.path.abspath(__file__))
+    code = (f"import sys, time; start = time.perf_counter(); import {module}; "
+            f"print(); print(time.perf_counter() - start); "
+            f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))")
+
+    def run(command):
+        start = time.perf_counter()
+        output = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, cwd=cwd)
+        return time.perf_counter() - start, output
+
+    bare = min(run([sys.executable, '-c', 'pass'])[0] for _ in range(runs))
+    walls, imports, loaded = [], [], ''
+    for _ in range(runs):
+        wall, output = run([sys.executable, '-c', code])
+        lines = output.stdout.splitlines()[-2:]  # 模块导入时可能自己有输出
+        if output.returncode != 0 or len(lines) < 2:
+            return {'module': module, 'error': _failure(module, output)}
+        walls.append(wall - bare)
+        imports.append(float(lines[0]))
+        loaded = lines[1]
+    return {
+        'module': module,
+        'import_ms': round(percentile(imports, 50) * 1000, 1),
+        'import_min_ms': round(min(imports) * 1000, 1),
+        'startup_ms': round(percentile(walls, 50) * 1000, 1),
+        'heavy_loaded': loaded or '-',
+    }
+
+
+def print_table(results):
+    columns = ['engine', 'concurrency', 'pages', 'failed', 'pages_per_sec', 'p50_ms', 'p99_ms',
+               'cpu_percent', 'peak_rss_mb']
+    print(' '.join(f'{c:>14}' for c in columns))
+    for result in results:
+        print(' '.join(f'{str(result.get(c, "-")):>14}' for c in columns))
+        if 'error' in result:
+            print(f"    {result['engine']} (并发 {result['concurrency']}) 出错: {result['error']}")
+
+
+def compare(results, baseline_path, tolerance):
+    """与基线比较吞吐量，返回退化的条目"""
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = {(r['engine'], r['concurrency']): r for r in json.load(f)['results']}
+    regressions = []
+    for result in results:
+        before = baseline.get((result['engine'], result['concurrency']))
+        if not before or 'pages_per_sec' not in before or 'pages_per_sec' not in result:
+            continue
+        if result['pages_per_sec'] < before['pages_per_sec'] * (1 - tolerance):
+            regressions.append((result['engine'], result['concurrency'],
+                                before['pages_per_sec'], result['pages_per_sec']))
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="对本地模拟站点跑各抓取引擎的基准")
+    parser.add_argument('--engines', nargs='+', default=ENGINES, choices=ENGINES)
+    parser.add_argument('--concurrency', type=int, nargs='+', default=CONCURRENCY_LEVELS)
+    parser.add_argument('--pages', type=int, default=PAGES)
+    parser.add_argument('--latency', type=float, default=20.0, help="模拟站点平均延迟(毫秒)")
+    parser.add_argument('--jitter', type=float, default=10.0, help="模拟站点延迟抖动(毫秒)")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="模拟站点503比例")
+    parser.add_argument('--page-kb', type=int, default=20, help="详情页填充大小(KB)")
+    parser.add_argument('--save', help="把结果保存为JSON")
+    parser.add_argument('--baseline', help="与之前保存的JSON对比，吞吐量退化时返回非0")
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE)
+    parser.add_argument('--startup', action='store_true', help="只测各脚本的导入/启动耗时（不启动模拟站点）")
+    parser.add_argument('--startup-modules', nargs='+', default=STARTUP_MODULES)
+    parser.add_argument('--runs', type=int, default=STARTUP_RUNS, help="启动耗时每个模块测量次数")
+    parser.add_argument('--run-one', help=argparse.SUPPRESS)
+    parser.add_argument('--base-url', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_one:
+        print(json.dumps(run_one(args.run_one, args.base_url, args.pages, args.concurrency[0])))
+        sys.exit()
+
+    if args.startup:
+        results = [measure_startup(module, args.runs) for module in args.startup_modules]
+        columns = ['module', 'import_ms', 'import_min_ms', 'startup_ms', 'heavy_loaded']
+        print(' '.join(f'{c:>16}' for c in columns))
+        for result in results:
+            print(' '.join(f'{str(result.get(c, "-")):>16}' for c in columns))
+            if 'error' in result:
+                print(f"    {result['module']} 出错: {result['error']}")
+        if args.save:
+            with open(args.save, 'w', encoding='utf-8') as f:
+                json.dump({'startup': results}, f, ensure_ascii=False, indent=2)
+            print(f"已保存启动耗时到{args.save}")
+        sys.exit()
+
+    server, base_url = FakeSite.start(pages=args.pages, latency=args.latency, jitter=args.jitter,
+                                      error_rate=args.error_rate, page_kb=args.page_kb)
+    results = []
+    for engine in args.engines:
+        # 单线程版本没有并发度可调
+        for concurrency in ([1] if engine == 'single' else args.concurrency):
+            print(f"运行 {engine} (并发 {concurrency}) ...")
+            results.append(run_subprocess(engine, base_url, args.pages, concurrency))
+    server.shutdown()
+
+    print_table(results)
+    if args.save:
+        config = {k: getattr(args, k) for k in ('pages', 'latency', 'jitter', 'error_rate', 'page_kb')}
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump({'config': config, 'results': results}, f, ensure_ascii=False, indent=2)
+        print(f"已保存基准结果到{args.save}")
+    if args.baseline:
+        regressions = compare(results, args.baseline, args.tolerance)
+        for engine, concurrency, before, after in regressions:
+            print(f"性能退化: {engine} (并发 {concurrency}) {before} -> {after} 页/秒")
+        if regressions:
+            sys.exit(1)
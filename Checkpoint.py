@@ -0,0 +1,104 @@
+import json
+import os
+import threading
+
+import LazyImport
+
+openpyxl = LazyImport.module('openpyxl')
+
+# 常量配置
+JOURNAL_PATH = 'color_details.jsonl'
+
+
+class Journal:
+    """追加写入的JSONL断点日志，每完成一个URL立即落盘"""
+
+    def __init__(self, path=JOURNAL_PATH, append=True):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, 'a' if append else 'w', encoding='utf-8')
+
+    def _write(self, record):
+        line = json.dumps(record, ensure_ascii=False) + '\n'
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+
+    def record_success(self, url, details):
+        self._write({'url': url, 'ok': True, 'details': details})
+
+    def record_failure(self, url, error_type, error_msg):
+        self._write({'url': url, 'ok': False, 'error_type': error_type, 'error': error_msg})
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+def has_records(path=JOURNAL_PATH):
+    """断点日志是否已存在且非空（此时不带 --resume 的新运行会把它清空）"""
+    try:
+        return os.path.getsize(path) > 0
+    except OSError:
+        return False
+
+
+def load_journal(path=JOURNAL_PATH):
+    """读取断点日志，返回 (all_details, failed_urls)；同一URL以最后一条记录为准"""
+    records = {}
+    try:
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # 崩溃时写了一半的行
+                records[record['url']] = record
+    except FileNotFoundError:
+        pass
+
+    all_details = {}
+    failed_urls = []
+    for url, record in records.items():
+        if record['ok']:
+            all_details[url] = record['details']
+        else:
+            failed_urls.append((url, record['error_type'], record['error']))
+    return all_details, failed_urls
+
+
+def load_failed_from_excel(file_path='color_details.xlsx'):
+    """读取"失败记录"工作表中的URL（遇到空行即为统计区，停止）"""
+    try:
+        wb = openpyxl.load_workbook(file_path, read_only=True)
+        if "失败记录" not in wb.sheetnames:
+            return []
+        urls = []
+        for row in wb["失败记录"].iter_rows(min_row=2, values_only=True):
+            if not row or not row[0]:
+                break
+            urls.append(row[0])
+        wb.close()
+        return urls
+    except Exception as e:
+        print(f"读取失败记录失败: {str(e)}")
+        return []
+
+
+def load_details_from_excel(file_path='color_details.xlsx'):
+    """读取"颜色代码"工作表中已成功的数据，返回 {url: 详情字典}"""
+    try:
+        wb = openpyxl.load_workbook(file_path, read_only=True)
+        if "颜色代码" not in wb.sheetnames:
+            return {}
+        rows = wb["颜色代码"].iter_rows(values_only=True)
+        headers = next(rows, None) or []
+        all_details = {}
+        for row in rows:
+            if row[1]:
+                all_details[row[1]] = dict(zip(headers[2:], row[2:]))
+        wb.close()
+        return all_details
+    except Exception as e:
+        print(f"读取已有数据失败: {str(e)}")
+        return {}
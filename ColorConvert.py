@@ -0,0 +1,177 @@
+from __future__ import annotations  # 注解不求值，numpy 推迟到首次计算时导入
+
+import argparse
+import csv
+import re
+
+import Checkpoint
+import LazyImport
+
+np = LazyImport.module('numpy')
+
+# 可由 Hex Code 本地计算的字段
+DERIVED_FIELDS = ('RGB Values', 'CMYK Values', 'HSV/HSB Values')
+COLUMNS = ('R', 'G', 'B', 'C', 'M', 'Y', 'K', 'H', 'S', 'V')
+TOLERANCE = 1.0  # 与抓取值比较时允许的取整误差
+
+_NUMBER = re.compile(r'-?\d+(?:\.\d+)?')
+_HEX = re.compile(r'#?([0-9A-Fa-f]{6}|[0-9A-Fa-f]{3})')
+
+
+def hex_digits(hex_code):
+    """'#RRGGBB' / '#RGB'（可省略#）统一为6位十六进制 'RRGGBB'，不是合法Hex时为 None"""
+    match = _HEX.fullmatch(str(hex_code or '').strip())
+    if not match:
+        return None
+    digits = match.group(1)
+    return ''.join(c * 2 for c in digits) if len(digits) == 3 else digits
+
+
+def hex_to_rgb(hex_codes) -> np.ndarray:
+    """一批 Hex 转为 (n, 3) 的 float64 数组（0-255）；无法识别的 Hex 对应行为 NaN，不影响其余行"""
+    codes = [hex_digits(code) for code in hex_codes]
+    rgb = np.full((len(codes), 3), np.nan)
+    valid = [i for i, digits in enumerate(codes) if digits]
+    if valid:
+        data = bytes.fromhex(''.join(codes[i] for i in valid))
+        rgb[valid] = np.frombuffer(data, dtype=np.uint8).reshape(-1, 3)
+    return rgb
+
+
+def rgb_to_cmyk(rgb) -> np.ndarray:
+    """(n, 3) RGB 转为 (n, 4) CMYK 百分比"""
+    rgb = np.asarray(rgb, dtype=np.float64) / 255
+    k = 1 - rgb.max(axis=1)
+    scale = np.where(k < 1, 1 - k, 1.0)  # 纯黑时 C/M/Y 为0
+    cmy = (1 - rgb - k[:, None]) / scale[:, None]
+    return np.column_stack((cmy, k)) * 100
+
+
+def rgb_to_hsv(rgb) -> np.ndarray:
+    """(n, 3) RGB 转为 (n, 3) 的 H(度)、S(%)、V(%)"""
+    rgb = np.asarray(rgb, dtype=np.float64) / 255
+    r, g, b = rgb.T
+    v = rgb.max(axis=1)
+    delta = v - rgb.min(axis=1)
+    s = np.divide(delta, v, out=np.zeros_like(v), where=v > 0)
+
+    safe = np.where(delta > 0, delta, 1.0)
+    h = np.select([delta == 0, v == r, v == g],
+                  [0.0, ((g - b) / safe) % 6, (b - r) / safe + 2],
+                  (r - g) / safe + 4) * 60
+    return np.column_stack((h, s * 100, v * 100))
+
+
+def convert(hex_codes) -> dict:
+    """一批 Hex 转为数值列（float64），无效 Hex 的行全为 NaN"""
+    rgb = hex_to_rgb(hex_codes)
+    values = np.column_stack((rgb, rgb_to_cmyk(rgb), rgb_to_hsv(rgb)))
+    return {name: values[:, i] for i, name in enumerate(COLUMNS)}
+
+
+def format_fields(hex_codes) -> list[dict]:
+    """按网站的格式生成 RGB/CMYK/HSV 字符串，每个 Hex 一个字典；无效 Hex 对应 None"""
+    columns = convert(hex_codes)
+    valid = ~np.isnan(columns['R'])
+    rounded = {name: np.rint(np.nan_to_num(values)).astype(np.int64) for name, values in columns.items()}
+    rounded['H'] %= 360
+    return [{
+        'RGB Values': f"({r}, {g}, {b})",
+        'CMYK Values': f"({c}%, {m}%, {y}%, {k}%)",
+        'HSV/HSB Values': f"{h}°, {s}%, {v}%",
+    } if ok else None for ok, r, g, b, c, m, y, k, h, s, v
+        in zip(valid.tolist(), *(rounded[name].tolist() for name in COLUMNS))]
+
+
+class Deriving:
+    """包装解析函数：页面上只提取不能计算的字段，RGB/CMYK/HSV 由 Hex 本地计算（可交给解析进程）
+
+    传入 ral_index（RalIndex.RalIndex）时 Closest RAL / RAL 也由本地色卡计算，页面上只需要 Hex。
+    """
+
+    def __init__(self, parse, fields, ral_index=None):
+        self.parse = parse
+        self.fields = fields
+        self.ral_index = ral_index
+        derived = DERIVED_FIELDS + (('Closest RAL', 'RAL') if ral_index else ())
+        self.scraped = tuple(field for field in fields if field not in derived)
+
+    def __call__(self, content):
+        values = self.parse(content, fields=self.scraped)
+        derived = format_fields([values['Hex Code']])[0]
+        if derived is None:
+            raise ValueError(f"无效的Hex格式: {values['Hex Code']}")
+        values.update(derived)
+        if self.ral_index:
+            values['Closest RAL'] = values['RAL'] = self.ral_index.lookup([values['Hex Code']])[0]
+        return {field: values[field] for field in self.fields}
+
+
+def verify(all_details, tolerance=TOLERANCE) -> list[tuple]:
+    """比较抓取到的字符串与由 Hex 计算的值，返回 [(url, 字段, 抓取值, 计算值)]"""
+    urls = [url for url, details in all_details.items() if details.get('Hex Code')]
+    if not urls:
+        return []
+    columns = convert([all_details[url]['Hex Code'] for url in urls])
+    expected = {
+        'RGB Values': np.column_stack([columns[name] for name in 'RGB']),
+        'CMYK Values': np.column_stack([columns[name] for name in 'CMYK']),
+        'HSV/HSB Values': np.column_stack([columns[name] for name in 'HSV']),
+    }
+    derived = format_fields([all_details[url]['Hex Code'] for url in urls])
+
+    mismatches = []
+    for field, values in expected.items():
+        width = values.shape[1]
+        scraped = np.full(values.shape, np.nan)
+        for i, url in enumerate(urls):
+            numbers = _NUMBER.findall(str(all_details[url].get(field) or ''))
+            if len(numbers) == width:
+                scraped[i] = [float(n) for n in numbers]
+        diff = np.abs(scraped - values)
+        if field == 'HSV/HSB Values':
+            diff[:, 0] = np.minimum(diff[:, 0], 360 - diff[:, 0])  # 色相 0° 与 360° 相同
+        bad = ~(diff <= tolerance).all(axis=1)  # 解析不出数字（NaN）也算不一致
+        for i in np.flatnonzero(bad):
+            mismatches.append((urls[i], field, all_details[urls[i]].get(field), (derived[i] or {}).get(field)))
+    return mismatches
+
+
+def load_details(path):
+    """按扩展名读取已抓取的结果（jsonl 断点日志或 xlsx）"""
+    if path.endswith('.jsonl'):
+        return Checkpoint.load_journal(path)[0]
+    return Checkpoint.load_details_from_excel(path)
+
+
+def write_columns(path, all_details):
+    """把每个URL的数值列写成CSV"""
+    urls = [url for url, details in all_details.items() if details.get('Hex Code')]
+    columns = convert([all_details[url]['Hex Code'] for url in urls])
+    with open(path, 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.writer(f)
+        writer.writerow(('URL', 'Hex Code') + COLUMNS)
+        rows = zip(*(np.round(columns[name], 2).tolist() for name in COLUMNS))
+        for url, row in zip(urls, rows):
+            row = tuple('' if value != value else value for value in row)  # 无效 Hex 的数值列留空
+            writer.writerow((url, all_details[url]['Hex Code']) + row)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="由 Hex Code 计算 RGB/CMYK/HSV，并与抓取值核对")
+    parser.add_argument('input', nargs='?', default='color_details.xlsx', help="抓取结果（xlsx 或 jsonl 断点日志）")
+    parser.add_argument('--verify', action='store_true', help="报告抓取值与计算值不一致的记录")
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE)
+    parser.add_argument('--columns', help="把数值列写成CSV")
+    args = parser.parse_args()
+
+    all_details = load_details(args.input)
+    print(f"读取{len(all_details)}条记录")
+    if args.columns:
+        write_columns(args.columns, all_details)
+        print(f"已保存数值列到{args.columns}")
+    if args.verify:
+        mismatches = verify(all_details, args.tolerance)
+        for url, field, scraped, derived in mismatches:
+            print(f"  {url} {field}: 抓取 {scraped} / 计算 {derived}")
+        print(f"核对{len(all_details)}条，不一致{len(mismatches)}处")
@@ -1,13 +1,20 @@
-import requests
-from requests.adapters import HTTPAdapter
+import argparse
+import functools
 from lxml import etree
-from openpyxl import Workbook
-from fake_useragent import UserAgent
+
+import Archive
+import Discovery
+import Frontier
+import HttpCache
+import HttpSession
+import LazyImport
+import UserAgents
+
+openpyxl = LazyImport.module('openpyxl')
 
 # 常量配置
 BASE_URL = 'https://www.color-name.com/colors/{color}'  # 修正URL格式
 EXCEL_PATH = 'color_links.xlsx'
-HEADERS = {'User-Agent': UserAgent().random}
 
 COLORS = [
     'blue', 'teal', 'green', 'yellow', 'orange', 'red', 'pink', 'purple',
@@ -16,25 +23,20 @@ COLORS = [
 ]
 
 
-def get_color_links(color: str, max_retries: int = 3) -> list[str]:
-    """根据颜色名称生成动态URL并抓取链接"""
-    session = requests.Session()
-    session.mount('https://', HTTPAdapter(max_retries=max_retries))
+# 方案1：绝对路径
+LINKS = etree.XPath('/html/body/div[2]/div/ul//a/@href')
+# 方案2：属性过滤（假设父级div有class="main-content"）
+# LINKS = etree.XPath('//div[@class="main-content"]/div/ul//a/@href')
+STOP_AFTER = '/html/body/div[2]'  # 链接列表与翻页链接所在的div，--early-stop 时读到它结束即停止下载
 
+
+def get_color_links(color: str, max_retries: int = 3, stop_after: str = None) -> list[str]:
+    """根据颜色名称生成动态URL并抓取链接（有下一页时继续翻页）"""
     try:
         # 动态生成URL
         url = BASE_URL.format(color=color.lower())
-        response = session.get(url, headers=HEADERS, timeout=10)
-        response.raise_for_status()
-        tree = etree.HTML(response.content)
-
-
-        # 方案1：绝对路径
-        links = tree.xpath('/html/body/div[2]/div/ul//a/@href')
-        # 方案2：属性过滤（假设父级div有class="main-content"）
-        # links = tree.xpath('//div[@class="main-content"]/div/ul//a/@href')
-
-        return links if links else []
+        return Discovery.fetch_pages(url, LINKS, headers=UserAgents.headers(), max_retries=max_retries,
+                                     stop_after=stop_after)
     except Exception as e:
         print(f"Error fetching {color}: {e}")
         return []
@@ -42,9 +44,9 @@ def get_color_links(color: str, max_retries: int = 3) -> list[str]:
 
 def save_to_excel(all_links: list[str]) -> None:
     """去重后保存到Excel（优化写入性能）"""
-    unique_links = list(dict.fromkeys(all_links))  # 去重保留顺序
+    unique_links = Frontier.dedupe(all_links)  # 按规范化的键去重，保留首次出现的原始URL及顺序
 
-    wb = Workbook()
+    wb = openpyxl.Workbook()
     ws = wb.active
     ws.title = "颜色链接"
     ws.append(['序号', '颜色链接'])
@@ -58,17 +60,30 @@ def save_to_excel(all_links: list[str]) -> None:
 
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="抓取各颜色分类下的颜色链接")
+    parser.add_argument('--workers', type=int, default=Discovery.WORKERS, help="同时抓取的分类页数量")
+    parser.add_argument('--frontier', help="持久化URL前沿（SQLite），跨运行去重，只保存新发现的链接")
+    parser.add_argument('--early-stop', action='store_true', help="链接列表读完就停止下载页面其余部分")
+    HttpCache.add_cache_arguments(parser)
+    Archive.add_archive_arguments(parser)
+    args = parser.parse_args()
+    HttpCache.enable_from_args(args)
+    Archive.enable_from_args(args)
+
     all_links = []
 
-    # 遍历所有颜色
-    for color in COLORS:
-        print(f"正在抓取 {color}...")
-        links = get_color_links(color)
-        if links:
-            all_links.extend(links)
+    # 并发抓取所有颜色，链接按批返回（已去重）
+    frontier = Frontier.Frontier(args.frontier) if args.frontier else None
+    get_links = functools.partial(get_color_links, stop_after=STOP_AFTER if args.early_stop else None)
+    for batch in Discovery.discover(COLORS, get_links, workers=args.workers, frontier=frontier):
+        all_links.extend(batch)
+    if frontier is not None:
+        print(f"URL前沿共{len(frontier)}条，本次新增{len(all_links)}条")
+        frontier.close()
 
     if all_links:
         save_to_excel(all_links)
-        print(f"已保存{len(all_links)}条数据到{EXCEL_PATH}（去重后{len(set(all_links))}条）")
+        print(f"已保存{len(all_links)}条数据到{EXCEL_PATH}")
     else:
-        print("未获取到有效链接")
\ No newline at end of file
+        print("未获取到有效链接")
+    HttpSession.print_reuse_stats()
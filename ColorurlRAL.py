@@ -1,21 +1,28 @@
-import requests
-from requests.adapters import HTTPAdapter
+import argparse
+import functools
+
 from lxml import etree
-from openpyxl import Workbook
-from fake_useragent import UserAgent
-from openpyxl import load_workbook
+
+import Archive
+import Discovery
+import Frontier
+import HttpSession
+import LazyImport
+import UserAgents
+
+openpyxl = LazyImport.module('openpyxl')
 
 # 常量配置
 BASE_URL = 'https://www.color-name.com/search/{color}'
 EXCEL_PATH = 'colorRal_links.xlsx'
 EXCEL_COLORS_PATH = 'colorral.xlsx'
-HEADERS = {'User-Agent': UserAgent().random}
+SEARCH_HITS = 1  # 每个名称取前几个搜索结果，0为全部
 
 
 def load_colors_from_excel(file_path: str) -> list[str]:
     """从 Excel 文件中提取颜色名称列表"""
     try:
-        wb = load_workbook(file_path)
+        wb = openpyxl.load_workbook(file_path)
         ws = wb.active
         colors = []
         for row in ws.iter_rows(min_row=1, values_only=True):
@@ -28,23 +35,26 @@ def load_colors_from_excel(file_path: str) -> list[str]:
         return []
 
 
-COLORS = load_colors_from_excel(EXCEL_COLORS_PATH)
+def __getattr__(name):
+    # COLORS 在首次访问时才读取Excel，只导入模块（如 Pipeline 的 --ral 之外的路径）不加载 openpyxl
+    if name == 'COLORS':
+        globals()['COLORS'] = load_colors_from_excel(EXCEL_COLORS_PATH)
+        return globals()['COLORS']
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
-def get_color_links(color: str, max_retries: int = 3) -> list[str]:
-    """根据颜色名称生成动态URL并抓取链接"""
-    session = requests.Session()
-    session.mount('https://', HTTPAdapter(max_retries=max_retries))
+# 搜索结果列表中的链接
+LINKS = etree.XPath('/html/body/div[2]/ul/li/a/@href')
+STOP_AFTER = '/html/body/div[2]'  # 搜索结果列表所在的div，--early-stop 时读到它结束即停止下载
 
+
+def get_color_links(color: str, max_retries: int = 3, max_hits: int = SEARCH_HITS,
+                    stop_after: str = None) -> list[str]:
+    """根据颜色名称搜索并抓取前 max_hits 个结果的链接（0为全部，含翻页）"""
     try:
         url = BASE_URL.format(color=color.lower())
-        response = session.get(url, headers=HEADERS, timeout=10)
-        response.raise_for_status()
-        tree = etree.HTML(response.content)
-
-        # 修改后的XPath：提取href属性
-        links = tree.xpath('/html/body/div[2]/ul/li[1]/a/@href')  # 添加/@href
-        return links if links else []
+        return Discovery.fetch_pages(url, LINKS, headers=UserAgents.headers(), max_retries=max_retries,
+                                     limit=max_hits, stop_after=stop_after)
     except Exception as e:
         print(f"Error fetching {color}: {e}")
         return []
@@ -52,9 +62,9 @@ def get_color_links(color: str, max_retries: int = 3) -> list[str]:
 
 def save_to_excel(all_links: list[str]) -> None:
     """去重后保存到Excel"""
-    unique_links = list(dict.fromkeys(all_links))  # 去重保留顺序
+    unique_links = Frontier.dedupe(all_links)  # 按规范化的键去重，保留首次出现的原始URL及顺序
 
-    wb = Workbook()
+    wb = openpyxl.Workbook()
     ws = wb.active
     ws.title = "颜色链接"
     ws.append(['序号', '颜色链接'])
@@ -67,20 +77,34 @@ def save_to_excel(all_links: list[str]) -> None:
 
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="按 colorral.xlsx 中的名称搜索颜色链接")
+    parser.add_argument('--workers', type=int, default=Discovery.WORKERS, help="同时进行的搜索数量")
+    parser.add_argument('--frontier', help="持久化URL前沿（SQLite），跨运行去重，只保存新发现的链接")
+    parser.add_argument('--hits', type=int, default=SEARCH_HITS, help="每个名称取前几个搜索结果，0为全部")
+    parser.add_argument('--early-stop', action='store_true', help="结果列表读完就停止下载页面其余部分")
+    Archive.add_archive_arguments(parser)
+    args = parser.parse_args()
+    Archive.enable_from_args(args)
+
+    COLORS = load_colors_from_excel(EXCEL_COLORS_PATH)
     if not COLORS:
         print("颜色列表为空，请检查 Excel 文件！")
         exit()
 
     all_links = []
 
-    for color in COLORS:
-        print(f"正在抓取 {color}...")
-        links = get_color_links(color)
-        if links:
-            all_links.extend(links)
+    get_links = functools.partial(get_color_links, max_hits=args.hits,
+                                  stop_after=STOP_AFTER if args.early_stop else None)
+    frontier = Frontier.Frontier(args.frontier) if args.frontier else None
+    for batch in Discovery.discover(COLORS, get_links, workers=args.workers, frontier=frontier):
+        all_links.extend(batch)
+    if frontier is not None:
+        print(f"URL前沿共{len(frontier)}条，本次新增{len(all_links)}条")
+        frontier.close()
 
     if all_links:
         save_to_excel(all_links)
-        print(f"已保存{len(all_links)}条数据到{EXCEL_PATH}（去重后{len(set(all_links))}条）")
+        print(f"已保存{len(all_links)}条数据到{EXCEL_PATH}")
     else:
-        print("未获取到有效链接")
\ No newline at end of file
+        print("未获取到有效链接")
+    HttpSession.print_reuse_stats()
@@ -0,0 +1,185 @@
+import asyncio
+import functools
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+import requests
+
+# 常量配置
+INITIAL_LEVEL = 4
+MIN_LEVEL = 1
+MAX_LEVEL = 32
+LATENCY_TARGET = 3.0  # 单个请求超过该耗时（秒）就不再加并发
+DECREASE_FACTOR = 0.5  # 被限流时并发度乘以该系数
+COOLDOWN = 2.0  # 两次减小并发之间的最短间隔（秒），避免一波错误把并发压到底
+
+
+def parse_retry_after(headers):
+    """解析 Retry-After（秒数或HTTP日期），返回等待秒数"""
+    value = headers.get('Retry-After') if headers else None
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def classify(error):
+    """判断异常是否为限流/过载信号（429、5xx、超时），返回 (是否退避, Retry-After秒数)"""
+    # 抓取函数会把原始异常包装后重新抛出，这里沿 __cause__ 链查找
+    while error is not None:
+        if isinstance(error, (requests.Timeout, asyncio.TimeoutError)):
+            return True, None
+        response = getattr(error, 'response', None)
+        status = getattr(response, 'status_code', None) or getattr(error, 'status', None)
+        if isinstance(status, int) and (status == 429 or status >= 500):
+            headers = getattr(response, 'headers', None) or getattr(error, 'headers', None)
+            return True, parse_retry_after(headers)
+        error = error.__cause__
+    return False, None
+
+
+class _Aimd:
+    """加性增、乘性减的并发度控制（AIMD），记录并发度随时间的变化"""
+
+    def __init__(self, initial=INITIAL_LEVEL, minimum=MIN_LEVEL, maximum=MAX_LEVEL,
+                 latency_target=LATENCY_TARGET, decrease=DECREASE_FACTOR, cooldown=COOLDOWN,
+                 log_path=None):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.latency_target = latency_target
+        self.decrease = decrease
+        self.cooldown = cooldown
+        self.level = float(min(max(initial, minimum), maximum))
+        self.history = []  # [(运行秒数, 并发度, 原因)]
+        self._in_flight = 0
+        self._paused_until = 0.0
+        self._last_decrease = 0.0
+        self._start = time.monotonic()
+        self._log = open(log_path, 'w', encoding='utf-8') if log_path else None
+        if self._log:
+            self._log.write('seconds,level,reason\n')
+        self._record('start')
+
+    @property
+    def limit(self):
+        return int(self.level)
+
+    def _record(self, reason):
+        entry = (round(time.monotonic() - self._start, 3), self.limit, reason)
+        self.history.append(entry)
+        if self._log:
+            self._log.write(f'{entry[0]},{entry[1]},{entry[2]}\n')
+            self._log.flush()
+
+    def _update(self, latency, error):
+        before = self.limit
+        throttled, retry_after = classify(error)
+        now = time.monotonic()
+        if throttled:
+            if retry_after:
+                self._paused_until = max(self._paused_until, now + retry_after)
+            if now - self._last_decrease >= self.cooldown:
+                self.level = max(self.minimum, self.level * self.decrease)
+                self._last_decrease = now
+                if self.limit != before:
+                    self._record(type(error).__name__)
+        elif error is None and latency <= self.latency_target:
+            # 每完成约 level 个健康请求，并发度 +1
+            self.level = min(self.maximum, self.level + 1 / self.level)
+            if self.limit != before:
+                self._record('healthy')
+
+    def _pause_remaining(self):
+        return self._paused_until - time.monotonic()
+
+    def close(self):
+        if self._log:
+            self._log.close()
+            self._log = None
+
+    def summary(self):
+        levels = [level for _, level, _ in self.history]
+        return f"并发度调整{len(self.history) - 1}次，最低{min(levels)}，最高{max(levels)}，最终{self.limit}"
+
+
+class AimdController(_Aimd):
+    """线程池使用的自适应并发控制"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        with self._cond:
+            while True:
+                wait = self._pause_remaining()
+                if wait > 0:
+                    self._cond.wait(wait)  # 遵守 Retry-After
+                elif self._in_flight < self.limit:
+                    break
+                else:
+                    self._cond.wait()
+            self._in_flight += 1
+
+    def release(self, latency, error=None):
+        with self._cond:
+            self._in_flight -= 1
+            self._update(latency, error)
+            self._cond.notify_all()
+
+
+class AsyncAimdController(_Aimd):
+    """asyncio 使用的自适应并发控制（仅在事件循环线程内调用）"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._changed = asyncio.Event()
+
+    async def acquire(self):
+        while True:
+            wait = self._pause_remaining()
+            if wait <= 0 and self._in_flight < self.limit:
+                break
+            self._changed.clear()
+            try:
+                await asyncio.wait_for(self._changed.wait(), timeout=wait if wait > 0 else None)
+            except asyncio.TimeoutError:
+                pass
+        self._in_flight += 1
+
+    def release(self, latency, error=None):
+        self._in_flight -= 1
+        self._update(latency, error)
+        self._changed.set()
+
+
+def throttled(fetch, controller):
+    """包装抓取函数：执行前向控制器申请并发名额，结束后反馈耗时与异常"""
+
+    @functools.wraps(fetch)
+    def wrapper(url):
+        controller.acquire()
+        start = time.monotonic()
+        try:
+            result = fetch(url)
+        except Exception as e:
+            controller.release(time.monotonic() - start, e)
+            raise
+        controller.release(time.monotonic() - start)
+        return result
+
+    return wrapper
+
+
+def add_adaptive_arguments(parser):
+    """为脚本添加自适应并发相关的命令行参数"""
+    parser.add_argument('--adaptive', action='store_true', help="根据延迟和限流信号自动调节并发度（AIMD）")
+    parser.add_argument('--max-concurrency', type=int, default=MAX_LEVEL, help="自适应并发度上限")
+    parser.add_argument('--concurrency-log', help="记录并发度变化的CSV文件")
@@ -0,0 +1,81 @@
+import concurrent.futures
+from urllib.parse import urljoin
+
+from lxml import etree
+
+import Extractor
+import Frontier
+import HttpSession
+import LazyImport
+
+tqdm = LazyImport.module('tqdm')
+
+# 常量配置
+WORKERS = 8  # 同时抓取的分类页/搜索页数量
+BATCH_SIZE = 200  # 每凑够多少条新链接就向下游交付一批
+MAX_PAGES = 50  # 每个分类最多翻多少页，防止翻页链接成环
+
+_NEXT_PAGE = etree.XPath('//link[@rel="next"]/@href | //a[@rel="next"]/@href')
+
+
+def fetch_pages(url, extract, headers=None, max_retries=3, limit=0, max_pages=MAX_PAGES, stop_after=None):
+    """从 url 开始沿 rel="next" 翻页，返回各页 extract(tree) 提取到的链接；limit>0 时取够即停
+
+    传入 stop_after（元素路径，如 '/html/body/div[2]'）时该元素一结束就停止下载页面其余部分，
+    链接列表与翻页链接都须在它之内（或之前）。
+    """
+    links = []
+    visited = set()
+    while url and url not in visited and len(visited) < max_pages:
+        visited.add(url)
+        until = Extractor.PathWatcher(stop_after) if stop_after else None
+        response = HttpSession.fetch(url, headers=headers, timeout=10,
+                                     max_retries=max_retries, parsed_key='page', until=until)
+        response.raise_for_status()
+        page = response.parsed  # 页面未变化（304）时直接用上次的解析结果
+        if page is None:
+            tree = etree.HTML(response.content)
+            next_page = _NEXT_PAGE(tree)
+            page = {
+                'links': [urljoin(url, str(link)) for link in extract(tree)],
+                'next': urljoin(url, str(next_page[0])) if next_page else None,
+            }
+            HttpSession.store_parsed(url, 'page', page)
+        links.extend(page['links'])
+        if limit and len(links) >= limit:
+            return links[:limit]
+        url = page['next']
+    return links
+
+
+def discover(colors, get_links, workers=WORKERS, batch_size=BATCH_SIZE, progress=True, frontier=None):
+    """用有界线程池并发抓取各颜色的链接，按 Frontier.normalize() 的键去重后按批产出（每批为新链接的原始URL列表）
+
+    传入 frontier（Frontier.Frontier）时经其磁盘索引去重，已在前沿中的链接（含以前运行发现的）不再产出。
+    """
+    seen = set()
+    batch = []
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=workers)
+    pbar = tqdm.tqdm(total=len(colors), desc="发现链接", unit="个", disable=not progress)
+    try:
+        futures = [executor.submit(get_links, color) for color in colors]
+        for future in concurrent.futures.as_completed(futures):
+            pbar.update(1)
+            links = future.result()
+            if frontier is not None:
+                batch.extend(frontier.add(links))
+            else:
+                for link in links:
+                    key = Frontier.normalize(link)
+                    if key not in seen:
+                        seen.add(key)
+                        batch.append(link)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+    finally:
+        # 下游提前停止时不再发出剩余的请求
+        executor.shutdown(wait=True, cancel_futures=True)
+        pbar.close()
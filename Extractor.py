@@ -0,0 +1,69 @@
+from lxml import etree
+
+# 预编译的XPath，只编译一次
+_ROWS = etree.XPath('//tr[td[@class="left"]]')
+_STRING = etree.XPath('string()')
+
+
+def extract_table(tree) -> dict:
+    """单次遍历 td.left/td.right 行，返回 {标签: 值}（同名标签取第一个）"""
+    table = {}
+    if tree is None:
+        return table
+
+    for row in _ROWS(tree):
+        item = _row_item(row)
+        if item is not None:
+            table.setdefault(*item)
+    return table
+
+
+def _row_item(row):
+    """一行 td.left/td.right 的 (标签, 值)，不是标签行时为 None"""
+    left = right = None
+    for td in row.iterchildren('td'):
+        cls = td.get('class')
+        if cls == 'left' and left is None:
+            left = td
+        elif cls == 'right' and right is None:
+            right = td
+    if left is None or right is None:
+        return None
+    return ' '.join(_STRING(left).split()), _STRING(right).strip()
+
+
+def extract_fields(tree, fields) -> dict:
+    """一次性提取指定字段（标签去除多余空白后须与字段名完全相同），缺失的字段值为 None"""
+    table = extract_table(tree)
+    return {field: table.get(field) for field in fields}
+
+
+class LabelWatcher:
+    """边下载边增量解析表格行，字段都已找到时通知停止下载（HttpSession.fetch 的 until）"""
+
+    def __init__(self, fields):
+        self.fields = frozenset(fields)
+        self._found = set()
+        self._parser = etree.HTMLPullParser(events=('end',), tag='tr')
+
+    def feed(self, chunk) -> bool:
+        self._parser.feed(chunk)
+        for _, element in self._parser.read_events():
+            item = _row_item(element)
+            if item is not None and item[0] in self.fields:
+                self._found.add(item[0])
+        return self._found == self.fields
+
+
+class PathWatcher:
+    """边下载边增量解析，路径为 path 的元素（如 '/html/body/div[2]'）结束时通知停止下载"""
+
+    def __init__(self, path):
+        self.path = path
+        tag = path.rsplit('/', 1)[-1].split('[')[0]
+        self._parser = etree.HTMLPullParser(events=('end',), tag=tag)
+
+    def feed(self, chunk) -> bool:
+        self._parser.feed(chunk)
+        return any(element.getroottree().getpath(element) == self.path
+                   for _, element in self._parser.read_events())
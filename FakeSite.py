@@ -0,0 +1,195 @@
+import argparse
+import colorsys
+import http.server
+import random
+import sys
+import threading
+import time
+from urllib.parse import parse_qs, unquote, urlsplit
+
+# 常量配置
+PAGES = 5000  # 颜色详情页数量
+LINKS_PER_CATEGORY = 200  # 每个分类列出的链接数
+LINKS_PER_PAGE = 50  # 分类页每页的链接数，超出部分翻页（rel="next"）
+RAL_NAMES = ['1001 [Beige]', '3020 [Traffic red]', '5015 [Sky blue]', '6018 [Yellow green]',
+             '7035 [Light grey]', '8017 [Chocolate brown]', '9005 [Jet black]', '9010 [Pure white]']
+
+DETAIL_PAGE = '''<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{name}</title></head>
+<body><div class="header"><a href="/">color-name</a></div>
+<div class="main-content"><h1>{name}</h1>
+<table class="color-table">
+<tr><td class="left">Hex Code</td><td class="right">{hex}</td></tr>
+<tr><td class="left">RGB Values</td><td class="right">({r}, {g}, {b})</td></tr>
+<tr><td class="left">CMYK Values</td><td class="right">({c}%, {m}%, {y}%, {k}%)</td></tr>
+<tr><td class="left">HSV/HSB Values</td><td class="right">{h}°, {s}%, {v}%</td></tr>
+<tr><td class="left">Closest RAL</td><td class="right">{ral}</td></tr>
+<tr><td class="left">RAL</td><td class="right">{ral}</td></tr>
+</table>
+{filler}</div></body></html>'''
+
+LIST_PAGE = '''<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{title}</title></head>
+<body><div class="header"><a href="/">color-name</a></div>
+<div class="main-content"><div><ul>
+{items}
+</ul></div>{next_page}</div></body></html>'''
+
+SEARCH_PAGE = '''<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{title}</title></head>
+<body><div class="header"><a href="/">color-name</a></div>
+<div class="main-content"><ul>
+{items}
+</ul></div></body></html>'''
+
+
+def color_values(index):
+    """按序号生成确定的颜色，各字段格式与 color-name.com 一致"""
+    rgb = (index * 2654435761) & 0xFFFFFF
+    r, g, b = rgb >> 16, (rgb >> 8) & 0xFF, rgb & 0xFF
+    k = 1 - max(r, g, b) / 255
+    if k < 1:
+        c, m, y = ((1 - x / 255 - k) / (1 - k) for x in (r, g, b))
+    else:
+        c = m = y = 0
+    h, s, v = colorsys.rgb_to_hsv(r / 255, g / 255, b / 255)
+    return {
+        'name': f'color-{index}', 'hex': f'#{rgb:06X}', 'r': r, 'g': g, 'b': b,
+        'c': round(c * 100), 'm': round(m * 100), 'y': round(y * 100), 'k': round(k * 100),
+        'h': round(h * 360), 's': round(s * 100), 'v': round(v * 100),
+        'ral': RAL_NAMES[index % len(RAL_NAMES)],
+    }
+
+
+class FakeSiteHandler(http.server.BaseHTTPRequestHandler):
+    """模拟 color-name.com 的分类页、搜索页和颜色详情页"""
+
+    protocol_version = 'HTTP/1.1'  # 支持长连接
+    disable_nagle_algorithm = True  # 响应头与正文分开写出，避免延迟确认拖慢每个请求
+
+    def do_GET(self):
+        config = self.server.config
+        with self.server.lock:
+            self.server.in_flight += 1
+            self.server.requests += 1
+            over_limit = config['max_inflight'] and self.server.in_flight > config['max_inflight']
+        try:
+            delay = config['latency'] + random.uniform(-config['jitter'], config['jitter'])
+            if random.random() < config['slow_rate']:
+                delay += config['slow_ms']  # 偶发的慢请求（长尾）
+            time.sleep(max(delay, 0) / 1000)
+            if over_limit:
+                return self._send(429, b'', {'Retry-After': '1'})
+            if random.random() < config['error_rate']:
+                return self._send(503, b'')
+            body = self._render(self.path)
+            if body is None:
+                return self._send(404, b'')
+            self._send(200, body.encode('utf-8'))
+        finally:
+            with self.server.lock:
+                self.server.in_flight -= 1
+
+    def _render(self, path):
+        config = self.server.config
+        base = f'http://{self.headers.get("Host")}'
+        url = urlsplit(path)
+        page = parse_qs(url.query).get('page', ['1'])[0]
+        page = int(page) if page.isdigit() else 0
+        parts = unquote(url.path).strip('/').split('/')
+        if len(parts) != 2:
+            return None
+        kind, name = parts
+
+        if kind == 'color' and name.startswith('color-'):
+            index = int(name[6:]) if name[6:].isdigit() else -1
+            if not 0 <= index < config['pages']:
+                return None
+            return DETAIL_PAGE.format(filler=config['filler'], **color_values(index))
+
+        if kind == 'colors':
+            # 分类页：按分类名的哈希取一段连续的颜色，分页列出
+            start = sum(map(ord, name)) * 37 % config['pages']
+            total = min(LINKS_PER_CATEGORY, config['pages'])
+            first = (page - 1) * LINKS_PER_PAGE
+            if page < 1 or first >= total:
+                return None
+            items = '\n'.join(
+                f'<li><a href="{base}/color/color-{(start + i) % config["pages"]}">color {i}</a></li>'
+                for i in range(first, min(first + LINKS_PER_PAGE, total)))
+            next_page = f'<a rel="next" href="/colors/{name}?page={page + 1}">Next</a>' \
+                if first + LINKS_PER_PAGE < total else ''
+            return LIST_PAGE.format(title=name, items=items, next_page=next_page)
+
+        if kind == 'search':
+            index = sum(map(ord, name)) % config['pages']
+            items = '\n'.join(f'<li><a href="{base}/color/color-{(index + i) % config["pages"]}">{name}</a></li>'
+                              for i in range(3))
+            return SEARCH_PAGE.format(title=name, items=items)
+        return None
+
+    def _send(self, status, body, headers=None):
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class FakeSiteServer(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024  # 高并发建连时避免 listen 队列溢出导致的重传等待
+
+    def handle_error(self, request, client_address):
+        # 客户端提前断开（如提前停止下载、取消对冲请求）属于正常情况，不打印堆栈
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+def start(port=0, pages=PAGES, latency=0.0, jitter=0.0, error_rate=0.0, max_inflight=0, page_kb=0,
+          slow_rate=0.0, slow_ms=0.0):
+    """在后台线程启动模拟站点，返回 (server, base_url)；latency/jitter/slow_ms 单位毫秒"""
+    server = FakeSiteServer(('127.0.0.1', port), FakeSiteHandler)
+    server.lock = threading.Lock()
+    server.in_flight = 0
+    server.requests = 0
+    server.config = {
+        'pages': pages, 'latency': latency, 'jitter': jitter, 'error_rate': error_rate,
+        'max_inflight': max_inflight, 'slow_rate': slow_rate, 'slow_ms': slow_ms,
+        'filler': ('<p>' + 'x' * 1024 + '</p>\n') * page_kb,  # 让页面体积接近真实站点
+    }
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_address[1]}'
+
+
+def detail_links(base_url, pages=PAGES):
+    """模拟站点上全部颜色详情页的链接"""
+    return [f'{base_url}/color/color-{i}' for i in range(pages)]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="本地模拟 color-name.com，用于离线测试与基准")
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--pages', type=int, default=PAGES, help="颜色详情页数量")
+    parser.add_argument('--latency', type=float, default=0.0, help="平均响应延迟(毫秒)")
+    parser.add_argument('--jitter', type=float, default=0.0, help="延迟抖动(毫秒)")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="随机返回503的比例")
+    parser.add_argument('--max-inflight', type=int, default=0, help="同时处理的请求超过该值时返回429，0为不限")
+    parser.add_argument('--page-kb', type=int, default=0, help="详情页额外填充的KB数")
+    parser.add_argument('--slow-rate', type=float, default=0.0, help="额外变慢的请求比例（模拟长尾延迟）")
+    parser.add_argument('--slow-ms', type=float, default=0.0, help="慢请求额外增加的延迟(毫秒)")
+    args = parser.parse_args()
+
+    server, base_url = start(args.port, args.pages, args.latency, args.jitter, args.error_rate,
+                             args.max_inflight, args.page_kb, args.slow_rate, args.slow_ms)
+    print(f"模拟站点已启动: {base_url}/colors/blue  {base_url}/color/color-0")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,188 @@
+import hashlib
+import math
+import sqlite3
+import threading
+import time
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# 常量配置
+FRONTIER_PATH = 'frontier.sqlite'
+CAPACITY = 1_000_000  # 布隆过滤器按该URL数量设计，超出后误判率上升但结果仍准确
+ERROR_RATE = 0.001
+CHUNK_SIZE = 1000  # 逐批从磁盘读取待抓取URL
+COMMIT_EVERY = 200  # 状态更新每累计多少条提交一次
+TRACKING_PARAMS = ('utm_', 'fbclid', 'gclid')  # 不影响页面内容的跟踪参数
+LOWERCASE_PATH = False  # 路径一般区分大小写，确认站点不区分时才打开
+
+# URL状态
+PENDING = 'pending'
+DONE = 'done'
+FAILED = 'failed'
+
+_DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+def normalize(url, lowercase_path=None):
+    """URL的去重键：小写协议/主机、去掉默认端口、片段、末尾斜杠与跟踪参数，查询参数排序
+
+    只用于判断两个URL是否指向同一页面，抓取时仍用原始URL；路径默认保留大小写（lowercase_path 为真时小写）。
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    if parts.port and parts.port != _DEFAULT_PORTS.get(scheme):
+        host = f'{host}:{parts.port}'
+    path = parts.path.rstrip('/') or '/'
+    if LOWERCASE_PATH if lowercase_path is None else lowercase_path:
+        path = path.lower()
+    query = sorted((key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+                   if not key.lower().startswith(TRACKING_PARAMS))
+    return urlunsplit((scheme, host, path, urlencode(query), ''))
+
+
+def dedupe(urls):
+    """按 normalize() 的键去重，保留每个键首次出现的原始URL及顺序"""
+    unique = {}
+    for url in urls:
+        unique.setdefault(normalize(url), url)
+    return list(unique.values())
+
+
+class BloomFilter:
+    """定长位数组的布隆过滤器：判定"不存在"一定准确，"可能存在"需再查精确存储"""
+
+    def __init__(self, capacity=CAPACITY, error_rate=ERROR_RATE):
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key):
+        # 双重哈希：由一个128位摘要派生 k 个位置
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, key):
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class Frontier:
+    """持久化的URL前沿：按 normalize() 的键去重（布隆过滤器 + SQLite精确存储），记录每个URL的抓取状态
+
+    表中同时保存首次见到的原始URL，待抓取时产出原始URL。
+    """
+
+    def __init__(self, path=FRONTIER_PATH, capacity=CAPACITY, error_rate=ERROR_RATE):
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        columns = [row[1] for row in self._db.execute('PRAGMA table_info(urls)')]
+        if columns and 'key' not in columns:
+            self._migrate()
+        self._db.execute('''CREATE TABLE IF NOT EXISTS urls (
+            key TEXT PRIMARY KEY,
+            url TEXT NOT NULL,
+            state TEXT NOT NULL,
+            updated REAL)''')
+        self._db.execute('CREATE INDEX IF NOT EXISTS idx_state ON urls(state)')
+        self._db.commit()
+        self._uncommitted = 0
+
+        # 启动时从磁盘重建布隆过滤器（逐行读取，内存只占位数组）
+        self._bloom = BloomFilter(capacity, error_rate)
+        for (key,) in self._db.execute('SELECT key FROM urls'):
+            self._bloom.add(key)
+
+    def _migrate(self):
+        # 旧版表只存规范化后的URL：按新的键重新去重，原始URL只能沿用旧的规范化形式
+        self._db.create_function('normalize', 1, normalize, deterministic=True)
+        self._db.execute('ALTER TABLE urls RENAME TO urls_old')
+        self._db.execute('DROP INDEX IF EXISTS idx_state')
+        self._db.execute('''CREATE TABLE urls (
+            key TEXT PRIMARY KEY,
+            url TEXT NOT NULL,
+            state TEXT NOT NULL,
+            updated REAL)''')
+        self._db.execute('INSERT OR IGNORE INTO urls (key, url, state, updated) '
+                         'SELECT normalize(url), url, state, updated FROM urls_old ORDER BY rowid')
+        self._db.execute('DROP TABLE urls_old')
+
+    def _exists(self, key):
+        if key not in self._bloom:
+            return False  # 布隆过滤器判定不存在时无需查库
+        return self._db.execute('SELECT 1 FROM urls WHERE key = ?', (key,)).fetchone() is not None
+
+    def add(self, urls):
+        """按去重键加入前沿，返回此前未见过的URL列表（原始形式）"""
+        added = []
+        now = time.time()
+        with self._lock:
+            for url in urls:
+                key = normalize(url)
+                if self._exists(key):
+                    continue
+                self._db.execute('INSERT INTO urls (key, url, state, updated) VALUES (?, ?, ?, ?)',
+                                 (key, url, PENDING, now))
+                self._bloom.add(key)
+                added.append(url)
+            self._db.commit()
+        return added
+
+    def add_all(self, urls, chunk_size=CHUNK_SIZE):
+        """分批加入任意长度的可迭代对象，返回新增数量"""
+        added = 0
+        chunk = []
+        for url in urls:
+            chunk.append(url)
+            if len(chunk) >= chunk_size:
+                added += len(self.add(chunk))
+                chunk = []
+        return added + len(self.add(chunk))
+
+    def __contains__(self, url):
+        with self._lock:
+            return self._exists(normalize(url))
+
+    def pending(self, chunk_size=CHUNK_SIZE):
+        """按加入顺序逐批产出待抓取的URL，不一次性读入内存"""
+        last = 0
+        while True:
+            with self._lock:
+                rows = self._db.execute(
+                    'SELECT rowid, url FROM urls WHERE state = ? AND rowid > ? ORDER BY rowid LIMIT ?',
+                    (PENDING, last, chunk_size)).fetchall()
+            if not rows:
+                return
+            last = rows[-1][0]
+            for _, url in rows:
+                yield url
+
+    def mark(self, url, state):
+        """更新URL的抓取状态（DONE/FAILED/PENDING）"""
+        with self._lock:
+            self._db.execute('UPDATE urls SET state = ?, updated = ? WHERE key = ?',
+                             (state, time.time(), normalize(url)))
+            self._uncommitted += 1
+            if self._uncommitted >= COMMIT_EVERY:
+                self._db.commit()
+                self._uncommitted = 0
+
+    def counts(self):
+        """各状态的URL数量"""
+        with self._lock:
+            return dict(self._db.execute('SELECT state, COUNT(*) FROM urls GROUP BY state'))
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute('SELECT COUNT(*) FROM urls').fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._db.commit()
+            self._db.close()
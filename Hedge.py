@@ -0,0 +1,171 @@
+import concurrent.futures
+import functools
+import threading
+import time
+from collections import deque
+
+import HttpSession
+
+# 常量配置
+PERCENTILE = 95  # 超过近期延迟的该分位数仍未返回时，再发一个相同的请求
+MIN_SAMPLES = 20  # 延迟样本不足时不对冲
+HISTORY = 500  # 按最近多少次成功请求的延迟估计分位数
+MIN_DELAY = 0.05  # 对冲等待时间下限（秒），避免延迟很稳定时几乎每个请求都对冲
+BUDGET_RATIO = 0.05  # 每个请求为对冲预算存入的额度，即对冲请求最多约占请求总数的5%
+BUDGET_MIN = 5  # 初始对冲预算
+
+
+class _Race:
+    """同一URL的原请求与对冲请求：第一个成功的结果胜出，其余的被取消"""
+
+    def __init__(self, attempts):
+        self.pending = attempts  # 已发出或仍可能发出的请求数
+        self.running = 0
+        self.result = None
+        self.error = None
+        self.winner = None
+        self.done = threading.Event()
+        self._scopes = []
+        self._lock = threading.Lock()
+
+    def run(self, fetch, url, hedge=False):
+        scope = HttpSession.CancelScope()
+        with self._lock:
+            if self.done.is_set():
+                self.pending -= 1
+                return
+            self._scopes.append(scope)
+            self.running += 1
+        try:
+            with HttpSession.cancel_scope(scope):
+                result = fetch(url)
+        except Exception as e:
+            self._finish(error=e)
+        else:
+            self._finish(result=result, winner='hedge' if hedge else 'primary')
+
+    def skip(self):
+        """对冲请求最终没有发出"""
+        self._finish(ran=False)
+
+    def _finish(self, result=None, error=None, winner=None, ran=True):
+        with self._lock:
+            self.pending -= 1
+            self.running -= ran
+            if self.done.is_set():
+                return
+            if winner:
+                self.result, self.winner = result, winner
+            else:
+                if error is not None and self.error is None:
+                    self.error = error
+                # 还有请求在进行时等它；都已结束时，原请求失败就不再发出对冲请求
+                if self.running or (self.pending and error is None):
+                    return
+            self.done.set()
+            scopes = list(self._scopes)
+        for scope in scopes:
+            scope.cancel()  # 断开落后请求的连接，对已结束的请求无影响
+
+
+class Hedger:
+    """对冲请求：请求超过近期延迟的某个分位数仍未返回时，另发一个相同请求，先成功的胜出
+
+    对冲请求在单独的线程池中发出，全局预算（令牌桶）限制额外请求占总请求数的比例；
+    落后的请求通过 HttpSession.CancelScope 断开连接，不会一直占用线程。
+    """
+
+    def __init__(self, max_workers, percentile=PERCENTILE, budget_ratio=BUDGET_RATIO,
+                 budget_min=BUDGET_MIN, min_samples=MIN_SAMPLES, history=HISTORY, min_delay=MIN_DELAY):
+        self.percentile = percentile
+        self.budget_ratio = budget_ratio
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self.tokens = float(budget_min)
+        self.requests = 0
+        self.hedges = 0  # 发出的对冲请求数
+        self.wins = 0  # 对冲请求先返回的次数
+        self._latencies = deque(maxlen=history)
+        self._delay = None  # 缓存的对冲等待时间，每记录一批样本重新计算
+        self._lock = threading.Lock()
+        self._pool = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='hedge')
+
+    def delay(self):
+        """当前的对冲等待时间（秒）；样本不足时为 None"""
+        with self._lock:
+            if self._delay is None and len(self._latencies) >= self.min_samples:
+                ordered = sorted(self._latencies)
+                index = min(int(len(ordered) * self.percentile / 100), len(ordered) - 1)
+                self._delay = max(ordered[index], self.min_delay)
+            return self._delay
+
+    def _observe(self, latency):
+        with self._lock:
+            self._latencies.append(latency)
+            if len(self._latencies) % 10 == 0:
+                self._delay = None
+
+    def _spend(self):
+        with self._lock:
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            self.hedges += 1
+            return True
+
+    def _hedge(self, fetch, url, race, delay, start):
+        # 原请求在等待时间内结束（成功或失败）就不再对冲
+        if race.done.wait(max(delay - (time.monotonic() - start), 0)) or not self._spend():
+            race.skip()
+            return
+        race.run(fetch, url, hedge=True)
+
+    def fetch(self, fetch, url):
+        with self._lock:
+            self.requests += 1
+            self.tokens += self.budget_ratio
+        delay = self.delay()
+        start = time.monotonic()
+        if delay is None:
+            result = fetch(url)  # 还在积累延迟样本
+            self._observe(time.monotonic() - start)
+            return result
+
+        race = _Race(attempts=2)
+        self._pool.submit(self._hedge, fetch, url, race, delay, start)
+        race.run(fetch, url)  # 原请求在当前线程执行
+        race.done.wait()
+        if race.winner is None:
+            raise race.error
+        if race.winner == 'hedge':
+            with self._lock:
+                self.wins += 1
+        self._observe(time.monotonic() - start)  # 记录该URL实际拿到结果的耗时
+        return race.result
+
+    def close(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def summary(self):
+        ratio = self.hedges / self.requests if self.requests else 0.0
+        delay = self.delay()
+        delay = f"{delay * 1000:.0f}毫秒" if delay is not None else "样本不足"
+        return f"对冲请求{self.hedges}次（占{ratio:.1%}），其中{self.wins}次先于原请求返回，当前等待时间{delay}"
+
+
+def hedged(fetch, hedger):
+    """包装抓取函数：慢请求由 hedger 发出对冲请求，返回先成功的结果"""
+
+    @functools.wraps(fetch)
+    def wrapper(url):
+        return hedger.fetch(fetch, url)
+
+    return wrapper
+
+
+def add_hedge_arguments(parser):
+    """为脚本添加对冲请求相关的命令行参数"""
+    parser.add_argument('--hedge', action='store_true', help="慢请求超过近期延迟分位数时发出对冲请求，先返回的胜出")
+    parser.add_argument('--hedge-percentile', type=float, default=PERCENTILE, help="发出对冲请求的延迟分位数")
+    parser.add_argument('--hedge-budget', type=float, default=BUDGET_RATIO,
+                        help="对冲请求最多占请求总数的比例")
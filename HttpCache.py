@@ -0,0 +1,134 @@
+import json
+import sqlite3
+import threading
+import time
+import zlib
+
+import requests
+
+import HttpSession
+
+# 常量配置
+CACHE_PATH = 'http_cache.sqlite'
+MAX_BYTES = 512 * 1024 * 1024  # 缓存正文（压缩后）总大小上限
+
+
+class CacheMissError(LookupError):
+    """离线模式下缓存中没有该URL"""
+
+
+class HttpCache:
+    """基于SQLite的持久化响应缓存，按URL保存正文、ETag/Last-Modified及解析结果"""
+
+    def __init__(self, path=CACHE_PATH, max_bytes=MAX_BYTES, offline=False):
+        self.max_bytes = max_bytes
+        self.offline = offline
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('''CREATE TABLE IF NOT EXISTS responses (
+            url TEXT PRIMARY KEY,
+            etag TEXT,
+            last_modified TEXT,
+            body BLOB,
+            size INTEGER,
+            parsed TEXT,
+            accessed REAL)''')
+        self._db.execute('CREATE INDEX IF NOT EXISTS idx_accessed ON responses(accessed)')
+        self._size = self._db.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+
+    def fetch(self, session, url, headers=None, timeout=10, parsed_key=None):
+        """条件请求：304时直接返回缓存正文及上次的解析结果（response.parsed）"""
+        with self._lock:
+            row = self._db.execute(
+                'SELECT etag, last_modified, body, parsed FROM responses WHERE url = ?', (url,)).fetchone()
+
+        if self.offline:
+            if row is None:
+                raise CacheMissError(f"离线模式缓存未命中: {url}")
+            return self._from_cache(url, row, parsed_key)
+
+        headers = dict(headers or {})
+        if row is not None:
+            etag, last_modified = row[0], row[1]
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
+
+        response = session.get(url, headers=headers, timeout=timeout)
+        response.parsed = None
+        if response.status_code == 304 and row is not None:
+            return self._from_cache(url, row, parsed_key)
+        if response.status_code == 200:
+            self._store(url, response)
+        return response
+
+    def store_parsed(self, url, parsed_key, value):
+        """保存解析结果，下次304时跳过解析"""
+        with self._lock:
+            row = self._db.execute('SELECT parsed FROM responses WHERE url = ?', (url,)).fetchone()
+            if row is None:
+                return
+            parsed = json.loads(row[0]) if row[0] else {}
+            parsed[parsed_key] = value
+            self._db.execute('UPDATE responses SET parsed = ? WHERE url = ?',
+                             (json.dumps(parsed, ensure_ascii=False), url))
+            self._db.commit()
+
+    def _from_cache(self, url, row, parsed_key):
+        with self._lock:
+            self._db.execute('UPDATE responses SET accessed = ? WHERE url = ?', (time.time(), url))
+            self._db.commit()
+
+        response = requests.Response()
+        response.status_code = 200
+        response.url = url
+        response._content = zlib.decompress(row[2])
+        response.from_cache = True
+        parsed = json.loads(row[3]) if row[3] else {}
+        response.parsed = parsed.get(parsed_key) if parsed_key else None
+        return response
+
+    def _store(self, url, response):
+        body = zlib.compress(response.content)
+        with self._lock:
+            old = self._db.execute('SELECT size FROM responses WHERE url = ?', (url,)).fetchone()
+            self._db.execute(
+                'INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, NULL, ?)',
+                (url, response.headers.get('ETag'), response.headers.get('Last-Modified'),
+                 body, len(body), time.time()))
+            self._size += len(body) - (old[0] if old else 0)
+            if self._size > self.max_bytes:
+                self._evict()
+            self._db.commit()
+
+    def _evict(self):
+        """按最近访问时间淘汰，直到总大小降到上限的90%"""
+        target = self.max_bytes * 0.9
+        rows = self._db.execute('SELECT url, size FROM responses ORDER BY accessed').fetchall()
+        for url, size in rows:
+            if self._size <= target:
+                break
+            self._db.execute('DELETE FROM responses WHERE url = ?', (url,))
+            self._size -= size
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def add_cache_arguments(parser):
+    """为脚本添加缓存相关的命令行参数"""
+    parser.add_argument('--cache', nargs='?', const=CACHE_PATH, help="启用HTTP缓存（SQLite文件路径）")
+    parser.add_argument('--cache-max-mb', type=int, default=MAX_BYTES // (1024 * 1024), help="缓存大小上限(MB)")
+    parser.add_argument('--offline', action='store_true', help="只读缓存，不访问网络")
+
+
+def enable_from_args(args):
+    """根据命令行参数启用缓存"""
+    if args.cache or args.offline:
+        cache = HttpCache(args.cache or CACHE_PATH, args.cache_max_mb * 1024 * 1024, args.offline)
+        HttpSession.enable_cache(cache)
+        return cache
+    return None
@@ -0,0 +1,244 @@
+import contextlib
+import socket
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+import Metrics
+
+# 常量配置
+POOL_CONNECTIONS = 10  # 每个Session缓存的主机连接池数量
+POOL_MAXSIZE = 20  # 每个主机连接池保留的长连接数
+MAX_RETRIES = 3
+STREAM_CHUNK = 8192  # 边下载边解析时每次读取的字节数
+DRAIN_LIMIT = 32 * 1024  # 提前停止后剩余正文不超过该字节数时读完以复用长连接，否则直接断开
+
+_local = threading.local()
+_cache = None  # 启用后由 HttpCache 处理条件请求
+_archive = None  # 启用后由 Archive 录制或回放原始响应
+_stats = {'requests': 0, 'connections': 0, 'bytes': 0}
+_lock = threading.Lock()
+
+
+def _count(key, n=1):
+    with _lock:
+        _stats[key] += n
+
+
+class CancelScope:
+    """可从其他线程取消的请求范围（见 Hedge）：取消时断开范围内正在使用的连接，阻塞的读取随即出错返回"""
+
+    def __init__(self):
+        self.cancelled = False
+        self._connection = None
+        self._lock = threading.Lock()
+
+    def _attach(self, connection):
+        with self._lock:
+            self._connection = connection
+            if not self.cancelled:
+                return
+        self._shutdown(connection)
+
+    def _detach(self):
+        with self._lock:
+            self._connection = None
+
+    def cancel(self):
+        with self._lock:
+            self.cancelled = True
+            connection, self._connection = self._connection, None
+        if connection is not None:
+            self._shutdown(connection)
+
+    @staticmethod
+    def _shutdown(connection):
+        sock = getattr(connection, 'sock', None)
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+
+@contextlib.contextmanager
+def cancel_scope(scope):
+    """当前线程中此后发出的请求都可由 scope.cancel() 取消"""
+    _local.scope = scope
+    try:
+        yield scope
+    finally:
+        _local.scope = None
+        scope._detach()  # 连接已归还连接池，之后的取消不能再影响它
+
+
+def _attach(connection):
+    scope = getattr(_local, 'scope', None)
+    if scope is not None:
+        scope._attach(connection)
+
+
+class _CountingHTTPConnection(HTTPConnection):
+    def connect(self):
+        _count('connections')  # 每次真正建立TCP(+TLS)连接时计数
+        with Metrics.timer(Metrics.CONNECT):
+            super().connect()
+
+    def request(self, *args, **kwargs):
+        _attach(self)
+        super().request(*args, **kwargs)
+
+
+class _CountingHTTPSConnection(HTTPSConnection):
+    def connect(self):
+        _count('connections')
+        with Metrics.timer(Metrics.CONNECT):
+            super().connect()
+
+    def request(self, *args, **kwargs):
+        _attach(self)
+        super().request(*args, **kwargs)
+
+
+class _HTTPPool(HTTPConnectionPool):
+    ConnectionCls = _CountingHTTPConnection
+
+
+class _HTTPSPool(HTTPSConnectionPool):
+    ConnectionCls = _CountingHTTPSConnection
+
+
+class PooledAdapter(HTTPAdapter):
+    """统计请求数与新建连接数的连接池适配器"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {'http': _HTTPPool, 'https': _HTTPSPool}
+
+    def send(self, request, **kwargs):
+        _count('requests')
+        return super().send(request, **kwargs)
+
+
+def get_session(max_retries: int = MAX_RETRIES) -> requests.Session:
+    """获取当前线程复用的Session（长连接、定长连接池）"""
+    sessions = getattr(_local, 'sessions', None)
+    if sessions is None:
+        sessions = _local.sessions = {}
+
+    session = sessions.get(max_retries)
+    if session is None:
+        session = requests.Session()
+        session.headers['Connection'] = 'keep-alive'
+        adapter = PooledAdapter(pool_connections=POOL_CONNECTIONS,
+                                pool_maxsize=POOL_MAXSIZE,
+                                max_retries=max_retries)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        sessions[max_retries] = session
+    return session
+
+
+def enable_cache(cache) -> None:
+    """启用持久化响应缓存（见 HttpCache）"""
+    global _cache
+    _cache = cache
+
+
+def enable_archive(archive) -> None:
+    """启用响应归档的录制或回放（见 Archive）"""
+    global _archive
+    _archive = archive
+
+
+def fetch(url, headers=None, timeout=10, max_retries=0, parsed_key=None, until=None) -> requests.Response:
+    """统一的GET入口；启用缓存时 response.parsed 为上次的解析结果（未变化时）
+
+    传入 until（如 Extractor.LabelWatcher）时边下载边把数据块交给 until.feed，返回 True 即停止读取，
+    response.content 只含已读到的部分、response.stopped_early 为 True；缓存或录制需要完整正文，启用时不提前停止。
+    """
+    if _archive is not None and _archive.replay:
+        # 回放：不访问网络也不读缓存，每次都重新解析（用于迭代提取逻辑）
+        response = _archive.get(url)
+        response.parsed = None
+        return response
+
+    session = get_session(max_retries)
+    start = time.perf_counter()
+    if _cache is not None:
+        response = _cache.fetch(session, url, headers=headers, timeout=timeout, parsed_key=parsed_key)
+    elif until is not None and _archive is None:
+        response = session.get(url, headers=headers, timeout=timeout, stream=True)
+        response.parsed = None
+        _read_until(response, until)
+    else:
+        response = session.get(url, headers=headers, timeout=timeout)
+        response.parsed = None
+    if response.raw is not None:
+        _count('bytes', response.raw.tell())  # 实际从网络读取的字节数（压缩传输时为压缩后大小）
+
+    # elapsed 为发出请求到解析完响应头的时间，其余为读取正文
+    if response.elapsed:
+        ttfb = response.elapsed.total_seconds()
+        Metrics.observe(Metrics.TTFB, ttfb)
+        Metrics.observe(Metrics.DOWNLOAD, max(time.perf_counter() - start - ttfb, 0.0))
+    if _archive is not None:
+        _archive.record(url, response)
+    return response
+
+
+def _read_until(response, until):
+    """流式读取正文直到 until.feed 返回 True；提前停止时按剩余大小决定读完复用连接还是断开"""
+    chunks = []
+    stopped = False
+    if response.status_code == 200:
+        for chunk in response.iter_content(STREAM_CHUNK):
+            chunks.append(chunk)
+            if until.feed(chunk):
+                stopped = True
+                break
+    else:
+        chunks.append(response.content)  # 错误页不解析，照常读完
+    if stopped:
+        remaining = getattr(response.raw, 'length_remaining', None)
+        if remaining is not None and remaining <= DRAIN_LIMIT:
+            response.raw.drain_conn()
+        else:
+            response.raw.close()  # 剩余较多或长度未知：断开连接，不再接收
+    response._content = b''.join(chunks)
+    response._content_consumed = True
+    response.close()  # 归还（或丢弃已断开的）连接
+    response.stopped_early = stopped
+
+
+def store_parsed(url, parsed_key, value) -> None:
+    """把解析结果写入缓存，供下次304时跳过解析"""
+    if _cache is not None:
+        _cache.store_parsed(url, parsed_key, value)
+
+
+def reuse_stats() -> dict:
+    """返回请求数、新建连接数、连接复用率及下载字节数"""
+    with _lock:
+        requests_made = _stats['requests']
+        connections = _stats['connections']
+        downloaded = _stats['bytes']
+
+    reused = max(requests_made - connections, 0)
+    return {
+        'requests': requests_made,
+        'connections': connections,
+        'reuse_rate': reused / requests_made if requests_made else 0.0,
+        'bytes': downloaded,
+    }
+
+
+def print_reuse_stats() -> None:
+    """打印连接复用情况"""
+    stats = reuse_stats()
+    print(f"HTTP请求: {stats['requests']}次，新建连接: {stats['connections']}次，"
+          f"连接复用率: {stats['reuse_rate']:.1%}，下载: {stats['bytes'] / 1024 / 1024:.1f}MB")
@@ -0,0 +1,23 @@
+import importlib
+import sys
+
+
+class LazyModule:
+    """模块代理：首次访问属性时才真正导入，用不到的重型依赖（openpyxl/numpy/tqdm）不拖慢启动"""
+
+    def __init__(self, name):
+        self._name = name
+
+    def __getattr__(self, attr):
+        # import_module 自带导入锁，多线程同时首次访问也只导入一次
+        value = getattr(importlib.import_module(self._name), attr)
+        setattr(self, attr, value)  # 之后直接命中实例属性，不再走 __getattr__
+        return value
+
+    def __repr__(self):
+        return f"<lazy module '{self._name}'>"
+
+
+def module(name):
+    """返回模块本身（已导入时）或延迟导入的代理"""
+    return sys.modules.get(name) or LazyModule(name)
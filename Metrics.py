@@ -0,0 +1,175 @@
+import bisect
+import http.server
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+# 常量配置
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)  # 秒
+PREFIX = 'colorcrawl'
+
+# 各阶段名称
+QUEUE_WAIT = 'queue_wait'  # 提交到线程池后等待执行
+CONNECT = 'connect'  # 建立TCP(+TLS)连接
+TTFB = 'ttfb'  # 发出请求到收到响应头
+DOWNLOAD = 'download'  # 读取响应正文
+PARSE = 'parse'  # etree.HTML
+EXTRACT = 'extract'  # 从表格中提取字段
+SINK_WRITE = 'sink_write'  # 写入一行结果
+SINK_CLOSE = 'sink_close'  # 输出收尾（如xlsx保存）
+
+
+def _round(value):
+    return round(value, 6) if value is not None else None
+
+
+class Histogram:
+    """固定分桶的耗时直方图"""
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # 最后一个为 +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q):
+        """按分桶线性插值估算分位数"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if seen + n >= rank and n:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.max
+                return min(lower + (upper - lower) * (rank - seen) / n, self.max)
+            seen += n
+        return self.max
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'sum': round(self.sum, 6),
+            'mean': round(self.sum / self.count, 6) if self.count else None,
+            'p50': _round(self.quantile(0.5)),
+            'p90': _round(self.quantile(0.9)),
+            'p99': _round(self.quantile(0.99)),
+            'max': round(self.max, 6),
+            'buckets': dict(zip([str(b) for b in self.buckets] + ['+Inf'], self.counts)),
+        }
+
+
+_histograms = {}
+_lock = threading.Lock()
+_started = time.time()
+
+
+def observe(stage, seconds):
+    """记录某阶段的一次耗时（线程安全）"""
+    with _lock:
+        histogram = _histograms.get(stage)
+        if histogram is None:
+            histogram = _histograms[stage] = Histogram()
+        histogram.observe(seconds)
+
+
+@contextmanager
+def timer(stage):
+    """计时上下文：with Metrics.timer(Metrics.PARSE): ..."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(stage, time.perf_counter() - start)
+
+
+def snapshot():
+    with _lock:
+        return {stage: histogram.to_dict() for stage, histogram in _histograms.items()}
+
+
+def write_json(path, extra=None):
+    """写出JSON运行报告：各阶段直方图及附加信息"""
+    report = {
+        'started': _started,
+        'finished': time.time(),
+        'seconds': round(time.time() - _started, 3),
+        'stages': snapshot(),
+    }
+    report.update(extra or {})
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+def render_prometheus(counters=None):
+    """Prometheus 文本格式；counters 中以 _total 结尾的按 counter 输出，其余按 gauge"""
+    lines = [f'# HELP {PREFIX}_stage_seconds 各抓取阶段耗时',
+             f'# TYPE {PREFIX}_stage_seconds histogram']
+    with _lock:
+        for stage, histogram in sorted(_histograms.items()):
+            cumulative = 0
+            for bound, n in zip(list(histogram.buckets) + ['+Inf'], histogram.counts):
+                cumulative += n
+                lines.append(f'{PREFIX}_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+            lines.append(f'{PREFIX}_stage_seconds_sum{{stage="{stage}"}} {histogram.sum}')
+            lines.append(f'{PREFIX}_stage_seconds_count{{stage="{stage}"}} {histogram.count}')
+    for name, value in (counters or {}).items():
+        kind = 'counter' if name.endswith('_total') else 'gauge'
+        lines.append(f'# TYPE {PREFIX}_{name} {kind}')
+        lines.append(f'{PREFIX}_{name} {value}')
+    return '\n'.join(lines) + '\n'
+
+
+def write_prometheus(path, counters=None):
+    """写出 Prometheus 文本文件（可供 node_exporter textfile 采集）"""
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(render_prometheus(counters))
+
+
+def serve(port, counters=None):
+    """在后台线程开放 /metrics 端点；counters 为返回计数器字典的函数"""
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = render_prometheus(counters() if counters else None).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def print_summary():
+    """打印各阶段耗时概览"""
+    stages = snapshot()
+    if not stages:
+        return
+    print("各阶段耗时（毫秒）：")
+    for stage, data in stages.items():
+        p50 = data['p50'] * 1000 if data['p50'] is not None else 0
+        p99 = data['p99'] * 1000 if data['p99'] is not None else 0
+        print(f"  {stage:<12} 次数 {data['count']:>8}  合计 {data['sum']:>9.2f}秒  "
+              f"p50 {p50:>8.1f}  p99 {p99:>8.1f}")
+
+
+def add_metrics_arguments(parser):
+    """为脚本添加指标导出相关的命令行参数"""
+    parser.add_argument('--metrics-json', help="运行结束时写出JSON运行报告")
+    parser.add_argument('--metrics-prom', help="运行结束时写出Prometheus文本格式指标")
+    parser.add_argument('--metrics-port', type=int, help="运行期间在该端口开放 /metrics")
@@ -1,185 +1,427 @@
-import requests
 from lxml import etree
-from openpyxl import Workbook
-from tqdm import tqdm
-from openpyxl import load_workbook
+import argparse
 import concurrent.futures
-
-
-def fetch_color_details(url):
-    """抓取颜色页面的详细信息（修复异常抛出逻辑）"""
+import functools
+import heapq
+import itertools
+import time
+from collections import defaultdict
+
+import Archive
+import Checkpoint
+import ColorConvert
+import Concurrency
+import Extractor
+import Frontier
+import Hedge
+import HttpCache
+import HttpSession
+import LazyImport
+import Metrics
+import ParsePool
+import RalIndex
+import Recrawl
+import Retry
+import Sinks
+import Snapshots
+
+openpyxl = LazyImport.module('openpyxl')
+tqdm = LazyImport.module('tqdm')
+
+FIELDS = ('Hex Code', 'RGB Values', 'CMYK Values', 'HSV/HSB Values', 'Closest RAL')
+PARSED_KEY = 'details'  # 缓存中解析结果的键
+WINDOW_FACTOR = 4  # 在途任务数上限为线程数的倍数
+
+
+def parse_color_details(content, fields=FIELDS):
+    """从页面内容中解析颜色详细信息（单次遍历表格）"""
+    with Metrics.timer(Metrics.PARSE):
+        tree = etree.HTML(content)
+    with Metrics.timer(Metrics.EXTRACT):
+        values = Extractor.extract_fields(tree, fields)
+
+    # 关键数据校验
+    for label, value in values.items():
+        if value is None:
+            raise etree.XPathError(f"未找到 {label} 对应元素")
+    hex_code = values['Hex Code']
+    if not hex_code.startswith("#"):
+        raise ValueError(f"无效的Hex格式: {hex_code}")
+
+    return values
+
+
+def fetch_color_details(url, parser=None, parse=parse_color_details, watch=None):
+    """抓取颜色页面的详细信息（修复异常抛出逻辑）
+
+    传入 parser（ParsePool）时只负责下载，返回解析进程给出结果的 Future；
+    parse 可替换为 ColorConvert.Deriving 等包装后的解析函数；
+    传入 watch（字段元组）时边下载边解析，这些字段都找到后就停止读取页面其余部分。
+    """
     headers = {
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
     }
 
     try:
-        with requests.Session() as session:
-            response = session.get(url, headers=headers, timeout=(5, 15))
-            response.raise_for_status()  # 自动处理HTTP错误码
-
-            tree = etree.HTML(response.content)
-
-            def get_value(label):
-                xpath = f'//tr[td[@class="left" and contains(., "{label}")]]/td[@class="right"]'
-                if elements := tree.xpath(xpath):
-                    return elements[0].xpath('string()').strip()
-                raise etree.XPathError(f"未找到 {label} 对应元素")
-
-            # 关键数据校验
-            hex_code = get_value("Hex Code")
-            if not hex_code.startswith("#"):
-                raise ValueError(f"无效的Hex格式: {hex_code}")
-
-            return {
-                'Hex Code': hex_code,
-                'RGB Values': get_value("RGB Values"),
-                'CMYK Values': get_value("CMYK Values"),
-                'HSV/HSB Values': get_value("HSV/HSB Values"),
-                'Closest RAL': get_value("Closest RAL")
-            }
+        until = Extractor.LabelWatcher(watch) if watch else None
+        response = HttpSession.fetch(url, headers=headers, timeout=(5, 15), parsed_key=PARSED_KEY, until=until)
+        response.raise_for_status()  # 自动处理HTTP错误码
+        if response.parsed is not None:
+            return response.parsed  # 页面未变化（304），跳过解析
+        if parser is not None:
+            return submit_parse(parser, url, response.content, PARSED_KEY)
+
+        try:
+            details = parse(response.content)
+        except Exception as e:
+            Snapshots.capture(url, response.content, e)  # 保存原始页面便于排查
+            raise
+        HttpSession.store_parsed(url, PARSED_KEY, details)
+        return details
 
     except Exception as e:
         # 将原始异常重新抛出，保留堆栈信息
         raise type(e)(f"{url} 处理失败: {str(e)}") from e
 
 
-def save_failed_urls(failed_urls):
-    """保存失败记录到单独的工作表"""
-    if not failed_urls:
-        return
+def error_message(error):
+    """失败记录中的错误信息：去除 fetch_color_details 包装时加上的URL前缀，各抓取引擎保持一致"""
+    return str(error).split(": ")[-1]
 
-    try:
-        # 尝试追加到现有文件
-        wb = load_workbook('color_details.xlsx')
-    except FileNotFoundError:
-        wb = Workbook()
-        wb.remove(wb.active)  # 删除默认sheet
-
-    # 创建失败记录工作表
-    ws = wb.create_sheet("失败记录")
-    ws.append(['URL', '错误类型', '错误详情'])
-
-    # 分类统计错误类型
-    error_stats = {}
-    for (url, error_type, error_detail) in failed_urls:
-        error_stats[error_type] = error_stats.get(error_type, 0) + 1
-        ws.append([url, error_type, error_detail])
-
-    # 添加统计信息
-    ws.append([])
-    ws.append(['错误类型', '出现次数'])
-    for error_type, count in error_stats.items():
-        ws.append([error_type, count])
-
-    wb.save('color_details.xlsx')
-    print(f"已保存{len(failed_urls)}条失败记录到color_details.xlsx的'失败记录'工作表")
-
-
-def save_to_excel(all_data):
-    """保存到Excel文件（增加数据校验）"""
-    # 过滤非字典类型的数据
-    valid_data = {url: details for url, details in all_data.items() if isinstance(details, dict)}
-
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "颜色代码"
-
-    headers = ['序号', '颜色链接', 'Hex Code', 'RGB Values', 'CMYK Values',
-               'HSV/HSB Values', 'Closest RAL']
-    ws.append(headers)
-
-    # 设置列宽优化显示
-    column_widths = {
-        'B': 90,  # 链接列
-        'C': 20,  # Hex列
-        'D': 30,  # RGB列
-        'E': 30,  # CMYK列
-        'F': 30,  # HSV列
-        'G': 30  # RAL列
+
+def submit_parse(parser, url, content, parsed_key):
+    """交给解析进程，解析成功后写入缓存，失败时保存页面快照"""
+    future = parser.submit(content)
+
+    def store(done):
+        if done.exception() is None:
+            HttpSession.store_parsed(url, parsed_key, done.result())
+        else:
+            Snapshots.capture(url, content, done.exception())
+
+    future.add_done_callback(store)
+    return future
+
+
+def print_summary(all_details, failed_urls, succeeded=None):
+    """打印最终统计及失败原因分类；流式抓取未保留结果时用 succeeded 传入成功数"""
+    print(f"\n最终统计：")
+    print(f"成功抓取: {len(all_details) if succeeded is None else succeeded}条")
+    print(f"失败记录: {len(failed_urls)}条")
+    if failed_urls:
+        print("失败原因分类：")
+        stats = defaultdict(int)
+        for _, error_type, _ in failed_urls:
+            stats[error_type] += 1
+        for error_type, count in stats.items():
+            print(f"  {error_type}: {count}次")
+
+
+def http_counters():
+    """导出指标时附带的HTTP连接统计"""
+    stats = HttpSession.reuse_stats()
+    return {
+        'http_requests_total': stats['requests'],
+        'http_connections_total': stats['connections'],
+        'http_reuse_rate': round(stats['reuse_rate'], 4),
+        'http_bytes_total': stats['bytes'],
     }
-    for col, width in column_widths.items():
-        ws.column_dimensions[col].width = width
-
-    # 填充数据
-    for idx, (url, details) in enumerate(valid_data.items(), start=1):
-        # 添加空值保护
-        row = [
-            idx,
-            url,
-            details.get('Hex Code', 'N/A'),
-            details.get('RGB Values', 'N/A'),
-            details.get('CMYK Values', 'N/A'),
-            details.get('HSV/HSB Values', 'N/A'),
-            details.get('Closest RAL', 'N/A')
-        ]
-        ws.append(row)
-
-    wb.save('color_details.xlsx')
-    print(f"已保存{len(valid_data)}条有效数据到color_details.xlsx")
 
 
 def load_links_from_excel(file_path='color_links.xlsx'):
     """从Excel读取链接列表"""
+    return list(iter_links(file_path))
+
+
+def iter_links(file_path='color_links.xlsx'):
+    """逐条读取链接，不把整个文件载入内存：xlsx 按只读模式逐行读第二列，其他文件每行一个链接"""
     try:
-        wb = load_workbook(file_path)
-        ws = wb.active
-        return [row[1].value for row in ws.iter_rows(min_row=2) if row[1].value]
+        if file_path.endswith('.xlsx'):
+            wb = openpyxl.load_workbook(file_path, read_only=True)
+            try:
+                for row in wb.active.iter_rows(min_row=2, values_only=True):
+                    if len(row) > 1 and row[1]:
+                        yield row[1]
+            finally:
+                wb.close()
+        else:
+            with open(file_path, encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        yield line.strip()
     except Exception as e:
         print(f"读取链接失败: {str(e)}")
-        return []
 
 
-if __name__ == '__main__':
-    color_links = load_links_from_excel()
-    if not color_links:
-        print("未找到有效链接")
-        exit()
+def _peek(iterable):
+    """取出第一个元素判断是否为空，返回 (是否非空, 包含全部元素的迭代器)"""
+    iterator = iter(iterable)
+    first = next(iterator, None)
+    if first is None:
+        return False, iterator
+    return True, itertools.chain([first], iterator)
+
+
+def crawl(color_links, fetch=fetch_color_details, max_workers=10, journal=None, sink=None, retry=None,
+          frontier=None, window=None, collect=True, progress=True, schedule=None):
+    """线程池抓取全部链接，返回 (all_details, failed_urls)；结果到达时立即写入 journal 与 sink
 
+    color_links 可以是任意可迭代对象（如 iter_links 的生成器），按需读取：在途任务最多 window 个
+    （默认为线程数的 WINDOW_FACTOR 倍），内存占用取决于并发度而不是链接总数；collect=False 时
+    不在内存中保留成功结果（只写入 journal 与 sink），返回的 all_details 为空。
+    传入 retry（Retry.RetryPolicy）时，可重试的失败会按退避时间重新排队；
+    传入 frontier（Frontier.Frontier）时同步更新每个URL的抓取状态；
+    传入 schedule（Recrawl.Schedule）时记录每个成功URL的内容哈希，用于安排下次重抓。
+    """
     all_details = {}
     failed_urls = []
-
-    # 使用线程池（限制最大并发数为10）
-    with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
-        future_to_url = {executor.submit(fetch_color_details, url): url for url in color_links}
-
-        # 进度条设置（优化显示单位）
-        with tqdm(concurrent.futures.as_completed(future_to_url),
-                  total=len(future_to_url),
-                  desc="抓取进度",
-                  unit="个") as pbar:
-
-            for future in pbar:
-                url = future_to_url[future]
-                try:
-                    result = future.result()
-                    # 添加结果类型校验
-                    if isinstance(result, dict):
-                        all_details[url] = result
+    pending = {}  # future -> (url, 第几次尝试)
+    delayed = []  # 等待重试的 (可提交时间, 序号, url, 第几次尝试)
+    sequence = itertools.count()
+    links = iter(color_links)
+    window = window or max_workers * WINDOW_FACTOR
+    exhausted = False
+
+    def run(url, submitted):
+        Metrics.observe(Metrics.QUEUE_WAIT, time.perf_counter() - submitted)
+        return fetch(url)
+
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        # 进度条设置（优化显示单位）；输入为生成器时总数未知
+        total = len(color_links) if hasattr(color_links, '__len__') else None
+        with tqdm.tqdm(total=total, desc="抓取进度", unit="个", disable=not progress) as pbar:
+            while True:
+                # 补足在途窗口（等待重试的也占窗口），再提交到期的重试
+                while not exhausted and len(pending) + len(delayed) < window:
+                    url = next(links, None)
+                    if url is None:
+                        exhausted = True
+                        break
+                    pending[executor.submit(run, url, time.perf_counter())] = (url, 0)
+                    if retry:
+                        retry.record_request()
+                now = time.monotonic()
+                while delayed and delayed[0][0] <= now:
+                    _, _, url, attempt = heapq.heappop(delayed)
+                    pending[executor.submit(run, url, time.perf_counter())] = (url, attempt)
+                if not pending and not delayed:
+                    break
+                timeout = delayed[0][0] - now if delayed else None
+                if not pending:
+                    time.sleep(timeout)
+                    continue
+
+                done, _ = concurrent.futures.wait(pending, timeout=timeout,
+                                                  return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    url, attempt = pending.pop(future)
+                    try:
+                        result = future.result()
+                        if isinstance(result, concurrent.futures.Future):
+                            pending[result] = (url, attempt)  # 已下载，等待解析进程的结果
+                            continue
+                        # 添加结果类型校验
+                        if not isinstance(result, dict):
+                            raise ValueError("返回非字典类型结果")
+                    except Exception as e:
+                        scheduled = retry.schedule(e, attempt, url) if retry else None
+                        if scheduled:
+                            delay, next_attempt = scheduled
+                            heapq.heappush(delayed, (time.monotonic() + delay, next(sequence), url, next_attempt))
+                            continue
+                        error_type = type(e).__name__
+                        error_msg = error_message(e)
+                        failed_urls.append((url, error_type, error_msg))
+                        if journal:
+                            journal.record_failure(url, error_type, error_msg)
+                        if frontier is not None:
+                            frontier.mark(url, Frontier.FAILED)
+                        if sink:
+                            with Metrics.timer(Metrics.SINK_WRITE):
+                                sink.write_failure(url, error_type, error_msg)
                     else:
-                        raise ValueError("返回非字典类型结果")
-                except Exception as e:
-                    error_type = type(e).__name__
-                    error_msg = str(e).split(": ")[-1]  # 去除URL前缀
-                    failed_urls.append((url, error_type, error_msg))
+                        if collect:
+                            all_details[url] = result
+                        if journal:
+                            journal.record_success(url, result)
+                        if frontier is not None:
+                            frontier.mark(url, Frontier.DONE)
+                        if schedule is not None:
+                            schedule.record(url, result)
+                        if sink:
+                            with Metrics.timer(Metrics.SINK_WRITE):
+                                sink.write_detail(url, result)
+                    pbar.update(1)
+    finally:
+        # Ctrl-C 时取消尚未开始的任务，已完成的结果都在断点日志中
+        executor.shutdown(cancel_futures=True)
+
+    return all_details, failed_urls
+
+
+def main(fetch=fetch_color_details, parse=parse_color_details, fields=FIELDS, max_workers=10,
+         description="多线程抓取颜色详情"):
+    """命令行入口：支持 --resume 断点续爬与 --retry-failed 只重试失败记录"""
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('--links', default='color_links.xlsx', help="颜色链接文件（xlsx，或每行一个链接的文本文件）")
+    parser.add_argument('--journal', default=Checkpoint.JOURNAL_PATH, help="断点日志文件")
+    parser.add_argument('--resume', action='store_true', help="跳过断点日志中已成功的URL（失败的会重新抓取）")
+    parser.add_argument('--overwrite', action='store_true', help="断点日志已有记录时清空它重新开始")
+    parser.add_argument('--retry-failed', action='store_true',
+                        help="只重试输出xlsx中'失败记录'工作表里的URL")
+    parser.add_argument('--workers', type=int, default=max_workers, help="线程数")
+    parser.add_argument('--window', type=int, help=f"在途任务数上限（默认为线程数的{WINDOW_FACTOR}倍），链接按需读取")
+    parser.add_argument('--frontier', help="持久化URL前沿（SQLite）：链接规范化去重后入库，只抓取其中待抓取的URL")
+    parser.add_argument('--recrawl', help="增量重抓（SQLite）：记录每个URL的内容哈希，只抓取超过重抓间隔的URL")
+    parser.add_argument('--ttl-hours', type=float, default=Recrawl.TTL / 3600,
+                        help="新URL的初始重抓间隔（小时），之后按内容是否变化自动缩短或延长")
+    parser.add_argument('--budget', type=int, help="每次运行最多重抓的URL数，经常变化的优先")
+    parser.add_argument('--output', default='color_details.xlsx', help="输出文件")
+    parser.add_argument('--format', choices=list(Sinks.SINKS), help="输出格式（默认取输出文件扩展名）")
+    HttpCache.add_cache_arguments(parser)
+    Archive.add_archive_arguments(parser)
+    Concurrency.add_adaptive_arguments(parser)
+    Hedge.add_hedge_arguments(parser)
+    parser.add_argument('--max-attempts', type=int, default=Retry.MAX_ATTEMPTS,
+                        help="每个链接最多尝试次数，1表示不重试")
+    parser.add_argument('--parse-procs', type=int, default=0,
+                        help="解析进程数；0表示在下载线程内解析（解析进程内的耗时不计入指标）")
+    parser.add_argument('--derive', action='store_true',
+                        help="RGB/CMYK/HSV 由 Hex Code 本地计算，页面上只提取其余字段")
+    parser.add_argument('--local-ral', action='store_true', help="Closest RAL / RAL 也由内置RAL色卡本地计算")
+    parser.add_argument('--early-stop', action='store_true',
+                        help="边下载边解析，需要的字段都找到后不再下载页面其余部分（启用缓存/录制时无效）")
+    Snapshots.add_snapshot_arguments(parser)
+    Metrics.add_metrics_arguments(parser)
+    args = parser.parse_args()
+    HttpCache.enable_from_args(args)
+    Archive.enable_from_args(args)
+    if args.metrics_port:
+        Metrics.serve(args.metrics_port, http_counters)
+
+    if not (args.resume or args.retry_failed or args.overwrite) and Checkpoint.has_records(args.journal):
+        print(f"断点日志{args.journal}中已有记录：用--resume继续，或加--overwrite清空后重新开始")
+        exit()
 
-        # 保存成功数据
-    if all_details:
-        save_to_excel(all_details)
+    if args.retry_failed:
+        color_links = Checkpoint.load_failed_from_excel(args.output)
+        all_details, _ = Checkpoint.load_journal(args.journal)
+        all_details = all_details or Checkpoint.load_details_from_excel(args.output)
+        failed_urls = []
+    elif args.resume:
+        # 只跳过已成功的URL，上次失败的重新抓取
+        all_details, _ = Checkpoint.load_journal(args.journal)
+        failed_urls = []
+        color_links = (url for url in iter_links(args.links) if url not in all_details)
+        print(f"断点日志中已成功{len(all_details)}条")
+    else:
+        all_details, failed_urls = {}, []
+        color_links = iter_links(args.links)
+
+    frontier = Frontier.Frontier(args.frontier) if args.frontier else None
+    if frontier is not None and not args.retry_failed:
+        added = frontier.add_all(color_links)
+        color_links = frontier.pending()
+        counts = frontier.counts()
+        print(f"URL前沿新增{added}条，待抓取{counts.get(Frontier.PENDING, 0)}条，"
+              f"已完成{counts.get(Frontier.DONE, 0)}条")
+        if not counts.get(Frontier.PENDING) and not all_details:
+            print("URL前沿中没有待抓取的链接")
+            exit()
+    schedule = Recrawl.Schedule(args.recrawl, args.ttl_hours * 3600) if args.recrawl else None
+    if schedule is not None and not args.retry_failed:
+        color_links = schedule.due(color_links, args.budget)
+        total, due = schedule.counts()
+        print(f"共{total}条链接，本次重抓{due}条，其余沿用上次结果")
+    elif frontier is None or args.retry_failed:
+        has_links, color_links = _peek(color_links)
+        if not has_links and not all_details:
+            print("未找到有效链接")
+            exit()
+
+    snapshots = Snapshots.enable_from_args(args)
+    journal = Checkpoint.Journal(args.journal, append=args.resume or args.retry_failed)
+    sink = Sinks.open_sink(args.output, fields, args.format)
+    parse_pool = None
+    hedger = None
+    try:
+        # 先写入断点日志中已有的结果，新结果边抓边写
+        for url, details in all_details.items():
+            sink.write_detail(url, details)
+        for url, error_type, error_msg in failed_urls:
+            sink.write_failure(url, error_type, error_msg)
+        if schedule is not None:
+            # 未到期的页面不重抓，输出其上次的结果
+            for url, details in schedule.cached():
+                sink.write_detail(url, details)
+        if args.derive or args.local_ral:
+            parse = ColorConvert.Deriving(parse, fields, RalIndex.RalIndex() if args.local_ral else None)
+            fetch = functools.partial(fetch, parse=parse)
+        if args.early_stop:
+            fetch = functools.partial(fetch, watch=getattr(parse, 'scraped', fields))
+        if args.parse_procs > 0:
+            # 下载线程只做I/O，页面分批交给解析进程
+            parse_pool = ParsePool.ParsePool(parse, args.parse_procs)
+            fetch = functools.partial(fetch, parser=parse_pool)
+
+        if args.hedge:
+            # 慢于近期延迟分位数的请求再发一份，先返回的胜出，额外请求受预算限制
+            hedger = Hedge.Hedger(args.max_concurrency if args.adaptive else args.workers,
+                                  percentile=args.hedge_percentile, budget_ratio=args.hedge_budget)
+            fetch = Hedge.hedged(fetch, hedger)
+
+        # 可重试的失败自动重新排队；主机错误率过高时熔断暂停
+        retry = Retry.RetryPolicy(max_attempts=args.max_attempts)
+        fetch = Retry.guarded(fetch, Retry.CircuitBreaker())
+        if args.adaptive:
+            # 从 --workers 起步，按延迟与限流信号在 [1, --max-concurrency] 间调节
+            controller = Concurrency.AimdController(args.workers, maximum=args.max_concurrency,
+                                                    log_path=args.concurrency_log)
+            details, failures = crawl(color_links, Concurrency.throttled(fetch, controller),
+                                      args.max_concurrency, journal, sink, retry, frontier,
+                                      window=args.window, collect=False, schedule=schedule)
+            controller.close()
+            print(controller.summary())
+        else:
+            details, failures = crawl(color_links, fetch, args.workers, journal, sink, retry, frontier,
+                                      window=args.window, collect=False, schedule=schedule)
+        print(f"自动重试{retry.retries}次")
+        if hedger is not None:
+            print(hedger.summary())
+        if schedule is not None:
+            print(f"重抓结果：内容变化{schedule.changed}条，未变化{schedule.unchanged}条")
+    finally:
+        if hedger is not None:
+            hedger.close()
+        if parse_pool:
+            parse_pool.close()
+        if snapshots is not None:
+            snapshots.close()
+            if snapshots.captured or snapshots.dropped:
+                print(f"已保存{snapshots.captured}个解析失败快照到{args.snapshots}（未保存{snapshots.dropped}个）")
+        journal.close()
+        if frontier is not None:
+            frontier.close()
+        if schedule is not None:
+            schedule.close()
+        with Metrics.timer(Metrics.SINK_CLOSE):
+            sink.close()
+    failed_urls.extend(failures)
+    print(f"已保存{sink.detail_count}条有效数据、{sink.failure_count}条失败记录到{args.output}")
+
+    # 打印最终统计（成功结果已流式写出，不在内存中保留）
+    print_summary(details, failed_urls, succeeded=sink.detail_count)
+    HttpSession.print_reuse_stats()
+    Metrics.print_summary()
+    counters = {'pages_succeeded_total': sink.detail_count, 'pages_failed_total': len(failed_urls)}
+    counters.update(http_counters())
+    if args.metrics_json:
+        Metrics.write_json(args.metrics_json, {'counters': counters})
+    if args.metrics_prom:
+        Metrics.write_prometheus(args.metrics_prom, counters)
 
-        # 保存失败记录
-    if failed_urls:
-        save_failed_urls(failed_urls)
 
-        # 打印最终统计
-    print(f"\n最终统计：")
-    print(f"成功抓取: {len(all_details)}条")
-    print(f"失败记录: {len(failed_urls)}条")
-    if failed_urls:
-        print("失败原因分类：")
-        from collections import defaultdict
-
-        stats = defaultdict(int)
-        for _, error_type, _ in failed_urls:
-            stats[error_type] += 1
-        for error_type, count in stats.items():
-            print(f"  {error_type}: {count}次")
+if __name__ == '__main__':
+    # 使用线程池（限制最大并发数为10）
+    main()
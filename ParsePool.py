@@ -0,0 +1,95 @@
+import concurrent.futures
+import threading
+
+# 常量配置
+BATCH_SIZE = 32  # 每批交给解析进程的页面数
+BATCH_DELAY = 0.2  # 批次未满时最多等待多久（秒）就发出
+
+
+def _parse_batch(parse, pages):
+    """在解析进程中执行：逐页解析，只把提取出的小字典（或异常）传回"""
+    results = []
+    for content in pages:
+        try:
+            results.append((parse(content), None))
+        except Exception as e:
+            # lxml 的异常带有不可序列化的 error_log，只传回异常类型和信息
+            results.append((None, (type(e), str(e))))
+    return results
+
+
+def _rebuild_error(error_type, message):
+    try:
+        return error_type(message)
+    except Exception:
+        return RuntimeError(message)
+
+
+class ParsePool:
+    """把下载好的页面分批交给多进程解析，绕开 GIL 用满多核"""
+
+    def __init__(self, parse, processes=None, batch_size=BATCH_SIZE, batch_delay=BATCH_DELAY):
+        self.parse = parse
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+        self._executor = concurrent.futures.ProcessPoolExecutor(max_workers=processes)
+        self._lock = threading.Lock()
+        self._buffer = []  # [(页面内容, 对应的Future)]
+        self._stop = threading.Event()
+        self._flusher = threading.Thread(target=self._flush_periodically, daemon=True)
+        self._flusher.start()
+
+    def submit(self, content):
+        """提交一页待解析内容，返回解析结果的 Future"""
+        future = concurrent.futures.Future()
+        with self._lock:
+            self._buffer.append((content, future))
+            if len(self._buffer) >= self.batch_size:
+                self._flush_locked()
+        return future
+
+    def _flush_locked(self):
+        if not self._buffer:
+            return
+        batch, self._buffer = self._buffer, []
+        futures = [future for _, future in batch]
+        try:
+            batch_future = self._executor.submit(_parse_batch, self.parse, [content for content, _ in batch])
+        except Exception as e:
+            for future in futures:
+                future.set_exception(e)
+            return
+
+        def distribute(done):
+            try:
+                results = done.result()
+            except Exception as e:  # 解析进程崩溃等整批失败
+                for future in futures:
+                    future.set_exception(e)
+                return
+            for future, (details, error) in zip(futures, results):
+                if error is None:
+                    future.set_result(details)
+                else:
+                    future.set_exception(_rebuild_error(*error))
+
+        batch_future.add_done_callback(distribute)
+
+    def _flush_periodically(self):
+        # 批次迟迟凑不满时（如链接快抓完了）定时发出
+        while not self._stop.wait(self.batch_delay):
+            with self._lock:
+                self._flush_locked()
+
+    def close(self):
+        self._stop.set()
+        self._flusher.join()
+        with self._lock:
+            self._flush_locked()
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
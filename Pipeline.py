@@ -0,0 +1,144 @@
+import argparse
+import queue
+import threading
+
+import Archive
+import Checkpoint
+import Discovery
+import HttpCache
+import HttpSession
+import LazyImport
+import Metrics
+import MultiThreaded
+import Sinks
+
+tqdm = LazyImport.module('tqdm')
+
+# 常量配置
+QUEUE_SIZE = 200  # 发现阶段与详情阶段之间的有界队列长度
+DISCOVERY_WORKERS = 4
+BATCH_SIZE = 20  # 发现阶段每凑够多少条新链接就交给详情阶段
+DETAIL_WORKERS = 10
+
+_DONE = object()  # 队列结束标记
+
+
+def run_pipeline(colors, get_links, fetch, discovery_workers=DISCOVERY_WORKERS,
+                 detail_workers=DETAIL_WORKERS, queue_size=QUEUE_SIZE, journal=None, sink=None, collect=True):
+    """边发现链接边抓取详情，返回 (all_details, failed_urls, 去重后的链接列表)
+
+    与 MultiThreaded.crawl 相同，结果到达时立即写入 journal 与 sink；collect=False 时不在内存中
+    保留成功结果，返回的 all_details 为空。
+    """
+    link_queue = queue.Queue(maxsize=queue_size)
+    lock = threading.Lock()
+    unique_links = []
+    all_details = {}
+    failed_urls = []
+    pbar = tqdm.tqdm(total=0, desc="抓取进度", unit="个")
+
+    def consume():
+        while (url := link_queue.get()) is not _DONE:
+            try:
+                result = fetch(url)
+                if not isinstance(result, dict):
+                    raise ValueError("返回非字典类型结果")
+            except Exception as e:
+                error_type = type(e).__name__
+                error_msg = MultiThreaded.error_message(e)
+                if journal:
+                    journal.record_failure(url, error_type, error_msg)
+                with lock:
+                    failed_urls.append((url, error_type, error_msg))
+                    if sink:
+                        with Metrics.timer(Metrics.SINK_WRITE):
+                            sink.write_failure(url, error_type, error_msg)
+                    pbar.update(1)
+            else:
+                if journal:
+                    journal.record_success(url, result)
+                with lock:
+                    if collect:
+                        all_details[url] = result
+                    if sink:
+                        with Metrics.timer(Metrics.SINK_WRITE):
+                            sink.write_detail(url, result)
+                    pbar.update(1)
+
+    consumers = [threading.Thread(target=consume, daemon=True) for _ in range(detail_workers)]
+    for consumer in consumers:
+        consumer.start()
+
+    try:
+        # 发现阶段并发进行并已去重，每批新链接入队；队列满时阻塞，形成背压
+        for batch in Discovery.discover(colors, get_links, workers=discovery_workers,
+                                        batch_size=BATCH_SIZE, progress=False):
+            unique_links.extend(batch)
+            with lock:
+                pbar.total = len(unique_links)
+                pbar.refresh()
+            for link in batch:
+                link_queue.put(link)
+    finally:
+        for _ in consumers:
+            link_queue.put(_DONE)
+
+    for consumer in consumers:
+        consumer.join()
+    pbar.close()
+
+    return all_details, failed_urls, unique_links
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="链接发现与详情抓取流水线（无需先生成color_links.xlsx）")
+    parser.add_argument('--ral', action='store_true', help="使用 ColorurlRAL 搜索发现与 RAL 字段版本")
+    parser.add_argument('--save-links', action='store_true', help="同时把发现的链接保存为xlsx")
+    parser.add_argument('--discovery-workers', type=int, default=DISCOVERY_WORKERS)
+    parser.add_argument('--detail-workers', type=int, default=DETAIL_WORKERS)
+    parser.add_argument('--queue-size', type=int, default=QUEUE_SIZE)
+    parser.add_argument('--output', default='color_details.xlsx', help="输出文件")
+    parser.add_argument('--format', choices=list(Sinks.SINKS), help="输出格式（默认取输出文件扩展名）")
+    parser.add_argument('--journal', default=Checkpoint.JOURNAL_PATH, help="断点日志文件，每完成一个URL立即写入")
+    parser.add_argument('--overwrite', action='store_true', help="断点日志已有记录时清空它重新开始")
+    HttpCache.add_cache_arguments(parser)
+    Archive.add_archive_arguments(parser)
+    args = parser.parse_args()
+    HttpCache.enable_from_args(args)
+    Archive.enable_from_args(args)
+
+    if args.ral:
+        import ColorurlRAL as discovery
+        import MultiThreadedRAL as details
+    else:
+        import ColorURL as discovery
+        details = MultiThreaded
+
+    if not discovery.COLORS:
+        print("颜色列表为空")
+        exit()
+    if not args.overwrite and Checkpoint.has_records(args.journal):
+        print(f"断点日志{args.journal}中已有记录：换一个--journal，或加--overwrite清空后重新开始")
+        exit()
+
+    # 结果边抓边写入断点日志与输出文件，中途退出也不会丢失已完成的部分
+    journal = Checkpoint.Journal(args.journal, append=False)
+    sink = Sinks.open_sink(args.output, details.FIELDS, args.format)
+    try:
+        all_details, failed_urls, links = run_pipeline(
+            discovery.COLORS, discovery.get_color_links, details.fetch_color_details,
+            args.discovery_workers, args.detail_workers, args.queue_size,
+            journal=journal, sink=sink, collect=False)
+    finally:
+        journal.close()
+        with Metrics.timer(Metrics.SINK_CLOSE):
+            sink.close()
+    print(f"已保存{sink.detail_count}条有效数据、{sink.failure_count}条失败记录到{args.output}")
+
+    # 可选：保存发现的链接
+    if args.save_links and links:
+        discovery.save_to_excel(links)
+        print(f"已保存{len(links)}条链接到{discovery.EXCEL_PATH}")
+
+    MultiThreaded.print_summary(all_details, failed_urls, succeeded=sink.detail_count)
+    HttpSession.print_reuse_stats()
@@ -0,0 +1,379 @@
+from __future__ import annotations  # 注解不求值，numpy 推迟到首次计算时导入
+
+import argparse
+import re
+
+import ColorConvert
+import LazyImport
+
+np = LazyImport.module('numpy')
+
+# 常量配置
+CHUNK_SIZE = 4096  # 每次与整个色卡做矩阵运算的颜色数，控制临时内存
+METRICS = ('ciede2000', 'cie76')
+RAL_FIELDS = ('Closest RAL', 'RAL')
+
+# RAL Classic 色卡（sRGB 近似值）：编号 名称 Hex
+PALETTE = '''
+1000 Green beige #CDBA88
+1001 Beige #D0B084
+1002 Sand yellow #D2AA6D
+1003 Signal yellow #F9A800
+1004 Golden yellow #E49E00
+1005 Honey yellow #CB8E00
+1006 Maize yellow #E29000
+1007 Daffodil yellow #E88C00
+1011 Brown beige #AF804F
+1012 Lemon yellow #DDAF27
+1013 Oyster white #E3D9C6
+1014 Ivory #DDC49A
+1015 Light ivory #E6D2B5
+1016 Sulfur yellow #F1DD38
+1017 Saffron yellow #F6A950
+1018 Zinc yellow #FACA30
+1019 Grey beige #A48F7A
+1020 Olive yellow #A08F65
+1021 Colza yellow #F6B600
+1023 Traffic yellow #F7B500
+1024 Ochre yellow #BA8F4C
+1026 Luminous yellow #FFFF00
+1027 Curry #A77F0E
+1028 Melon yellow #FF9B00
+1032 Broom yellow #E2A300
+1033 Dahlia yellow #F99A1C
+1034 Pastel yellow #EB9C52
+1035 Pearl beige #908370
+1036 Pearl gold #80643F
+1037 Sun yellow #F09200
+2000 Yellow orange #DA6E00
+2001 Red orange #BA481B
+2002 Vermilion #BF3922
+2003 Pastel orange #F67828
+2004 Pure orange #E25303
+2005 Luminous orange #FF4D06
+2007 Luminous bright orange #FFB200
+2008 Bright red orange #ED6B21
+2009 Traffic orange #DE5307
+2010 Signal orange #D05D28
+2011 Deep orange #E26E0E
+2012 Salmon orange #D5654D
+2013 Pearl orange #923E25
+3000 Flame red #A72920
+3001 Signal red #9B2423
+3002 Carmine red #9B2321
+3003 Ruby red #861A22
+3004 Purple red #6B1C23
+3005 Wine red #59191F
+3007 Black red #3E2022
+3009 Oxide red #6D342D
+3011 Brown red #792423
+3012 Beige red #C6846D
+3013 Tomato red #972E25
+3014 Antique pink #CB7375
+3015 Light pink #D8A0A6
+3016 Coral red #A63D2F
+3017 Rose #CB555D
+3018 Strawberry red #C73F4A
+3020 Traffic red #BB1E10
+3022 Salmon pink #CF6955
+3024 Luminous red #FF2D21
+3026 Luminous bright red #FF2A1B
+3027 Raspberry red #AB273C
+3028 Pure red #CC2C24
+3031 Orient red #A63437
+3032 Pearl ruby red #701D23
+3033 Pearl pink #A53A2D
+4001 Red lilac #816183
+4002 Red violet #8D3C4B
+4003 Heather violet #C4618C
+4004 Claret violet #651E38
+4005 Blue lilac #76689A
+4006 Traffic purple #903373
+4007 Purple violet #47243C
+4008 Signal violet #844C82
+4009 Pastel violet #9D8692
+4010 Telemagenta #BC4077
+4011 Pearl violet #6E6387
+4012 Pearl blackberry #6B6B7F
+5000 Violet blue #314F6F
+5001 Green blue #0F4C64
+5002 Ultramarine blue #00387B
+5003 Sapphire blue #1F3855
+5004 Black blue #191E28
+5005 Signal blue #005387
+5007 Brilliant blue #376B8C
+5008 Grey blue #2B3A44
+5009 Azure blue #225F78
+5010 Gentian blue #004F7C
+5011 Steel blue #1A2B3C
+5012 Light blue #0089B6
+5013 Cobalt blue #193153
+5014 Pigeon blue #637D96
+5015 Sky blue #007CB0
+5017 Traffic blue #005B8C
+5018 Turquoise blue #058B8C
+5019 Capri blue #005E83
+5020 Ocean blue #00414B
+5021 Water blue #007577
+5022 Night blue #222D5A
+5023 Distant blue #42698C
+5024 Pastel blue #6093AC
+5025 Pearl gentian blue #21697C
+5026 Pearl night blue #0F3052
+6000 Patina green #3C7460
+6001 Emerald green #366735
+6002 Leaf green #325928
+6003 Olive green #50533C
+6004 Blue green #024442
+6005 Moss green #114232
+6006 Grey olive #3C392E
+6007 Bottle green #2C3222
+6008 Brown green #37342A
+6009 Fir green #27352A
+6010 Grass green #4D6F39
+6011 Reseda green #6B7C59
+6012 Black green #2F3D3A
+6013 Reed green #7C765A
+6014 Yellow olive #474135
+6015 Black olive #3D3D36
+6016 Turquoise green #00694C
+6017 May green #587F40
+6018 Yellow green #61993B
+6019 Pastel green #B9CEAC
+6020 Chrome green #37422F
+6021 Pale green #8A9977
+6022 Olive drab #3A3327
+6024 Traffic green #008351
+6025 Fern green #5E6E3B
+6026 Opal green #005F4E
+6027 Light green #7EBAB5
+6028 Pine green #315442
+6029 Mint green #006F3D
+6032 Signal green #237F52
+6033 Mint turquoise #46877F
+6034 Pastel turquoise #7AADAC
+6035 Pearl green #194D25
+6036 Pearl opal green #04574B
+6037 Pure green #008B29
+6038 Luminous green #00B51A
+7000 Squirrel grey #7A888E
+7001 Silver grey #8C969D
+7002 Olive grey #817863
+7003 Moss grey #7A7669
+7004 Signal grey #9B9B9B
+7005 Mouse grey #6C6E6B
+7006 Beige grey #766A5E
+7008 Khaki grey #745E3D
+7009 Green grey #5D6058
+7010 Tarpaulin grey #585C56
+7011 Iron grey #52595D
+7012 Basalt grey #575D5E
+7013 Brown grey #575044
+7015 Slate grey #4F5358
+7016 Anthracite grey #383E42
+7021 Black grey #2F3234
+7022 Umbra grey #4C4A44
+7023 Concrete grey #808076
+7024 Graphite grey #45494E
+7026 Granite grey #374345
+7030 Stone grey #928E85
+7031 Blue grey #5B686D
+7032 Pebble grey #B5B0A1
+7033 Cement grey #7F8274
+7034 Yellow grey #92886F
+7035 Light grey #C5C7C4
+7036 Platinum grey #979392
+7037 Dusty grey #7A7B7A
+7038 Agate grey #B0B0A9
+7039 Quartz grey #6B665E
+7040 Window grey #989EA1
+7042 Traffic grey A #8E9291
+7043 Traffic grey B #4F5250
+7044 Silk grey #B7B3A8
+7045 Telegrey 1 #8D9295
+7046 Telegrey 2 #7F868A
+7047 Telegrey 4 #C8C8C7
+7048 Pearl mouse grey #817B73
+8000 Green brown #89693E
+8001 Ochre brown #9D622B
+8002 Signal brown #794D3E
+8003 Clay brown #7E4B26
+8004 Copper brown #8D4931
+8007 Fawn brown #70452A
+8008 Olive brown #724A25
+8011 Nut brown #5A3826
+8012 Red brown #66332B
+8014 Sepia brown #4A3526
+8015 Chestnut brown #5E2F26
+8016 Mahogany brown #4C2B20
+8017 Chocolate brown #442F29
+8019 Grey brown #3D3635
+8022 Black brown #1A1718
+8023 Orange brown #A45729
+8024 Beige brown #795038
+8025 Pale brown #755847
+8028 Terra brown #513A2A
+8029 Pearl copper #7F4031
+9001 Cream #E9E0D2
+9002 Grey white #D7D5CB
+9003 Signal white #ECECE7
+9004 Signal black #2B2B2C
+9005 Jet black #0E0E10
+9006 White aluminium #A1A1A0
+9007 Grey aluminium #878581
+9010 Pure white #F1ECE1
+9011 Graphite black #27292B
+9016 Traffic white #F1F0EA
+9017 Traffic black #2A292A
+9018 Papyrus white #C8CBC4
+9022 Pearl light grey #858583
+9023 Pearl dark grey #797B7A
+'''
+
+_CODE = re.compile(r'\b(\d{4})\b')
+_WHITE = (0.95047, 1.0, 1.08883)  # D65
+
+
+def rgb_to_lab(rgb) -> np.ndarray:
+    """(n, 3) sRGB 转为 (n, 3) CIELAB（D65）"""
+    rgb = np.asarray(rgb, dtype=np.float64) / 255
+    linear = np.where(rgb > 0.04045, ((rgb + 0.055) / 1.055) ** 2.4, rgb / 12.92)
+    xyz = linear @ np.array([[0.4124564, 0.2126729, 0.0193339],
+                             [0.3575761, 0.7151522, 0.1191920],
+                             [0.1804375, 0.0721750, 0.9503041]]) / _WHITE
+    f = np.where(xyz > (6 / 29) ** 3, np.cbrt(xyz), xyz / (3 * (6 / 29) ** 2) + 4 / 29)
+    return np.column_stack((116 * f[:, 1] - 16, 500 * (f[:, 0] - f[:, 1]), 200 * (f[:, 1] - f[:, 2])))
+
+
+def delta_e_cie76(lab1, lab2) -> np.ndarray:
+    """CIE76 色差（Lab 欧氏距离），最后一维为 L/a/b，其余维按广播规则对齐"""
+    return np.linalg.norm(lab1 - lab2, axis=-1)
+
+
+def delta_e_ciede2000(lab1, lab2) -> np.ndarray:
+    """CIEDE2000 色差，最后一维为 L/a/b，其余维按广播规则对齐"""
+    l1, a1, b1 = np.moveaxis(lab1, -1, 0)
+    l2, a2, b2 = np.moveaxis(lab2, -1, 0)
+
+    c_mean = (np.hypot(a1, b1) + np.hypot(a2, b2)) / 2
+    g = 0.5 * (1 - np.sqrt(c_mean ** 7 / (c_mean ** 7 + 25 ** 7)))
+    a1p, a2p = a1 * (1 + g), a2 * (1 + g)
+    c1p, c2p = np.hypot(a1p, b1), np.hypot(a2p, b2)
+    h1p = np.degrees(np.arctan2(b1, a1p)) % 360
+    h2p = np.degrees(np.arctan2(b2, a2p)) % 360
+
+    dl = l2 - l1
+    dc = c2p - c1p
+    dh = h2p - h1p
+    dh = np.where(dh > 180, dh - 360, np.where(dh < -180, dh + 360, dh))
+    dh = np.where(c1p * c2p == 0, 0, dh)
+    dh_big = 2 * np.sqrt(c1p * c2p) * np.sin(np.radians(dh / 2))
+
+    l_mean = (l1 + l2) / 2
+    cp_mean = (c1p + c2p) / 2
+    h_sum = h1p + h2p
+    hp_mean = np.where(np.abs(h1p - h2p) > 180,
+                       np.where(h_sum < 360, h_sum + 360, h_sum - 360), h_sum) / 2
+    hp_mean = np.where(c1p * c2p == 0, h_sum, hp_mean)
+
+    t = (1 - 0.17 * np.cos(np.radians(hp_mean - 30)) + 0.24 * np.cos(np.radians(2 * hp_mean))
+         + 0.32 * np.cos(np.radians(3 * hp_mean + 6)) - 0.20 * np.cos(np.radians(4 * hp_mean - 63)))
+    sl = 1 + 0.015 * (l_mean - 50) ** 2 / np.sqrt(20 + (l_mean - 50) ** 2)
+    sc = 1 + 0.045 * cp_mean
+    sh = 1 + 0.015 * cp_mean * t
+    rt = (-2 * np.sqrt(cp_mean ** 7 / (cp_mean ** 7 + 25 ** 7))
+          * np.sin(np.radians(60 * np.exp(-((hp_mean - 275) / 25) ** 2))))
+    return np.sqrt((dl / sl) ** 2 + (dc / sc) ** 2 + (dh_big / sh) ** 2 + rt * (dc / sc) * (dh_big / sh))
+
+
+def load_palette(path=None) -> list[tuple]:
+    """读取色卡，返回 [(编号, 名称, Hex)]；path 为每行"编号 名称 #RRGGBB"的文本文件，默认用内置色卡"""
+    text = PALETTE
+    if path:
+        with open(path, encoding='utf-8') as f:
+            text = f.read()
+    palette = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        code, rest = line.split(' ', 1)
+        name, hex_code = rest.rsplit(' ', 1)
+        palette.append((code, name, hex_code))
+    return palette
+
+
+class RalIndex:
+    """RAL 最近色查询：CIELAB 下与整个色卡批量计算色差（分块做矩阵运算）"""
+
+    def __init__(self, palette=None, metric='ciede2000'):
+        if metric not in METRICS:
+            raise ValueError(f"未知色差公式: {metric}")
+        self.palette = palette or load_palette()
+        self.metric = metric
+        self.labels = [f'{code} [{name}]' for code, name, _ in self.palette]
+        self._lab = rgb_to_lab(ColorConvert.hex_to_rgb([hex_code for _, _, hex_code in self.palette]))
+
+    def nearest(self, hex_codes) -> tuple[np.ndarray, np.ndarray]:
+        """一批 Hex 的最近 RAL，返回 (色卡下标数组, 色差数组)；无效 Hex 的下标为 -1、色差为 NaN"""
+        lab = rgb_to_lab(ColorConvert.hex_to_rgb(hex_codes))
+        indices = np.empty(len(lab), dtype=np.int64)
+        deltas = np.empty(len(lab))
+        distance = delta_e_ciede2000 if self.metric == 'ciede2000' else delta_e_cie76
+        for start in range(0, len(lab), CHUNK_SIZE):
+            matrix = distance(lab[start:start + CHUNK_SIZE, None, :], self._lab[None, :, :])  # (n, m)
+            indices[start:start + CHUNK_SIZE] = matrix.argmin(axis=1)
+            deltas[start:start + CHUNK_SIZE] = matrix.min(axis=1)
+        indices[np.isnan(deltas)] = -1
+        return indices, deltas
+
+    def lookup(self, hex_codes) -> list[str]:
+        """一批 Hex 的最近 RAL，格式为"编号 [名称]"；无效 Hex 为 None"""
+        indices, _ = self.nearest(hex_codes)
+        return [self.labels[i] if i >= 0 else None for i in indices]
+
+    def verify(self, all_details) -> list[tuple]:
+        """与抓取到的 Closest RAL / RAL 比较编号，返回 [(url, 字段, 抓取值, 计算值)]"""
+        rows = [(url, field, details[field]) for url, details in all_details.items()
+                for field in RAL_FIELDS if details.get(field) and details.get('Hex Code')]
+        if not rows:
+            return []
+        computed = self.lookup([all_details[url]['Hex Code'] for url, _, _ in rows])
+        mismatches = []
+        for (url, field, scraped), label in zip(rows, computed):
+            match = _CODE.search(str(scraped))
+            if not match or label is None or match.group(1) != label.split(' ', 1)[0]:
+                mismatches.append((url, field, scraped, label))
+        return mismatches
+
+
+def read_hex_codes(path):
+    """读取待查询的Hex：每行一个的文本文件，或抓取结果（xlsx/jsonl）中的 Hex Code"""
+    if path.endswith(('.xlsx', '.jsonl')):
+        return [details['Hex Code'] for details in ColorConvert.load_details(path).values()
+                if details.get('Hex Code')]
+    with open(path, encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="本地查询最近的RAL颜色，无需抓取页面")
+    parser.add_argument('hex', nargs='*', help="要查询的Hex，如 #FF0000")
+    parser.add_argument('--input', help="批量查询：每行一个Hex的文本文件，或抓取结果（xlsx/jsonl）")
+    parser.add_argument('--verify', help="与抓取结果（xlsx/jsonl）中的 Closest RAL / RAL 对比")
+    parser.add_argument('--palette', help="自定义色卡文件（每行：编号 名称 #RRGGBB）")
+    parser.add_argument('--metric', choices=METRICS, default='ciede2000', help="色差公式")
+    args = parser.parse_args()
+
+    index = RalIndex(load_palette(args.palette), args.metric)
+    hex_codes = list(args.hex) + (read_hex_codes(args.input) if args.input else [])
+    if hex_codes:
+        indices, deltas = index.nearest(hex_codes)
+        for hex_code, i, delta in zip(hex_codes, indices, deltas):
+            print(f"{hex_code}\t{index.labels[i]}\tΔE={delta:.2f}" if i >= 0 else f"{hex_code}\t无效的Hex")
+    if args.verify:
+        all_details = ColorConvert.load_details(args.verify)
+        mismatches = index.verify(all_details)
+        for url, field, scraped, computed in mismatches:
+            print(f"  {url} {field}: 抓取 {scraped} / 计算 {computed}")
+        print(f"核对{len(all_details)}条，RAL编号不一致{len(mismatches)}处")
@@ -0,0 +1,140 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+# 常量配置
+SCHEDULE_PATH = 'recrawl.sqlite'
+TTL = 24 * 3600.0  # 新页面的初始重抓间隔（秒）
+MIN_TTL = 6 * 3600.0  # 经常变化的页面最短间隔
+MAX_TTL = 30 * 24 * 3600.0  # 长期不变的页面最长间隔
+CHUNK_SIZE = 1000
+COMMIT_EVERY = 200
+
+
+def content_hash(details):
+    """提取结果的内容哈希（字段顺序无关）"""
+    return hashlib.sha1(json.dumps(details, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+class Schedule:
+    """按URL记录上次抓取/上次变化时间与内容哈希，只挑出到期的URL重抓
+
+    每个URL的重抓间隔自适应：内容变了减半（不低于 MIN_TTL），没变翻倍（不超过 MAX_TTL）。
+    """
+
+    def __init__(self, path=SCHEDULE_PATH, ttl=TTL):
+        self.ttl = ttl
+        self.run = time.time()  # 本次运行的标识
+        self.changed = 0
+        self.unchanged = 0
+        self._lock = threading.Lock()
+        self._uncommitted = 0
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('''CREATE TABLE IF NOT EXISTS pages (
+            url TEXT PRIMARY KEY,
+            last_fetched REAL,
+            last_changed REAL,
+            content_hash TEXT,
+            details TEXT,
+            fetches INTEGER DEFAULT 0,
+            changes INTEGER DEFAULT 0,
+            interval REAL,
+            seen REAL,
+            scheduled REAL)''')
+
+    def due(self, urls, budget=None, chunk_size=CHUNK_SIZE):
+        """登记本次的链接列表，返回到期需要重抓的URL（最多 budget 个）的生成器
+
+        从未抓过的排最前，其次按历史变化率从高到低，同等情况下逾期越久越先。
+        """
+        chunk = []
+        for url in urls:
+            chunk.append((url, self.ttl, self.run))
+            if len(chunk) >= chunk_size:
+                self._register(chunk)
+                chunk = []
+        self._register(chunk)
+
+        with self._lock:
+            # 临时表按优先级顺序插入，按 rowid 读取即为抓取顺序
+            self._db.execute('DROP TABLE IF EXISTS temp.due')
+            self._db.execute('''CREATE TEMP TABLE due AS
+                SELECT url FROM pages
+                WHERE seen = :run AND (last_fetched IS NULL OR last_fetched + interval <= :run)
+                ORDER BY last_fetched IS NOT NULL, CAST(changes AS REAL) / MAX(fetches, 1) DESC,
+                         last_fetched + interval
+                LIMIT :budget''', {'run': self.run, 'budget': budget if budget else -1})
+            self._db.execute('UPDATE pages SET scheduled = ? WHERE url IN (SELECT url FROM temp.due)', (self.run,))
+            self._db.commit()
+        return (url for _, url in self._rows('SELECT rowid, url FROM temp.due WHERE 1'))
+
+    def _register(self, rows):
+        with self._lock:
+            self._db.executemany('INSERT INTO pages (url, interval, seen) VALUES (?, ?, ?) '
+                                 'ON CONFLICT(url) DO UPDATE SET seen = excluded.seen', rows)
+            self._db.commit()
+
+    def _rows(self, query, params=(), chunk_size=CHUNK_SIZE):
+        """按 rowid 逐批读取，不一次性读入内存"""
+        last = 0
+        while True:
+            with self._lock:
+                rows = self._db.execute(f'{query} AND rowid > ? ORDER BY rowid LIMIT ?',
+                                        (*params, last, chunk_size)).fetchall()
+            if not rows:
+                return
+            last = rows[-1][0]
+            yield from rows
+
+    def cached(self):
+        """本次链接列表中未到期（不重抓）页面的上次结果，(url, 详情) 生成器"""
+        for _, url, details in self._rows('SELECT rowid, url, details FROM pages WHERE seen = ? '
+                                          'AND scheduled IS NOT seen AND details IS NOT NULL', (self.run,)):
+            yield url, json.loads(details)
+
+    def counts(self):
+        """本次链接列表中 (总数, 需重抓数)"""
+        with self._lock:
+            return self._db.execute('SELECT COUNT(*), COUNT(CASE WHEN scheduled = :run THEN 1 END) '
+                                    'FROM pages WHERE seen = :run', {'run': self.run}).fetchone()
+
+    def record(self, url, details):
+        """记录一次成功抓取：内容变化时缩短间隔，不变时延长"""
+        now = time.time()
+        digest = content_hash(details)
+        with self._lock:
+            row = self._db.execute('SELECT content_hash, interval FROM pages WHERE url = ?', (url,)).fetchone()
+            old_hash, interval = row if row else (None, self.ttl)
+            changed = old_hash != digest
+            if old_hash is not None:
+                interval = max(MIN_TTL, interval / 2) if changed else min(MAX_TTL, interval * 2)
+                if changed:
+                    self.changed += 1
+                else:
+                    self.unchanged += 1
+            self._db.execute('''INSERT INTO pages (url, last_fetched, last_changed, content_hash, details,
+                                                   fetches, changes, interval, seen)
+                VALUES (:url, :now, :now, :hash, :details, 1, 0, :interval, :run)
+                ON CONFLICT(url) DO UPDATE SET
+                    last_fetched = :now,
+                    last_changed = CASE WHEN :changed THEN :now ELSE last_changed END,
+                    content_hash = :hash,
+                    details = :details,
+                    fetches = fetches + 1,
+                    changes = changes + :changed_after_first,
+                    interval = :interval''',
+                             {'url': url, 'now': now, 'hash': digest, 'interval': interval, 'run': self.run,
+                              'details': json.dumps(details, ensure_ascii=False), 'changed': changed,
+                              'changed_after_first': int(changed and old_hash is not None)})
+            self._uncommitted += 1
+            if self._uncommitted >= COMMIT_EVERY:
+                self._db.commit()
+                self._uncommitted = 0
+
+    def close(self):
+        with self._lock:
+            self._db.commit()
+            self._db.close()
@@ -0,0 +1,267 @@
+import argparse
+import json
+import re
+import sqlite3
+import threading
+import time
+
+import ColorConvert
+import LazyImport
+import RalIndex
+import Sinks
+
+np = LazyImport.module('numpy')
+
+# 常量配置
+STORE_PATH = 'colors.sqlite'
+BATCH_SIZE = 500  # 攒够多少条结果批量计算数值列并写入
+NEAREST_K = 5
+BUSY_TIMEOUT = 30.0
+
+_RAL_CODE = re.compile(r'\b(\d{4})\b')
+_RAL_FIELDS = ('Closest RAL', 'RAL')
+_COLUMNS = ('url', 'hex', 'r', 'g', 'b', 'c', 'm', 'y', 'k', 'h', 's', 'v', 'lab_l', 'lab_a', 'lab_b',
+            'ral', 'ral_text', 'details', 'updated')
+
+
+def normalize_hex(value):
+    """'bb1e10' / '#BB1E10' / '#b11' 统一为 '#BB1E10' 的形式，不是合法Hex时为 None"""
+    digits = ColorConvert.hex_digits(value)
+    return '#' + digits.upper() if digits else None
+
+
+class ResultStore:
+    """抓取结果库（SQLite）：按URL upsert，Hex/RGB/CMYK/HSV/CIELAB/RAL 为带索引的数值列，原始字段保存为JSON"""
+
+    def __init__(self, path=STORE_PATH, batch_size=BATCH_SIZE):
+        self.path = path
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        self._pending = {}  # url -> details，批量写入
+        self._lab = None  # nearest 用的 (url数组, Hex数组, CIELAB矩阵) 缓存，写入后失效
+        self._db = sqlite3.connect(path, timeout=BUSY_TIMEOUT, check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.execute('''CREATE TABLE IF NOT EXISTS colors (
+            url TEXT PRIMARY KEY,
+            hex TEXT,
+            r INTEGER, g INTEGER, b INTEGER,
+            c REAL, m REAL, y REAL, k REAL,
+            h REAL, s REAL, v REAL,
+            lab_l REAL, lab_a REAL, lab_b REAL,
+            ral TEXT,
+            ral_text TEXT,
+            details TEXT NOT NULL,
+            updated REAL)''')
+        self._db.execute('CREATE INDEX IF NOT EXISTS idx_hex ON colors(hex)')
+        self._db.execute('CREATE INDEX IF NOT EXISTS idx_rgb ON colors(r, g, b)')
+        self._db.execute('CREATE INDEX IF NOT EXISTS idx_ral ON colors(ral)')
+        self._db.execute('''CREATE TABLE IF NOT EXISTS failures (
+            url TEXT PRIMARY KEY,
+            error_type TEXT,
+            error TEXT,
+            updated REAL)''')
+        self._db.commit()
+
+    def upsert(self, url, details):
+        """写入（或覆盖）一个URL的结果；攒够一批再计算数值列落盘"""
+        with self._lock:
+            self._pending[url] = details
+            if len(self._pending) >= self.batch_size:
+                self._flush()
+
+    def record_failure(self, url, error_type, error_msg):
+        """记录失败并立即提交（失败不多，进程中途退出也不丢）；之前成功过的结果保留不动"""
+        with self._lock:
+            self._db.execute('INSERT OR REPLACE INTO failures VALUES (?, ?, ?, ?)',
+                             (url, error_type, error_msg, time.time()))
+            self._db.commit()
+
+    def _flush(self):
+        if not self._pending:
+            return
+        items, self._pending = list(self._pending.items()), {}
+        hex_codes = [normalize_hex(details.get('Hex Code')) for _, details in items]
+        valid = [i for i, hex_code in enumerate(hex_codes) if hex_code]
+        numbers = [None] * len(items)
+        if valid:
+            columns = ColorConvert.convert([hex_codes[i] for i in valid])
+            rgb = np.column_stack([columns[name] for name in 'RGB'])
+            lab = RalIndex.rgb_to_lab(rgb)
+            values = np.column_stack([columns[name] for name in ColorConvert.COLUMNS] + [lab]).tolist()
+            for i, row in zip(valid, values):
+                numbers[i] = [int(x) for x in row[:3]] + [round(x, 4) for x in row[3:]]
+
+        now = time.time()
+        rows = []
+        for (url, details), hex_code, row in zip(items, hex_codes, numbers):
+            ral_text = next((details[field] for field in _RAL_FIELDS if details.get(field)), None)
+            match = _RAL_CODE.search(str(ral_text or ''))
+            rows.append((url, hex_code, *(row or [None] * 13), match.group(1) if match else None, ral_text,
+                         json.dumps(details, ensure_ascii=False), now))
+        placeholders = ', '.join('?' * len(_COLUMNS))
+        updates = ', '.join(f'{name} = excluded.{name}' for name in _COLUMNS[1:])
+        self._db.executemany(f'INSERT INTO colors VALUES ({placeholders}) ON CONFLICT(url) DO UPDATE SET {updates}',
+                             rows)
+        self._db.executemany('DELETE FROM failures WHERE url = ?', [(url,) for url, _ in items])
+        self._db.commit()
+        self._lab = None
+
+    def flush(self):
+        with self._lock:
+            self._flush()
+            self._db.commit()
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            self._flush()
+            cursor = self._db.execute(sql, params)
+            names = [column[0] for column in cursor.description]
+            return [dict(zip(names, row)) for row in cursor.fetchall()]
+
+    def by_hex(self, hex_code):
+        """精确查询Hex（走索引）"""
+        return self._query('SELECT url, hex, r, g, b, ral, ral_text FROM colors WHERE hex = ?',
+                           (normalize_hex(hex_code),))
+
+    def by_rgb(self, r, g, b):
+        """精确查询RGB（走索引）"""
+        return self._query('SELECT url, hex, r, g, b, ral, ral_text FROM colors WHERE r = ? AND g = ? AND b = ?',
+                           (r, g, b))
+
+    def by_ral(self, code):
+        """列出某个RAL编号下的所有颜色，按明度排序"""
+        match = _RAL_CODE.search(str(code))
+        return self._query('SELECT url, hex, r, g, b, ral, ral_text FROM colors WHERE ral = ? ORDER BY lab_l DESC',
+                           (match.group(1) if match else str(code),))
+
+    def ral_groups(self):
+        """各RAL编号下的颜色数"""
+        return self._query('SELECT ral, COUNT(*) AS colors FROM colors WHERE ral IS NOT NULL '
+                           'GROUP BY ral ORDER BY colors DESC')
+
+    def nearest(self, hex_code, k=NEAREST_K):
+        """库中与 hex_code 色差（CIEDE2000）最小的 k 个颜色；CIELAB 矩阵首次查询时读入并缓存"""
+        target = normalize_hex(hex_code)
+        if target is None:
+            raise ValueError(f"无效的Hex: {hex_code}")
+        with self._lock:
+            self._flush()
+            if self._lab is None:
+                rows = self._db.execute('SELECT url, hex, lab_l, lab_a, lab_b FROM colors '
+                                        'WHERE lab_l IS NOT NULL').fetchall()
+                self._lab = ([row[0] for row in rows], [row[1] for row in rows],
+                             np.array([row[2:] for row in rows], dtype=np.float64).reshape(-1, 3))
+            urls, hex_codes, lab = self._lab
+        if not urls:
+            return []
+        target = RalIndex.rgb_to_lab(ColorConvert.hex_to_rgb([target]))
+        deltas = RalIndex.delta_e_ciede2000(target, lab)
+        k = min(k, len(urls))
+        best = np.argpartition(deltas, k - 1)[:k]
+        best = best[np.argsort(deltas[best])]
+        return [{'url': urls[i], 'hex': hex_codes[i], 'delta_e': round(float(deltas[i]), 2)} for i in best]
+
+    def details(self, chunk_size=BATCH_SIZE):
+        """按写入顺序逐批产出 (url, 详情字典)，供导出，不一次性读入内存"""
+        last = 0
+        while True:
+            with self._lock:
+                self._flush()
+                rows = self._db.execute('SELECT rowid, url, details FROM colors WHERE rowid > ? '
+                                        'ORDER BY rowid LIMIT ?', (last, chunk_size)).fetchall()
+            if not rows:
+                return
+            last = rows[-1][0]
+            for _, url, details in rows:
+                yield url, json.loads(details)
+
+    def failures(self):
+        with self._lock:
+            return self._db.execute('SELECT url, error_type, error FROM failures ORDER BY rowid').fetchall()
+
+    def counts(self):
+        """(结果数, 有RAL的结果数, 失败数)"""
+        with self._lock:
+            self._flush()
+            colors, with_ral = self._db.execute('SELECT COUNT(*), COUNT(ral) FROM colors').fetchone()
+            failures = self._db.execute('SELECT COUNT(*) FROM failures').fetchone()[0]
+        return colors, with_ral, failures
+
+    def close(self):
+        with self._lock:
+            self._flush()
+            self._db.commit()
+            self._db.close()
+
+
+def export(store, path, fields, fmt=None):
+    """把结果库导出为 xlsx/csv/jsonl/parquet"""
+    with Sinks.open_sink(path, fields, fmt) as sink:
+        for url, details in store.details():
+            sink.write_detail(url, details)
+        for url, error_type, error_msg in store.failures():
+            sink.write_failure(url, error_type, error_msg)
+    return sink
+
+
+def _print_rows(rows):
+    for row in rows:
+        print('\t'.join('' if value is None else str(value) for value in row.values()))
+    if not rows:
+        print("没有结果")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="查询抓取结果库（抓取时用 --output colors.sqlite 写入）")
+    parser.add_argument('--db', default=STORE_PATH, help="结果库文件")
+    commands = parser.add_subparsers(dest='command', required=True)
+    command = commands.add_parser('hex', help="精确查询Hex")
+    command.add_argument('hex')
+    command = commands.add_parser('rgb', help="精确查询RGB")
+    command.add_argument('rgb', type=int, nargs=3)
+    command = commands.add_parser('ral', help="列出某个RAL编号下的颜色（不给编号时列出各编号的颜色数）")
+    command.add_argument('code', nargs='?')
+    command = commands.add_parser('nearest', help="库中色差最小的颜色")
+    command.add_argument('hex')
+    command.add_argument('-k', type=int, default=NEAREST_K)
+    command = commands.add_parser('import', help="导入已有结果（xlsx 或 jsonl 断点日志）")
+    command.add_argument('input')
+    command = commands.add_parser('export', help="导出为 xlsx/csv/jsonl/parquet")
+    command.add_argument('--output', default='color_details.xlsx')
+    command.add_argument('--format', choices=list(Sinks.SINKS))
+    command.add_argument('--ral', action='store_true', help="按RAL版本的字段导出")
+    commands.add_parser('stats', help="结果数与失败数")
+    args = parser.parse_args()
+
+    store = ResultStore(args.db)
+    start = time.perf_counter()
+    if args.command == 'hex':
+        _print_rows(store.by_hex(args.hex))
+    elif args.command == 'rgb':
+        _print_rows(store.by_rgb(*args.rgb))
+    elif args.command == 'ral':
+        _print_rows(store.by_ral(args.code) if args.code else store.ral_groups())
+    elif args.command == 'nearest':
+        try:
+            _print_rows(store.nearest(args.hex, args.k))
+        except ValueError as e:
+            print(e)
+    elif args.command == 'import':
+        all_details = ColorConvert.load_details(args.input)
+        for url, details in all_details.items():
+            store.upsert(url, details)
+        store.flush()
+        print(f"已导入{len(all_details)}条结果")
+    elif args.command == 'export':
+        import MultiThreaded
+        import MultiThreadedRAL
+        fields = MultiThreadedRAL.FIELDS if args.ral else MultiThreaded.FIELDS
+        sink = export(store, args.output, fields, args.format)
+        print(f"已导出{sink.detail_count}条有效数据、{sink.failure_count}条失败记录到{args.output}")
+    else:
+        colors, with_ral, failures = store.counts()
+        print(f"结果{colors}条（含RAL {with_ral}条），失败{failures}条")
+    if args.command in ('hex', 'rgb', 'ral', 'nearest'):
+        print(f"查询耗时{(time.perf_counter() - start) * 1000:.1f}毫秒")
+    store.close()
@@ -0,0 +1,183 @@
+import asyncio
+import functools
+import random
+import sys
+import threading
+import time
+from collections import deque
+from urllib.parse import urlsplit
+
+from lxml import etree
+
+import Concurrency
+
+# 错误分类
+TRANSIENT = 'transient'  # 网络抖动：连接失败、超时、断开
+THROTTLED = 'throttled'  # 服务端过载：HTTP 429 / 5xx
+PERMANENT = 'permanent'  # 不可重试：4xx、XPathError/ValueError 等解析失败
+
+# 常量配置
+MAX_ATTEMPTS = 4  # 每个URL最多尝试次数（含第一次）
+BASE_DELAY = 0.5  # 退避基数（秒），第n次重试最多等待 BASE_DELAY * 2**n
+MAX_DELAY = 30.0
+BUDGET_RATIO = 0.2  # 每个新URL为重试预算存入的额度
+BUDGET_MIN = 20  # 初始重试预算
+MAX_CIRCUIT_WAITS = 3  # 熔断期间每个URL最多重新排队几次（不超过 max_attempts - 1），之后按 CircuitOpenError 失败
+
+BREAKER_WINDOW = 20  # 熔断器统计最近多少次请求
+BREAKER_THRESHOLD = 0.5  # 错误率超过该比例时暂停该主机
+BREAKER_MIN_SAMPLES = 10
+BREAKER_OPEN_SECONDS = 30.0
+
+
+class CircuitOpenError(RuntimeError):
+    """主机处于熔断状态，请求未发出"""
+
+    def __init__(self, host, retry_in):
+        super().__init__(f"{host} 已熔断，{retry_in:.1f}秒后再试")
+        self.host = host
+        self.retry_in = retry_in
+
+
+def _chain(error):
+    """原始异常会被抓取函数包装后重新抛出，沿 __cause__ 链逐层返回"""
+    while error is not None:
+        yield error
+        error = error.__cause__
+
+
+def classify(error):
+    """把异常归类为 TRANSIENT/THROTTLED/PERMANENT，返回 (类别, Retry-After秒数)"""
+    # 先找HTTP状态码：包装后的 HTTPError 不带 response，且 requests 的异常都继承自 OSError
+    for e in _chain(error):
+        if isinstance(e, CircuitOpenError):
+            return TRANSIENT, e.retry_in
+        response = getattr(e, 'response', None)
+        status = getattr(response, 'status_code', None) or getattr(e, 'status', None)
+        if isinstance(status, int) and status >= 400:
+            if status == 429 or status >= 500:
+                headers = getattr(response, 'headers', None) or getattr(e, 'headers', None)
+                return THROTTLED, Concurrency.parse_retry_after(headers)
+            return PERMANENT, None
+
+    aiohttp = sys.modules.get('aiohttp')  # 只在已加载时识别 aiohttp 的连接异常
+    for e in _chain(error):
+        # 先判断 ValueError：requests 的 InvalidURL/MissingSchema/InvalidSchema 同时继承 OSError，链接写错重试也没用
+        if isinstance(e, (etree.XPathError, ValueError)):
+            return PERMANENT, None
+        if isinstance(e, (asyncio.TimeoutError, OSError)):
+            return TRANSIENT, None
+        if aiohttp and isinstance(e, aiohttp.ClientConnectionError):
+            return TRANSIENT, None
+    return PERMANENT, None
+
+
+class RetryPolicy:
+    """指数退避（带随机抖动）+ 重试预算，决定失败的URL是否及何时重新排队"""
+
+    def __init__(self, max_attempts=MAX_ATTEMPTS, base_delay=BASE_DELAY, max_delay=MAX_DELAY,
+                 budget_ratio=BUDGET_RATIO, budget_min=BUDGET_MIN, max_circuit_waits=MAX_CIRCUIT_WAITS):
+        self.max_attempts = max_attempts
+        self.max_circuit_waits = min(max_circuit_waits, max_attempts - 1)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget_ratio = budget_ratio
+        self.tokens = float(budget_min)
+        self.retries = 0
+        self._circuit_waits = {}  # url -> 因熔断重新排队的次数
+
+    def record_request(self):
+        """每个新URL存入一份重试预算"""
+        self.tokens += self.budget_ratio
+
+    def schedule(self, error, attempt, url=None):
+        """返回 (等待秒数, 下次的尝试序号)；不应重试时返回 None"""
+        category, retry_after = classify(error)
+        if any(isinstance(e, CircuitOpenError) for e in _chain(error)):
+            # 熔断时请求没发出，不消耗次数与预算；但同一URL排队次数有上限，主机一直熔断时让运行能结束
+            waits = self._circuit_waits.get(url, 0)
+            if waits >= self.max_circuit_waits:
+                self._circuit_waits.pop(url, None)
+                return None
+            self._circuit_waits[url] = waits + 1
+            return retry_after, attempt
+        if category == PERMANENT or attempt + 1 >= self.max_attempts or self.tokens < 1:
+            return None
+
+        self.tokens -= 1
+        self.retries += 1
+        # full jitter：在 [0, base * 2^attempt] 内随机等待，避免重试同时涌向服务端
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        if retry_after:
+            delay = max(delay, retry_after)
+        return delay, attempt + 1
+
+
+class CircuitBreaker:
+    """按主机统计最近请求的错误率，超过阈值时暂停该主机一段时间"""
+
+    def __init__(self, window=BREAKER_WINDOW, threshold=BREAKER_THRESHOLD,
+                 min_samples=BREAKER_MIN_SAMPLES, open_seconds=BREAKER_OPEN_SECONDS):
+        self.window = window
+        self.threshold = threshold
+        self.min_samples = min_samples
+        self.open_seconds = open_seconds
+        self._lock = threading.Lock()
+        self._hosts = {}
+
+    def _state(self, host):
+        if host not in self._hosts:
+            self._hosts[host] = {'results': deque(maxlen=self.window), 'opened_until': 0.0, 'probing': False}
+        return self._hosts[host]
+
+    def before(self, host):
+        """请求前检查；熔断中抛出 CircuitOpenError，到期后只放行一个探测请求（半开）"""
+        with self._lock:
+            state = self._state(host)
+            if not state['opened_until']:
+                return
+            remaining = state['opened_until'] - time.monotonic()
+            if remaining > 0:
+                raise CircuitOpenError(host, remaining)
+            if state['probing']:
+                raise CircuitOpenError(host, 1.0)
+            state['probing'] = True
+
+    def record(self, host, ok):
+        with self._lock:
+            state = self._state(host)
+            if state['probing']:
+                state['probing'] = False
+                if ok:
+                    state['opened_until'] = 0.0
+                    state['results'].clear()
+                    print(f"{host} 已恢复")
+                else:
+                    state['opened_until'] = time.monotonic() + self.open_seconds
+                return
+
+            results = state['results']
+            results.append(ok)
+            failures = results.count(False)
+            if len(results) >= self.min_samples and failures / len(results) >= self.threshold:
+                state['opened_until'] = time.monotonic() + self.open_seconds
+                results.clear()
+                print(f"{host} 错误率过高（{failures}次失败），暂停{self.open_seconds:.0f}秒")
+
+
+def guarded(fetch, breaker):
+    """包装抓取函数：按主机熔断，解析类错误不计入主机错误率"""
+
+    @functools.wraps(fetch)
+    def wrapper(url):
+        host = urlsplit(url).netloc
+        breaker.before(host)
+        try:
+            result = fetch(url)
+        except Exception as e:
+            breaker.record(host, classify(e)[0] == PERMANENT)
+            raise
+        breaker.record(host, True)
+        return result
+
+    return wrapper
@@ -1,8 +1,14 @@
-import requests
 from lxml import etree
-from openpyxl import Workbook
-from tqdm import tqdm  # 进度条支持
-from openpyxl import load_workbook
+
+import Extractor
+import HttpSession
+import LazyImport
+
+openpyxl = LazyImport.module('openpyxl')
+tqdm = LazyImport.module('tqdm')  # 进度条支持
+
+FIELDS = ('Hex Code', 'RGB Values', 'CMYK Values', 'HSV/HSB Values', 'Closest RAL')
+
 
 def fetch_color_details(url):
     """抓取颜色页面的详细信息"""
@@ -11,25 +17,14 @@ def fetch_color_details(url):
     }
 
     try:
-        response = requests.get(url, headers=headers, timeout=10)
+        response = HttpSession.get_session(max_retries=0).get(url, headers=headers, timeout=10)
         if response.status_code != 200:
             return None
 
-        tree = etree.HTML(response.content)
-
-        # 使用更健壮的XPath定位方式
-        def get_value(label):
-            xpath = f'//tr[td[@class="left" and contains(., "{label}")]]/td[@class="right"]'
-            element = tree.xpath(xpath)
-            return element[0].xpath('string()').strip() if element else "N/A"
+        values = Extractor.extract_fields(etree.HTML(response.content), FIELDS)
 
-        return {
-            'Hex Code': get_value("Hex Code"),
-            'RGB Values': get_value("RGB Values"),  # 保留原始空格
-            'CMYK Values': get_value("CMYK Values"),  # 保留百分号
-            'HSV/HSB Values': get_value("HSV/HSB Values"),  # 保留角度符号°
-            'Closest RAL': get_value("Closest RAL")  # 保留完整描述
-        }
+        # 缺失字段记为 N/A，保留页面原始格式（空格、百分号、角度符号°等）
+        return {label: value if value is not None else "N/A" for label, value in values.items()}
 
     except Exception as e:
         print(f"抓取失败：{url}，错误：{str(e)}")
@@ -38,7 +33,7 @@ def fetch_color_details(url):
 
 def save_to_excel(all_data):
     """保存到Excel文件（合并后的版本）"""
-    wb = Workbook()
+    wb = openpyxl.Workbook()
     ws = wb.active
     ws.title = "颜色代码"
 
@@ -73,7 +68,7 @@ def save_to_excel(all_data):
 
 def save_to_excel(all_data):
     """保存到Excel文件"""
-    wb = Workbook()
+    wb = openpyxl.Workbook()
     ws = wb.active
     ws.title = "颜色代码"
 
@@ -93,7 +88,7 @@ def save_to_excel(all_data):
 def load_links_from_excel(file_path='color_links.xlsx'):
     """从之前生成的Excel文件中读取所有颜色链接"""
     try:
-        wb = load_workbook(file_path)
+        wb = openpyxl.load_workbook(file_path)
         ws = wb.active
         # 获取B列（颜色链接列）的所有值，跳过表头
         links = [row[1].value for row in ws.iter_rows(min_row=2) if row[1].value]
@@ -115,7 +110,7 @@ if __name__ == '__main__':
         exit()
 
     all_details = {}
-    for link in tqdm(color_links, desc="抓取进度"):
+    for link in tqdm.tqdm(color_links, desc="抓取进度"):
         details = fetch_color_details(link)
         if details:
             all_details[link] = details
@@ -123,4 +118,5 @@ if __name__ == '__main__':
     if all_details:
         save_to_excel(all_details)
     else:
-        print("未获取到有效数据")
\ No newline at end of file
+        print("未获取到有效数据")
+    HttpSession.print_reuse_stats()
@@ -0,0 +1,238 @@
+import csv
+import os
+from collections import defaultdict
+
+import Checkpoint
+import LazyImport
+
+openpyxl = LazyImport.module('openpyxl')
+
+# 常量配置
+DETAIL_PREFIX = ['序号', '颜色链接']
+FAILURE_HEADERS = ['URL', '错误类型', '错误详情']
+COLUMN_WIDTHS = {'B': 90, 'C': 20, 'D': 30, 'E': 30, 'F': 30, 'G': 30}  # 链接/Hex/RGB/CMYK/HSV/RAL
+PARQUET_ROW_GROUP = 10000  # 列式输出每个行组的行数
+
+
+class Sink:
+    """结果输出接口：抓取结果到达时逐行写入，close 时收尾"""
+
+    def __init__(self, fields):
+        self.fields = list(fields)
+        self.detail_count = 0
+        self.failure_count = 0
+        self.error_stats = defaultdict(int)
+
+    def write_detail(self, url, details):
+        self.detail_count += 1
+        self._write_detail([self.detail_count, url] + [details.get(f, 'N/A') for f in self.fields])
+
+    def write_failure(self, url, error_type, error_msg):
+        self.failure_count += 1
+        self.error_stats[error_type] += 1
+        self._write_failure([url, error_type, error_msg])
+
+    def _write_detail(self, row):
+        raise NotImplementedError
+
+    def _write_failure(self, row):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class XlsxSink(Sink):
+    """openpyxl write_only 模式，详情与失败记录两个工作表一次写完"""
+
+    def __init__(self, path, fields):
+        super().__init__(fields)
+        self.path = path
+        self._wb = openpyxl.Workbook(write_only=True)
+        self._details = self._wb.create_sheet("颜色代码")
+        for col, width in COLUMN_WIDTHS.items():
+            self._details.column_dimensions[col].width = width
+        self._details.append(DETAIL_PREFIX + self.fields)
+        self._failures = None
+
+    def _write_detail(self, row):
+        self._details.append(row)
+
+    def _write_failure(self, row):
+        if self._failures is None:
+            self._failures = self._wb.create_sheet("失败记录")
+            self._failures.append(FAILURE_HEADERS)
+        self._failures.append(row)
+
+    def close(self):
+        # 失败记录末尾附上错误类型统计
+        if self._failures is not None:
+            self._failures.append([])
+            self._failures.append(['错误类型', '出现次数'])
+            for error_type, count in self.error_stats.items():
+                self._failures.append([error_type, count])
+        self._wb.save(self.path)
+
+
+class CsvSink(Sink):
+    """CSV输出：详情写入 path，失败记录写入 *_failed.csv"""
+
+    def __init__(self, path, fields):
+        super().__init__(fields)
+        self.path = path
+        self.failure_path = os.path.splitext(path)[0] + '_failed.csv'
+        # utf-8-sig 便于 Excel 直接打开中文表头
+        self._file = open(path, 'w', newline='', encoding='utf-8-sig')
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(DETAIL_PREFIX + self.fields)
+        self._failure_file = None
+
+    def _write_detail(self, row):
+        self._writer.writerow(row)
+
+    def _write_failure(self, row):
+        if self._failure_file is None:
+            self._failure_file = open(self.failure_path, 'w', newline='', encoding='utf-8-sig')
+            self._failure_writer = csv.writer(self._failure_file)
+            self._failure_writer.writerow(FAILURE_HEADERS)
+        self._failure_writer.writerow(row)
+
+    def close(self):
+        self._file.close()
+        if self._failure_file is not None:
+            self._failure_file.close()
+
+
+class JsonlSink(Sink):
+    """JSONL输出，格式与断点日志相同，可直接用 Checkpoint.load_journal 读回"""
+
+    def __init__(self, path, fields):
+        super().__init__(fields)
+        self.path = path
+        self._journal = Checkpoint.Journal(path, append=False)
+
+    def write_detail(self, url, details):
+        self.detail_count += 1
+        self._journal.record_success(url, details)
+
+    def write_failure(self, url, error_type, error_msg):
+        self.failure_count += 1
+        self.error_stats[error_type] += 1
+        self._journal.record_failure(url, error_type, error_msg)
+
+    def close(self):
+        self._journal.close()
+
+
+class ParquetSink(Sink):
+    """列式输出（Parquet，需要安装 pyarrow），按行组分批落盘"""
+
+    def __init__(self, path, fields, row_group=PARQUET_ROW_GROUP):
+        super().__init__(fields)
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise ImportError("Parquet输出需要安装pyarrow: pip install pyarrow") from None
+        self._pa = pyarrow
+        self._pq = pyarrow.parquet
+        self.path = path
+        self.failure_path = os.path.splitext(path)[0] + '_failed.parquet'
+        self.row_group = row_group
+        string = pyarrow.string()
+        self._detail_schema = pyarrow.schema(
+            [('序号', pyarrow.int64()), ('颜色链接', string)] + [(f, string) for f in self.fields])
+        self._failure_schema = pyarrow.schema([(name, string) for name in FAILURE_HEADERS])
+        self._detail_rows = []
+        self._failure_rows = []
+        self._detail_writer = None
+        self._failure_writer = None
+
+    def _flush(self, rows, schema, writer, path):
+        if not rows:
+            return writer
+        columns = [list(values) for values in zip(*rows)]
+        table = self._pa.Table.from_arrays(
+            [self._pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+            schema=schema)
+        if writer is None:
+            writer = self._pq.ParquetWriter(path, schema)
+        writer.write_table(table)
+        rows.clear()
+        return writer
+
+    def _write_detail(self, row):
+        self._detail_rows.append(row[:2] + [None if v is None else str(v) for v in row[2:]])
+        if len(self._detail_rows) >= self.row_group:
+            self._detail_writer = self._flush(self._detail_rows, self._detail_schema,
+                                              self._detail_writer, self.path)
+
+    def _write_failure(self, row):
+        self._failure_rows.append([str(v) for v in row])
+        if len(self._failure_rows) >= self.row_group:
+            self._failure_writer = self._flush(self._failure_rows, self._failure_schema,
+                                               self._failure_writer, self.failure_path)
+
+    def close(self):
+        self._detail_writer = self._flush(self._detail_rows, self._detail_schema,
+                                          self._detail_writer, self.path)
+        self._failure_writer = self._flush(self._failure_rows, self._failure_schema,
+                                           self._failure_writer, self.failure_path)
+        for writer in (self._detail_writer, self._failure_writer):
+            if writer is not None:
+                writer.close()
+
+
+class SqliteSink(Sink):
+    """写入结果库（ResultStore）：按URL upsert，带索引可直接查询，xlsx 等由库导出"""
+
+    def __init__(self, path, fields):
+        super().__init__(fields)
+        import ResultStore  # ResultStore 依赖本模块做导出，这里按需导入
+        self.path = path
+        self._store = ResultStore.ResultStore(path)
+
+    def write_detail(self, url, details):
+        self.detail_count += 1
+        self._store.upsert(url, details)
+
+    def write_failure(self, url, error_type, error_msg):
+        self.failure_count += 1
+        self.error_stats[error_type] += 1
+        self._store.record_failure(url, error_type, error_msg)
+
+    def close(self):
+        self._store.close()
+
+
+SINKS = {
+    'xlsx': XlsxSink,
+    'csv': CsvSink,
+    'jsonl': JsonlSink,
+    'parquet': ParquetSink,
+    'sqlite': SqliteSink,
+}
+
+
+def open_sink(path, fields, fmt=None):
+    """按格式（默认取文件扩展名）创建输出"""
+    fmt = fmt or os.path.splitext(path)[1].lstrip('.').lower()
+    if fmt not in SINKS:
+        raise ValueError(f"不支持的输出格式: {fmt}（可选 {', '.join(SINKS)}）")
+    return SINKS[fmt](path, fields)
+
+
+def save_results(path, fields, all_details, failed_urls, fmt=None):
+    """一次性写出已有结果（详情与失败记录）"""
+    with open_sink(path, fields, fmt) as sink:
+        for url, details in all_details.items():
+            sink.write_detail(url, details)
+        for url, error_type, error_msg in failed_urls:
+            sink.write_failure(url, error_type, error_msg)
+    print(f"已保存{sink.detail_count}条有效数据、{sink.failure_count}条失败记录到{path}")
@@ -0,0 +1,221 @@
+import argparse
+import hashlib
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+import zlib
+from collections import Counter
+
+# 常量配置
+SNAPSHOT_DIR = 'snapshots'
+MAX_BYTES = 64 * 1024 * 1024  # 快照（压缩后）总大小上限，超出按最近出现时间淘汰
+QUEUE_SIZE = 256  # 待写入的快照数上限，写不过来时直接丢弃而不阻塞抓取
+MAX_PER_ERROR = 50  # 每次运行每种错误最多保存多少个不同页面，其余只计数
+COMMIT_EVERY = 50
+BUSY_TIMEOUT = 30.0
+
+_store = None
+
+
+class SnapshotStore:
+    """解析失败页面的快照：保存原始字节（zlib压缩），按内容哈希去重，按URL与错误类型索引
+
+    capture 只做入队，由单个后台线程压缩、落盘，抓取线程不做磁盘I/O；
+    相同的出错页面只存一份，总大小超过 max_bytes 时淘汰最久未再出现的快照。
+    """
+
+    def __init__(self, path=SNAPSHOT_DIR, max_bytes=MAX_BYTES, queue_size=QUEUE_SIZE,
+                 max_per_error=MAX_PER_ERROR):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_per_error = max_per_error
+        self.captured = 0
+        self.dropped = 0  # 队列满或超过每种错误上限而未保存的
+        self._per_error = Counter()
+        self._lock = threading.Lock()  # 后台写线程与查询共用一个连接
+        self._count_lock = threading.Lock()  # dropped 由抓取线程与写线程共同累加
+        self._queue = queue.Queue(maxsize=queue_size)
+        os.makedirs(os.path.join(path, 'objects'), exist_ok=True)
+        self._db = sqlite3.connect(os.path.join(path, 'index.sqlite'), timeout=BUSY_TIMEOUT,
+                                   check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('''CREATE TABLE IF NOT EXISTS objects (
+            digest TEXT PRIMARY KEY,
+            size INTEGER NOT NULL,
+            last_seen REAL)''')
+        self._db.execute('''CREATE TABLE IF NOT EXISTS snapshots (
+            url TEXT NOT NULL,
+            error_type TEXT NOT NULL,
+            error TEXT,
+            digest TEXT NOT NULL,
+            created REAL,
+            PRIMARY KEY (url, error_type))''')
+        self._db.execute('CREATE INDEX IF NOT EXISTS idx_error_type ON snapshots(error_type)')
+        self._db.commit()
+        self._writer = threading.Thread(target=self._write_loop, daemon=True)
+        self._writer.start()
+
+    def capture(self, url, content, error):
+        """记录一次解析失败（非阻塞）"""
+        try:
+            self._queue.put_nowait((url, type(error).__name__, str(error), content, time.time()))
+        except queue.Full:
+            self._drop()
+
+    def _drop(self):
+        with self._count_lock:
+            self.dropped += 1
+
+    def _object_path(self, digest):
+        return os.path.join(self.path, 'objects', digest[:2], digest + '.html.z')
+
+    def _write_loop(self):
+        uncommitted = 0
+        while True:
+            try:
+                item = self._queue.get(timeout=1.0)
+            except queue.Empty:
+                item = False
+            if item is None:
+                break
+            with self._lock:
+                if item:
+                    uncommitted += self._write(*item)
+                if uncommitted and (not item or uncommitted >= COMMIT_EVERY):
+                    self._commit()
+                    uncommitted = 0
+        if uncommitted:
+            with self._lock:
+                self._commit()
+
+    def _write(self, url, error_type, error, content, seen):
+        digest = hashlib.sha256(content).hexdigest()
+        row = self._db.execute('SELECT size FROM objects WHERE digest = ?', (digest,)).fetchone()
+        if row is None:
+            if self._per_error[error_type] >= self.max_per_error:
+                self._drop()
+                return 0
+            self._per_error[error_type] += 1
+            path = self._object_path(digest)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            data = zlib.compress(content)
+            temp = f'{path}.{os.getpid()}.tmp'
+            with open(temp, 'wb') as f:
+                f.write(data)
+            os.replace(temp, path)  # 多进程同时写同一快照也不会留下半个文件
+            self._db.execute('INSERT OR REPLACE INTO objects VALUES (?, ?, ?)', (digest, len(data), seen))
+        else:
+            self._db.execute('UPDATE objects SET last_seen = ? WHERE digest = ?', (seen, digest))
+        self._db.execute('INSERT OR REPLACE INTO snapshots VALUES (?, ?, ?, ?, ?)',
+                         (url, error_type, error, digest, seen))
+        self.captured += 1
+        return 1
+
+    def _commit(self):
+        total = self._db.execute('SELECT COALESCE(SUM(size), 0) FROM objects').fetchone()[0]
+        if total > self.max_bytes:
+            self._evict(total)
+        self._db.commit()
+
+    def _evict(self, total):
+        """按最近出现时间淘汰，直到总大小降到上限的90%"""
+        target = self.max_bytes * 0.9
+        for digest, size in self._db.execute('SELECT digest, size FROM objects ORDER BY last_seen').fetchall():
+            if total <= target:
+                break
+            self._db.execute('DELETE FROM objects WHERE digest = ?', (digest,))
+            self._db.execute('DELETE FROM snapshots WHERE digest = ?', (digest,))
+            try:
+                os.remove(self._object_path(digest))
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def find(self, url=None, error_type=None):
+        """查询快照索引，返回 [(url, 错误类型, 错误信息, 哈希, 时间)]，最新的在前"""
+        query = 'SELECT url, error_type, error, digest, created FROM snapshots WHERE 1'
+        params = []
+        if url:
+            query += ' AND url = ?'
+            params.append(url)
+        if error_type:
+            query += ' AND error_type = ?'
+            params.append(error_type)
+        with self._lock:
+            return self._db.execute(query + ' ORDER BY created DESC', params).fetchall()
+
+    def load(self, digest):
+        """按哈希读出原始页面字节"""
+        with open(self._object_path(digest), 'rb') as f:
+            return zlib.decompress(f.read())
+
+    def counts(self):
+        """各错误类型的快照数，以及 (不同页面数, 压缩后总字节数)"""
+        with self._lock:
+            by_error = dict(self._db.execute('SELECT error_type, COUNT(*) FROM snapshots GROUP BY error_type'))
+            objects, size = self._db.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM objects').fetchone()
+        return by_error, (objects, size)
+
+    def close(self):
+        """写完队列中剩余的快照"""
+        if self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join()
+        self._db.close()
+
+
+def enable(store) -> None:
+    """启用解析失败快照"""
+    global _store
+    _store = store
+
+
+def capture(url, content, error) -> None:
+    """记录解析失败的页面；未启用时什么都不做"""
+    if _store is not None:
+        _store.capture(url, content, error)
+
+
+def add_snapshot_arguments(parser):
+    """为脚本添加快照相关的命令行参数"""
+    parser.add_argument('--snapshots', metavar='DIR',
+                        help=f"把解析失败的页面保存到该快照目录（如 {SNAPSHOT_DIR}），不指定时不保存")
+    parser.add_argument('--snapshot-max-mb', type=int, default=MAX_BYTES // (1024 * 1024), help="快照大小上限(MB)")
+
+
+def enable_from_args(args):
+    """根据命令行参数启用快照，返回 SnapshotStore（未指定 --snapshots 时为None）"""
+    if not args.snapshots:
+        return None
+    store = SnapshotStore(args.snapshots, args.snapshot_max_mb * 1024 * 1024)
+    enable(store)
+    return store
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="查看解析失败页面的快照")
+    parser.add_argument('command', choices=['stats', 'list', 'show'])
+    parser.add_argument('url', nargs='?', help="show 时要取出的URL")
+    parser.add_argument('--snapshots', default=SNAPSHOT_DIR)
+    parser.add_argument('--error-type', help="只看某种错误")
+    args = parser.parse_args()
+
+    store = SnapshotStore(args.snapshots)
+    if args.command == 'stats':
+        by_error, (objects, size) = store.counts()
+        for error_type, count in by_error.items():
+            print(f"  {error_type}: {count}个URL")
+        print(f"不同页面{objects}个，压缩后{size / 1024:.1f}KB")
+    elif args.command == 'list':
+        for url, error_type, error, digest, created in store.find(error_type=args.error_type):
+            print(f"{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(created))}  {error_type}  {url}  "
+                  f"{digest[:12]}  {error}")
+    else:
+        rows = store.find(url=args.url, error_type=args.error_type)
+        if not rows:
+            sys.exit(f"没有 {args.url} 的快照")
+        sys.stdout.buffer.write(store.load(rows[0][3]))
+    store.close()
@@ -0,0 +1,84 @@
+import argparse
+import itertools
+import random
+
+# 常量配置
+POOL_PATH = 'user_agents.txt'  # 本地UA池（每行一个），不存在时用内置列表
+POOL_SIZE = 50  # --refresh 时保存的UA数量
+
+# 内置UA池：按 fake_useragent 数据中的使用占比选出的常见桌面浏览器
+BUILTIN = (
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:137.0) Gecko/20100101 Firefox/137.0',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/134.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/135.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/18.3.1 Safari/605.1.15',
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/135.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (X11; CrOS x86_64 14541.0.0) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/134.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/18.3 Safari/605.1.15',
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/134.0.0.0 Safari/537.36 Edg/134.0.0.0',
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/135.0.0.0 Safari/537.36 Edg/135.0.0.0',
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/133.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10.15; rv:128.0) Gecko/20100101 Firefox/128.0',
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/134.0.0.0 Safari/537.36',
+)
+
+_pool = None
+_cycle = None
+
+
+def pool(path=POOL_PATH):
+    """读取UA池（进程内只读一次文件）"""
+    global _pool
+    if _pool is None:
+        try:
+            with open(path, encoding='utf-8') as f:
+                _pool = tuple(line.strip() for line in f if line.strip()) or BUILTIN
+        except FileNotFoundError:
+            _pool = BUILTIN
+    return _pool
+
+
+def random_agent():
+    """随机取一个UA"""
+    return random.choice(pool())
+
+
+def next_agent():
+    """轮换取UA（从随机位置开始），每次请求换一个"""
+    global _cycle
+    if _cycle is None:
+        agents = pool()
+        start = random.randrange(len(agents))
+        _cycle = itertools.cycle(agents[start:] + agents[:start])
+    return next(_cycle)
+
+
+def headers():
+    """带轮换UA的请求头"""
+    return {'User-Agent': next_agent()}
+
+
+def refresh(path=POOL_PATH, size=POOL_SIZE):
+    """用 fake_useragent 的数据集重建本地UA池（只在这里才加载 fake_useragent），返回条数"""
+    try:
+        from fake_useragent import UserAgent
+    except ImportError:
+        raise ImportError("刷新UA池需要安装fake_useragent: pip install fake-useragent") from None
+    browsers = sorted(UserAgent().data_browsers, key=lambda r: -r['percent'])
+    agents = list(dict.fromkeys(r['useragent'] for r in browsers if r['type'] == 'desktop'))[:size]
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(agents) + '\n')
+    return len(agents)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="本地User-Agent池")
+    parser.add_argument('--refresh', action='store_true', help="用fake_useragent数据重建本地UA池")
+    parser.add_argument('--path', default=POOL_PATH)
+    parser.add_argument('--size', type=int, default=POOL_SIZE)
+    args = parser.parse_args()
+
+    if args.refresh:
+        print(f"已保存{refresh(args.path, args.size)}个UA到{args.path}")
+    for agent in pool(args.path):
+        print(agent)
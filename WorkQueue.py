@@ -0,0 +1,316 @@
+import argparse
+import json
+import os
+import socket
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+
+import Frontier
+import HttpSession
+import MultiThreaded
+import Retry
+import Sinks
+
+# 常量配置
+QUEUE_PATH = 'work_queue.sqlite'
+BATCH_SIZE = 50  # 每次领取的URL数
+LEASE_SECONDS = 120.0  # 租约时长，超时未完成的URL回到队列
+MAX_LEASES = 3  # 同一URL被领取（工作进程中途退出）的次数上限，超过记为失败
+POLL_SECONDS = 2.0  # 队列暂时领不到任务（其他进程持有租约）时的等待间隔
+BUSY_TIMEOUT = 60000  # 毫秒，多个进程同时写库时的等待上限
+
+# 任务状态
+PENDING = 'pending'
+LEASED = 'leased'
+DONE = 'done'
+FAILED = 'failed'
+
+
+class LeaseQueue:
+    """SQLite 上的共享任务队列：工作进程按批领取URL，租约到期未完成的自动回到队列
+
+    多台机器共享同一文件时 SQLite 的 WAL 模式不可用（依赖共享内存），这里使用默认的回滚日志，
+    领取任务用 BEGIN IMMEDIATE 加写锁，保证同一URL不会同时租给两个进程。
+    """
+
+    def __init__(self, path=QUEUE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=BUSY_TIMEOUT / 1000, isolation_level=None,
+                                   check_same_thread=False)
+        self._db.execute(f'PRAGMA busy_timeout={BUSY_TIMEOUT}')
+        self._db.execute('''CREATE TABLE IF NOT EXISTS tasks (
+            url TEXT PRIMARY KEY,
+            key TEXT,
+            state TEXT NOT NULL,
+            owner TEXT,
+            lease_until REAL,
+            leases INTEGER DEFAULT 0,
+            details TEXT,
+            error_type TEXT,
+            error TEXT,
+            updated REAL)''')
+        self._db.execute('CREATE INDEX IF NOT EXISTS idx_tasks_state ON tasks(state, lease_until)')
+        # 按 Frontier.normalize() 的键去重，url 列保存原始URL供抓取（旧版队列补上该列）
+        if 'key' not in [row[1] for row in self._db.execute('PRAGMA table_info(tasks)')]:
+            self._db.execute('ALTER TABLE tasks ADD COLUMN key TEXT')
+        self._db.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_tasks_key ON tasks(key)')
+
+    def _write(self, statements):
+        """在一个写事务中执行 [(sql, 参数)]"""
+        with self._lock:
+            self._db.execute('BEGIN IMMEDIATE')
+            try:
+                for sql, params in statements:
+                    self._db.execute(sql, params)
+                self._db.execute('COMMIT')
+            except BaseException:
+                self._db.execute('ROLLBACK')
+                raise
+
+    def enqueue(self, urls, chunk_size=Frontier.CHUNK_SIZE):
+        """加入队列（规范化后的键已存在的URL忽略），返回新增数量"""
+        added = 0
+        chunk = []
+        for url in urls:
+            chunk.append((url, Frontier.normalize(url), PENDING, time.time()))
+            if len(chunk) >= chunk_size:
+                added += self._insert(chunk)
+                chunk = []
+        return added + self._insert(chunk)
+
+    def _insert(self, rows):
+        with self._lock:
+            before = self._db.total_changes
+            self._db.execute('BEGIN IMMEDIATE')
+            self._db.executemany('INSERT OR IGNORE INTO tasks (url, key, state, updated) VALUES (?, ?, ?, ?)', rows)
+            self._db.execute('COMMIT')
+            return self._db.total_changes - before
+
+    def claim(self, owner, limit=BATCH_SIZE, lease_seconds=LEASE_SECONDS, max_leases=MAX_LEASES):
+        """领取最多 limit 个待抓取或租约已过期的URL"""
+        now = time.time()
+        with self._lock:
+            self._db.execute('BEGIN IMMEDIATE')
+            try:
+                # 反复被领取却始终没有结果的URL（多半让工作进程崩溃）不再发放
+                self._db.execute(
+                    "UPDATE tasks SET state = ?, error_type = 'LeaseExpired', error = '多次租约超时', updated = ? "
+                    "WHERE state = ? AND lease_until < ? AND leases >= ?",
+                    (FAILED, now, LEASED, now, max_leases))
+                rows = self._db.execute(
+                    'SELECT url FROM tasks WHERE state = ? OR (state = ? AND lease_until < ?) LIMIT ?',
+                    (PENDING, LEASED, now, limit)).fetchall()
+                urls = [url for (url,) in rows]
+                self._db.executemany(
+                    'UPDATE tasks SET state = ?, owner = ?, lease_until = ?, leases = leases + 1, updated = ? '
+                    'WHERE url = ?',
+                    [(LEASED, owner, now + lease_seconds, now, url) for url in urls])
+                self._db.execute('COMMIT')
+            except BaseException:
+                self._db.execute('ROLLBACK')
+                raise
+        return urls
+
+    def renew(self, owner, lease_seconds=LEASE_SECONDS):
+        """延长该工作进程持有的全部租约（心跳）"""
+        self._write([('UPDATE tasks SET lease_until = ? WHERE state = ? AND owner = ?',
+                      (time.time() + lease_seconds, LEASED, owner))])
+
+    def finish(self, owner, results):
+        """一个事务写回一批结果 [(url, 详情或None, 错误类型, 错误详情)]
+
+        只接受仍持有租约的结果，租约已过期并转给别的进程时丢弃，避免重复写入。
+        """
+        now = time.time()
+        statements = []
+        for url, details, error_type, error_msg in results:
+            if details is not None:
+                statements.append(('UPDATE tasks SET state = ?, details = ?, error_type = NULL, error = NULL, '
+                                   'updated = ? WHERE url = ? AND owner = ? AND state = ?',
+                                   (DONE, json.dumps(details, ensure_ascii=False), now, url, owner, LEASED)))
+            else:
+                statements.append(('UPDATE tasks SET state = ?, error_type = ?, error = ?, updated = ? '
+                                   'WHERE url = ? AND owner = ? AND state = ?',
+                                   (FAILED, error_type, error_msg, now, url, owner, LEASED)))
+        if statements:
+            self._write(statements)
+
+    def release(self, owner):
+        """工作进程正常退出时交回尚未完成的租约"""
+        self._write([('UPDATE tasks SET state = ?, owner = NULL, lease_until = NULL, leases = leases - 1 '
+                      'WHERE state = ? AND owner = ?', (PENDING, LEASED, owner))])
+
+    def retry_failed(self):
+        """把失败的URL重新放回队列，返回数量"""
+        with self._lock:
+            before = self._db.total_changes
+            self._db.execute('UPDATE tasks SET state = ?, leases = 0 WHERE state = ?', (PENDING, FAILED))
+            return self._db.total_changes - before
+
+    def counts(self):
+        with self._lock:
+            return dict(self._db.execute('SELECT state, COUNT(*) FROM tasks GROUP BY state'))
+
+    def results(self):
+        """逐行产出 ('ok', url, 详情) 或 ('failed', url, 错误类型, 错误详情)"""
+        cursor = self._db.cursor()
+        for url, state, details, error_type, error in cursor.execute(
+                'SELECT url, state, details, error_type, error FROM tasks WHERE state IN (?, ?) ORDER BY rowid',
+                (DONE, FAILED)):
+            if state == DONE:
+                yield 'ok', url, json.loads(details)
+            else:
+                yield 'failed', url, error_type, error
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+class QueueSink(Sinks.Sink):
+    """把 crawl 的结果写回队列（替代文件输出），多个工作进程的结果最后由 export 合并
+
+    结果攒够 flush_every 条再用一个事务写回，减少多进程争抢写锁；进程中途退出时未写回的URL随租约过期重新发放。
+    """
+
+    def __init__(self, queue, owner, fields, flush_every=BATCH_SIZE):
+        super().__init__(fields)
+        self.queue = queue
+        self.owner = owner
+        self.flush_every = flush_every
+        self._results = []
+
+    def write_detail(self, url, details):
+        self.detail_count += 1
+        self._add((url, details, None, None))
+
+    def write_failure(self, url, error_type, error_msg):
+        self.failure_count += 1
+        self.error_stats[error_type] += 1
+        self._add((url, None, error_type, error_msg))
+
+    def _add(self, result):
+        self._results.append(result)
+        if len(self._results) >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        results, self._results = self._results, []
+        self.queue.finish(self.owner, results)
+
+    def close(self):
+        self.flush()
+
+
+def _module(ral):
+    if ral:
+        import MultiThreadedRAL
+        return MultiThreadedRAL
+    return MultiThreaded
+
+
+def work(queue, ral=False, threads=10, batch_size=BATCH_SIZE, lease_seconds=LEASE_SECONDS,
+         max_attempts=Retry.MAX_ATTEMPTS):
+    """工作进程主循环：领取一批、线程池抓取、结果写回队列，直到队列中没有待处理的URL"""
+    module = _module(ral)
+    owner = f'{socket.gethostname()}:{os.getpid()}'
+    sink = QueueSink(queue, owner, module.FIELDS)
+    fetch = Retry.guarded(module.fetch_color_details, Retry.CircuitBreaker())
+    retry = Retry.RetryPolicy(max_attempts=max_attempts)
+
+    # 心跳：抓取期间定期续约，进程退出后租约自然过期
+    stop = threading.Event()
+
+    def heartbeat():
+        while not stop.wait(lease_seconds / 3):
+            try:
+                queue.renew(owner, lease_seconds)
+            except Exception as e:
+                # 如数据库被锁；下一轮继续续约，线程退出会让租约过期、URL被别的进程重复抓取
+                print(f"[{owner}] 续约失败: {type(e).__name__}: {e}")
+
+    def claimed():
+        # crawl 的在途窗口有空位时才领下一批，线程池与连接在批次之间复用
+        while urls := queue.claim(owner, batch_size, lease_seconds):
+            yield from urls
+
+    threading.Thread(target=heartbeat, daemon=True).start()
+    try:
+        while True:
+            MultiThreaded.crawl(claimed(), fetch, threads, sink=sink, retry=retry, collect=False, progress=False)
+            sink.flush()
+            counts = queue.counts()
+            if not counts.get(PENDING) and not counts.get(LEASED):
+                break
+            time.sleep(POLL_SECONDS)  # 其余URL正由别的进程处理，等它们完成或租约过期
+    finally:
+        stop.set()
+        sink.close()
+        queue.release(owner)
+    print(f"[{owner}] 完成{sink.detail_count}条，失败{sink.failure_count}条")
+    return sink.detail_count, sink.failure_count
+
+
+def export(queue, path, fields, fmt=None):
+    """把队列中全部结果合并写入一个输出文件"""
+    with Sinks.open_sink(path, fields, fmt) as sink:
+        for record in queue.results():
+            if record[0] == 'ok':
+                sink.write_detail(record[1], record[2])
+            else:
+                sink.write_failure(*record[1:])
+    print(f"已保存{sink.detail_count}条有效数据、{sink.failure_count}条失败记录到{path}")
+
+
+def print_status(queue):
+    counts = queue.counts()
+    print('队列状态：' + '，'.join(f'{state} {counts.get(state, 0)}条'
+                              for state in (PENDING, LEASED, DONE, FAILED)))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="基于共享SQLite租约队列的多进程/多机抓取")
+    parser.add_argument('command', choices=['init', 'work', 'local', 'export', 'status', 'retry-failed'],
+                        help="init 导入链接；work 启动一个工作进程；local 在本机启动多个工作进程；"
+                             "export 合并输出；status 查看进度；retry-failed 失败的重新排队")
+    parser.add_argument('--queue', default=QUEUE_PATH, help="队列文件（多机时放在共享文件系统上）")
+    parser.add_argument('--links', default='color_links.xlsx', help="init：链接文件（xlsx或每行一个链接）")
+    parser.add_argument('--ral', action='store_true', help="使用 RAL 字段版本")
+    parser.add_argument('--threads', type=int, default=10, help="每个工作进程的线程数")
+    parser.add_argument('--procs', type=int, default=os.cpu_count(), help="local：工作进程数")
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    parser.add_argument('--lease', type=float, default=LEASE_SECONDS, help="租约秒数")
+    parser.add_argument('--max-attempts', type=int, default=Retry.MAX_ATTEMPTS)
+    parser.add_argument('--output', default='color_details.xlsx', help="export：输出文件")
+    parser.add_argument('--format', choices=list(Sinks.SINKS))
+    args = parser.parse_args()
+
+    queue = LeaseQueue(args.queue)
+    if args.command == 'init':
+        added = queue.enqueue(MultiThreaded.iter_links(args.links))
+        print(f"新增{added}条链接")
+    elif args.command == 'work':
+        work(queue, args.ral, args.threads, args.batch_size, args.lease, args.max_attempts)
+        HttpSession.print_reuse_stats()
+    elif args.command == 'local':
+        # 本机多进程：每个进程独立的 GIL 与连接池，共用同一个队列文件
+        command = [sys.executable, os.path.abspath(__file__), 'work', '--queue', args.queue,
+                   '--threads', str(args.threads), '--batch-size', str(args.batch_size),
+                   '--lease', str(args.lease), '--max-attempts', str(args.max_attempts)]
+        if args.ral:
+            command.append('--ral')
+        start = time.perf_counter()
+        workers = [subprocess.Popen(command) for _ in range(args.procs)]
+        for worker in workers:
+            worker.wait()
+        print(f"{args.procs}个工作进程用时{time.perf_counter() - start:.1f}秒")
+    elif args.command == 'export':
+        export(queue, args.output, _module(args.ral).FIELDS, args.format)
+    elif args.command == 'retry-failed':
+        print(f"{queue.retry_failed()}条失败的链接已重新排队")
+    print_status(queue)
+    queue.close()
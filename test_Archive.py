@@ -0,0 +1,53 @@
+import os
+
+import pytest
+import requests
+
+import Archive
+
+
+def _response(url, status, body, headers=None):
+    response = requests.Response()
+    response.status_code = status
+    response.url = url
+    response.headers.update(headers or {'Content-Type': 'text/html; charset=utf-8'})
+    response._content = body
+    return response
+
+
+def test_warc_round_trip(tmp_path):
+    path = str(tmp_path / 'test.warc.gz')
+    archive = Archive.Archive(path)
+    archive.record('http://h/a', _response('http://h/a', 200, '<html>颜色</html>'.encode('utf-8')))
+    archive.record('http://h/b', _response('http://h/b', 503, b''))
+    archive.record('http://h/b', _response('http://h/b', 200, b'second'))
+    archive.record('http://h/b', _response('http://h/b', 503, b''))
+    archive.close()
+
+    replay = Archive.Archive(path, replay=True)
+    response = replay.get('http://h/a')
+    assert response.status_code == 200
+    assert response.content.decode('utf-8') == '<html>颜色</html>'
+    assert response.headers['Content-Type'] == 'text/html; charset=utf-8'
+    assert replay.get('http://h/b').content == b'second'  # 优先取200
+    assert replay.urls() == ['http://h/a', 'http://h/b']
+    with pytest.raises(Archive.ArchiveMissError):
+        replay.get('http://h/missing')
+    replay.close()
+
+
+def test_scan_and_reindex(tmp_path):
+    path = str(tmp_path / 'test.warc.gz')
+    archive = Archive.Archive(path)
+    for i in range(5):
+        archive.record(f'http://h/{i}', _response(f'http://h/{i}', 200, b'x' * i))
+    archive.close()
+
+    urls = [Archive._parse_record(record)[0] for _, _, record in Archive.scan(path)]
+    assert urls == [f'http://h/{i}' for i in range(5)]
+    os.remove(path + Archive.INDEX_SUFFIX)
+    archive = Archive.Archive(path, replay=True)  # 索引丢失时扫描归档重建
+    assert archive.counts()[:2] == (5, 5)
+    assert archive.reindex() == 5
+    assert archive.get('http://h/4').content == b'xxxx'
+    archive.close()
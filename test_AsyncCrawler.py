@@ -0,0 +1,61 @@
+import asyncio
+
+import pytest
+
+import AsyncCrawler
+import FakeSite
+import Retry
+
+
+@pytest.fixture
+def site():
+    servers = []
+
+    def start(**config):
+        server, base_url = FakeSite.start(pages=50, **config)
+        servers.append(server)
+        return server, base_url
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def _retry(max_attempts=Retry.MAX_ATTEMPTS):
+    return Retry.RetryPolicy(max_attempts=max_attempts, base_delay=0.01, max_delay=0.05, budget_min=1000)
+
+
+def test_counts_successes_and_failures(site):
+    server, base_url = site()
+    links = FakeSite.detail_links(base_url, 50) + [f'{base_url}/color/color-{i}' for i in (50, 51)]
+    retry = _retry()
+    details, failures = asyncio.run(AsyncCrawler.crawl(iter(links), concurrency=8, retry=retry))
+
+    assert len(details) == 50
+    assert details[f'{base_url}/color/color-0']['Hex Code'].startswith('#')
+    assert sorted(url for url, _, _ in failures) == links[50:]
+    assert {error_type for _, error_type, _ in failures} == {'ClientResponseError'}
+    assert retry.retries == 0  # 404 不重试
+    assert server.requests == 52
+
+
+def test_retries_transient_errors(site):
+    server, base_url = site(error_rate=0.3)
+    retry = _retry(max_attempts=10)
+    details, failures = asyncio.run(
+        AsyncCrawler.crawl(FakeSite.detail_links(base_url, 50), concurrency=8, retry=retry))
+
+    assert len(details) == 50 and failures == []
+    assert retry.retries > 0
+    assert server.requests == 50 + retry.retries
+
+
+def test_fails_transient_errors_without_retry(site):
+    _, base_url = site(error_rate=1.0)
+    details, failures = asyncio.run(
+        AsyncCrawler.crawl(FakeSite.detail_links(base_url, 5), concurrency=2, retry=_retry(max_attempts=1)))
+
+    assert details == {}
+    assert len(failures) == 5
+    assert all(error_type == 'ClientResponseError' for _, error_type, _ in failures)
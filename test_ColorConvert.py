@@ -0,0 +1,32 @@
+import math
+
+import ColorConvert
+
+
+def test_hex_to_rgb_expands_short_codes():
+    rgb = ColorConvert.hex_to_rgb(['#abc', 'FF0000', '#00ff7F'])
+    assert rgb.tolist() == [[170, 187, 204], [255, 0, 0], [0, 255, 127]]
+
+
+def test_hex_to_rgb_marks_invalid_rows_only():
+    rgb = ColorConvert.hex_to_rgb(['#12', 'zzzzzz', None, '#0000FF', '#1234567'])
+    assert [math.isnan(row[0]) for row in rgb.tolist()] == [True, True, True, False, True]
+    assert rgb[3].tolist() == [0, 0, 255]
+
+
+def test_format_fields_matches_site_format():
+    white, black, invalid = ColorConvert.format_fields(['#FFFFFF', '#000000', '#xyz'])
+    assert white == {'RGB Values': '(255, 255, 255)', 'CMYK Values': '(0%, 0%, 0%, 0%)',
+                     'HSV/HSB Values': '0°, 0%, 100%'}
+    assert black['CMYK Values'] == '(0%, 0%, 0%, 100%)'
+    assert invalid is None
+
+
+def test_verify_reports_mismatches():
+    details = {
+        'ok': {'Hex Code': '#FF0000', 'RGB Values': '(255, 0, 0)', 'CMYK Values': '(0%, 100%, 100%, 0%)',
+               'HSV/HSB Values': '0°, 100%, 100%'},
+        'bad': {'Hex Code': '#FF0000', 'RGB Values': '(250, 0, 0)', 'CMYK Values': '(0%, 100%, 100%, 0%)',
+                'HSV/HSB Values': '360°, 100%, 100%'},
+    }
+    assert [(url, field) for url, field, _, _ in ColorConvert.verify(details)] == [('bad', 'RGB Values')]
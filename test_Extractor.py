@@ -0,0 +1,47 @@
+from lxml import etree
+
+import Extractor
+
+PAGE = '''<html><body><table>
+<tr><td class="left">Hex Code</td><td class="right"> #BB1E10 </td></tr>
+<tr><td class="left">RGB
+    Values</td><td class="right">(187, 30, 16)</td></tr>
+<tr><td class="left">Closest RAL Code</td><td class="right">RAL 9999</td></tr>
+<tr><td class="left">RAL</td><td class="right">3020 [Traffic red]</td></tr>
+<tr><td class="left">Hex Code</td><td class="right">#000000</td></tr>
+<tr><td>no label</td></tr>
+</table>
+<p>footer</p>
+</body></html>'''
+
+
+def test_extract_fields_matches_labels_exactly():
+    values = Extractor.extract_fields(etree.HTML(PAGE), ('Hex Code', 'RGB Values', 'RAL', 'Closest RAL'))
+    assert values == {
+        'Hex Code': '#BB1E10',  # 同名标签取第一个
+        'RGB Values': '(187, 30, 16)',  # 标签中的多余空白被合并
+        'RAL': '3020 [Traffic red]',
+        'Closest RAL': None,  # "Closest RAL Code" 不算 "Closest RAL"
+    }
+
+
+def test_extract_fields_without_tree():
+    assert Extractor.extract_fields(None, ('Hex Code',)) == {'Hex Code': None}
+
+
+def _feed(watcher, page, chunk_size=16):
+    data = page.encode('utf-8')
+    for offset in range(0, len(data), chunk_size):
+        if watcher.feed(data[offset:offset + chunk_size]):
+            return offset + chunk_size
+    return None
+
+
+def test_label_watcher_stops_once_fields_are_found():
+    stopped = _feed(Extractor.LabelWatcher(('Hex Code', 'RAL')), PAGE)
+    assert stopped is not None
+    assert PAGE.encode('utf-8').index(b'3020') < stopped < PAGE.encode('utf-8').index(b'#000000')
+
+
+def test_label_watcher_needs_exact_labels():
+    assert _feed(Extractor.LabelWatcher(('Hex Code', 'Closest RAL')), PAGE) is None
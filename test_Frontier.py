@@ -0,0 +1,63 @@
+import sqlite3
+
+import Frontier
+
+
+def test_normalize_scheme_host_port_fragment_and_tracking():
+    url = 'HTTPS://Example.COM:443/Color/Red?b=2&utm_source=x&a=1&fbclid=y#top'
+    assert Frontier.normalize(url) == 'https://example.com/Color/Red?a=1&b=2'
+    assert Frontier.normalize('http://h:8080') == 'http://h:8080/'
+
+
+def test_normalize_strips_trailing_slash():
+    assert Frontier.normalize('http://h/a/') == Frontier.normalize('http://h/a') == 'http://h/a'
+    assert Frontier.normalize('http://h/') == Frontier.normalize('http://h') == 'http://h/'
+
+
+def test_normalize_sorts_query():
+    assert Frontier.normalize('http://h/a?b=1&a=2') == Frontier.normalize('http://h/a?a=2&b=1') == 'http://h/a?a=2&b=1'
+
+
+def test_normalize_keeps_path_case_unless_asked():
+    assert Frontier.normalize('http://h/Path/') == 'http://h/Path'
+    assert Frontier.normalize('http://h/Path/', lowercase_path=True) == 'http://h/path'
+
+
+def test_dedupe_keeps_first_original():
+    urls = ['http://h/a/?b=1&a=2', 'http://H/a?a=2&b=1', 'http://h/b']
+    assert Frontier.dedupe(urls) == ['http://h/a/?b=1&a=2', 'http://h/b']
+
+
+def test_frontier_dedupes_by_key_and_yields_originals(tmp_path):
+    frontier = Frontier.Frontier(str(tmp_path / 'frontier.sqlite'), capacity=1000)
+    assert frontier.add(['http://h/a/', 'http://h/a', 'http://h/b?y=1&x=2']) == ['http://h/a/', 'http://h/b?y=1&x=2']
+    assert frontier.add(['http://h/b?x=2&y=1']) == []
+    assert 'HTTP://h/a' in frontier
+    frontier.mark('http://h/a', Frontier.DONE)
+    assert list(frontier.pending()) == ['http://h/b?y=1&x=2']
+    frontier.close()
+
+
+def test_frontier_migrates_old_table(tmp_path):
+    path = str(tmp_path / 'frontier.sqlite')
+    db = sqlite3.connect(path)
+    db.execute('CREATE TABLE urls (url TEXT PRIMARY KEY, state TEXT NOT NULL, updated REAL)')
+    db.executemany('INSERT INTO urls VALUES (?, ?, 0)',
+                   [('http://h/a/', Frontier.DONE), ('http://h/a', Frontier.PENDING), ('http://h/c', Frontier.PENDING)])
+    db.commit()
+    db.close()
+    frontier = Frontier.Frontier(path, capacity=1000)
+    assert len(frontier) == 2
+    assert frontier.counts() == {Frontier.DONE: 1, Frontier.PENDING: 1}
+    assert frontier.add(['http://h/a']) == []
+    frontier.close()
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = Frontier.BloomFilter(capacity=1000, error_rate=0.01)
+    keys = [f'http://h/color/{i}' for i in range(1000)]
+    for key in keys:
+        bloom.add(key)
+    assert all(key in bloom for key in keys)
+    false_positives = sum(f'http://h/other/{i}' in bloom for i in range(10000))
+    assert false_positives < 300  # 设计误判率1%，留足余量
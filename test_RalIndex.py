@@ -0,0 +1,33 @@
+import numpy as np
+
+import RalIndex
+
+# Sharma, Wu, Dalal (2005) 的 CIEDE2000 测试数据（节选）
+SHARMA_PAIRS = [
+    ((50.0000, 2.6772, -79.7751), (50.0000, 0.0000, -82.7485), 2.0425),
+    ((50.0000, 0.0000, 0.0000), (50.0000, -1.0000, 2.0000), 2.3669),
+    ((50.0000, 2.5000, 0.0000), (73.0000, 25.0000, -18.0000), 27.1492),
+    ((60.2574, -34.0099, 36.2677), (60.4626, -34.1751, 39.4387), 1.2644),
+    ((22.7233, 20.0904, -46.6940), (23.0331, 14.9730, -42.5619), 2.0373),
+    ((2.0776, 0.0795, -1.1350), (0.9033, -0.0636, -0.5514), 0.9082),
+]
+
+
+def test_ciede2000_matches_reference_data():
+    lab1 = np.array([pair[0] for pair in SHARMA_PAIRS])
+    lab2 = np.array([pair[1] for pair in SHARMA_PAIRS])
+    expected = [pair[2] for pair in SHARMA_PAIRS]
+    assert np.allclose(RalIndex.delta_e_ciede2000(lab1, lab2), expected, atol=1e-4)
+    assert np.allclose(RalIndex.delta_e_ciede2000(lab2, lab1), expected, atol=1e-4)
+
+
+def test_rgb_to_lab_white_and_black():
+    lab = RalIndex.rgb_to_lab([[255, 255, 255], [0, 0, 0]])
+    assert np.allclose(lab, [[100, 0, 0], [0, 0, 0]], atol=0.01)
+
+
+def test_lookup_exact_palette_colors_and_invalid_hex():
+    index = RalIndex.RalIndex()
+    codes = [hex_code for _, _, hex_code in index.palette[:5]]
+    assert index.lookup(codes) == index.labels[:5]
+    assert index.lookup(['not-a-color']) == [None]
@@ -0,0 +1,100 @@
+import pytest
+import requests
+from lxml import etree
+
+import Retry
+
+
+def test_classify_network_errors_are_transient():
+    assert Retry.classify(requests.ConnectionError('reset'))[0] == Retry.TRANSIENT
+    assert Retry.classify(requests.Timeout('slow'))[0] == Retry.TRANSIENT
+
+
+def test_classify_malformed_urls_are_permanent():
+    # 这几个异常同时继承 ValueError 与 OSError
+    for error in (requests.exceptions.InvalidURL('x'), requests.exceptions.MissingSchema('x'),
+                  requests.exceptions.InvalidSchema('x')):
+        assert Retry.classify(error)[0] == Retry.PERMANENT
+
+
+def test_classify_http_status():
+    def http_error(status, headers=None):
+        response = requests.Response()
+        response.status_code = status
+        response.headers.update(headers or {})
+        return requests.HTTPError(response=response)
+
+    assert Retry.classify(http_error(404)) == (Retry.PERMANENT, None)
+    assert Retry.classify(http_error(503))[0] == Retry.THROTTLED
+    assert Retry.classify(http_error(429, {'Retry-After': '7'})) == (Retry.THROTTLED, 7.0)
+
+
+def test_classify_follows_wrapped_cause():
+    try:
+        try:
+            raise requests.ConnectionError('reset')
+        except Exception as e:
+            raise RuntimeError('http://x 解析失败: reset') from e
+    except RuntimeError as wrapped:
+        assert Retry.classify(wrapped)[0] == Retry.TRANSIENT
+    assert Retry.classify(etree.XPathError('未找到'))[0] == Retry.PERMANENT
+
+
+def test_schedule_respects_max_attempts_and_budget():
+    policy = Retry.RetryPolicy(max_attempts=3, budget_min=1)
+    error = requests.ConnectionError('reset')
+    delay, attempt = policy.schedule(error, 0)
+    assert attempt == 1 and 0 <= delay <= Retry.BASE_DELAY
+    assert policy.schedule(error, 1) is None  # 预算已用完
+    policy.tokens = 10
+    assert policy.schedule(error, 2) is None  # 已到最大次数
+    assert policy.schedule(ValueError('bad'), 0) is None
+
+
+def test_circuit_open_requeues_are_capped_per_url():
+    policy = Retry.RetryPolicy(max_attempts=4, budget_min=0)
+    error = Retry.CircuitOpenError('example.com', 5.0)
+    for _ in range(Retry.MAX_CIRCUIT_WAITS):
+        assert policy.schedule(error, 0, 'http://a') == (5.0, 0)  # 不消耗次数与预算
+    assert policy.schedule(error, 0, 'http://a') is None
+    assert policy.schedule(error, 0, 'http://b') == (5.0, 0)
+
+
+def test_circuit_open_fails_at_once_without_retries():
+    policy = Retry.RetryPolicy(max_attempts=1)
+    assert policy.schedule(Retry.CircuitOpenError('example.com', 5.0), 0, 'http://a') is None
+
+
+def test_breaker_opens_probes_and_recovers(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(Retry.time, 'monotonic', lambda: now[0])
+    breaker = Retry.CircuitBreaker(window=4, threshold=0.5, min_samples=4, open_seconds=10)
+    for ok in (True, False, True, False):
+        breaker.before('h')
+        breaker.record('h', ok)
+
+    with pytest.raises(Retry.CircuitOpenError) as opened:
+        breaker.before('h')
+    assert opened.value.retry_in == 10
+
+    now[0] += 10
+    breaker.before('h')  # 到期后放行一个探测请求
+    with pytest.raises(Retry.CircuitOpenError):
+        breaker.before('h')  # 探测期间只放行一个请求
+    breaker.record('h', True)
+    breaker.before('h')  # 探测成功后恢复
+
+
+def test_breaker_reopens_when_probe_fails(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(Retry.time, 'monotonic', lambda: now[0])
+    breaker = Retry.CircuitBreaker(window=2, threshold=0.5, min_samples=2, open_seconds=10)
+    breaker.record('h', False)
+    breaker.record('h', False)
+    now[0] += 10
+    breaker.before('h')
+    breaker.record('h', False)
+    now[0] += 5
+    with pytest.raises(Retry.CircuitOpenError) as reopened:
+        breaker.before('h')  # 探测失败后重新熔断
+    assert reopened.value.retry_in == 5